@@ -40,6 +40,24 @@ from typing import (
 from .client_query import ClientQuery
 
 
+def resource_sort_key(resource: Dict) -> Tuple:
+    """This is used for sorting resources by ID and version. First
+    the ID is sorted, then the version. In cases where the version
+    contains periods, it's assumed this is to separate a
+    ``major.minor.hotfix`` style versioning system. In which case, the
+    value separated in the most-significant position is sorted before
+    those less significant. If the value is a digit it is cast as an
+    int, otherwise, it is cast as a string, to lower-case.
+    """
+    to_return = (resource["id"].lower(),)
+    for val in resource["resource_version"].split("."):
+        if val.isdigit():
+            to_return += (int(val),)
+        else:
+            to_return += (str(val).lower(),)
+    return to_return
+
+
 class AbstractClient(ABC):
     def _url_validator(self, url: str) -> bool:
         """
@@ -88,28 +106,7 @@ class AbstractClient(ABC):
         :return: A list of sorted resources.
         """
 
-        def sort_tuple(resource: Dict) -> Tuple:
-            """This is used for sorting resources by ID and version. First
-            the ID is sorted, then the version. In cases where the version
-            contains periods, it's assumed this is to separate a
-            ``major.minor.hotfix`` style versioning system. In which case, the
-            value separated in the most-significant position is sorted before
-            those less significant. If the value is a digit it is cast as an
-            int, otherwise, it is cast as a string, to lower-case.
-            """
-            to_return = (resource["id"].lower(),)
-            for val in resource["resource_version"].split("."):
-                if val.isdigit():
-                    to_return += (int(val),)
-                else:
-                    to_return += (str(val).lower(),)
-            return to_return
-
-        return sorted(
-            resources,
-            key=lambda resource: sort_tuple(resource),
-            reverse=True,
-        )
+        return sorted(resources, key=resource_sort_key, reverse=True)
 
     def filter_incompatible_resources(
         self,
@@ -74,6 +74,10 @@ class AtlasClientHttpJsonRequestError(Exception):
         super().__init__(error_str)
 
 
+# Access tokens are valid for 30 minutes. They are renewed a little earlier.
+_TOKEN_LIFETIME = 25 * 60
+
+
 class AtlasClient(AbstractClient):
     def __init__(self, config: Dict[str, str]):
         """
@@ -90,13 +94,25 @@ class AtlasClient(AbstractClient):
         self.dataSource = config["dataSource"]
         self.authUrl = config["authUrl"]
 
+        self._token = None
+        self._token_time = 0.0
+        # The results of previous queries, keyed by their filter, so that
+        # resolving the same resource again does not query the database.
+        self._results = {}
+
     def get_token(self):
-        return self._atlas_http_json_req(
-            self.authUrl,
-            data_json={"key": self.apiKey},
-            headers={"Content-Type": "application/json"},
-            purpose_of_request="Get Access Token with API key",
-        )["access_token"]
+        if (
+            self._token is None
+            or time.time() - self._token_time >= _TOKEN_LIFETIME
+        ):
+            self._token = self._atlas_http_json_req(
+                self.authUrl,
+                data_json={"key": self.apiKey},
+                headers={"Content-Type": "application/json"},
+                purpose_of_request="Get Access Token with API key",
+            )["access_token"]
+            self._token_time = time.time()
+        return self._token
 
     def _atlas_http_json_req(
         self,
@@ -191,6 +207,10 @@ class AtlasClient(AbstractClient):
         filter = {"$or": search_conditions}
         data["filter"] = filter
 
+        key = json.dumps(filter, sort_keys=True)
+        if key in self._results:
+            return dict(self._results[key])
+
         headers = {
             "Authorization": f"Bearer {self.get_token()}",
             "Content-Type": "application/json",
@@ -214,4 +234,5 @@ class AtlasClient(AbstractClient):
         for id, resource_list in resources_by_id.items():
             resources_by_id[id] = self.sort_resources(resource_list)[0]
 
-        return resources_by_id
+        self._results[key] = resources_by_id
+        return dict(resources_by_id)
@@ -0,0 +1,314 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Caching and indexing of the resources catalogs served by JSON data sources.
+
+A catalog fetched from a URL is cached on disk, in
+``GEM5_RESOURCE_CATALOG_DIR`` (by default ``~/.cache/gem5/catalogs``), so
+that the many gem5 processes of a sweep share a single download. A cached
+catalog younger than ``GEM5_RESOURCE_CATALOG_TTL`` seconds (by default 600)
+is used as is. An older one is revalidated with the server using its ETag
+and Last-Modified headers, and is only downloaded again if it has changed.
+Catalogs read from local files are not copied, but are only parsed again
+when the file is modified.
+
+Within a process, every catalog is parsed and indexed once, so looking up a
+resource does not scan the catalog.
+
+Only the catalogs of JSON data sources are cached. The ``AtlasClient``
+queries the database for each lookup rather than fetching a catalog, so its
+requests are not cached.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+from urllib import request
+from urllib.error import (
+    HTTPError,
+    URLError,
+)
+
+from m5.util import warn
+
+from .abstract_client import resource_sort_key
+
+# The default number of seconds a cached catalog is used without asking the
+# server whether it has changed.
+_DEFAULT_TTL = 600
+
+# The catalogs loaded by this process, keyed by their location. Each catalog
+# is stored along with the version of the file it was read from, or the time
+# it was fetched from its URL.
+_catalogs = {}
+
+
+class ResourceCatalog:
+    """
+    An index of a list of resources, by ID and resource version, answering
+    the queries of ``JSONClient.get_resources``.
+    """
+
+    def __init__(self, resources: List[Dict[str, Any]]):
+        """
+        :param resources: The resources, as they appear in the catalog.
+        """
+        self.resources = resources
+
+        # Every version of each resource, in catalog order. The versions of a
+        # resource are only sorted when it is first looked up, so a resource
+        # with malformed versions does not affect the others.
+        self._unsorted = {}
+        for resource in resources:
+            self._unsorted.setdefault(resource["id"], []).append(resource)
+
+        # Every version of each resource looked up so far, latest first.
+        # Resources with the same ID and version keep their order in the
+        # catalog.
+        self._by_id = {}
+        # The positions in ``_by_id`` of each version of each resource.
+        self._by_version = {}
+
+        self._lookups = {}
+
+    def find(
+        self,
+        resource_id: str,
+        resource_version: Optional[str] = None,
+        gem5_version: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Finds the latest version of a resource matching a query.
+
+        :param resource_id: The ID of the resource.
+        :param resource_version: The version of the resource. If ``None``, any
+                                 version matches.
+        :param gem5_version: The gem5 version the resource must be compatible
+                             with. If ``None`` or a "DEVELOP" version, any
+                             resource matches.
+
+        :return: The position of the resource in ``versions(resource_id)``,
+                 or ``None`` if no resource matches. Of two matches, the one
+                 at the lower position is the latest.
+        """
+        key = (resource_id, resource_version, gem5_version)
+        if key not in self._lookups:
+            versions = self.versions(resource_id)
+            if resource_version is None:
+                positions = range(len(versions))
+            else:
+                positions = self._by_version[resource_id].get(
+                    resource_version, []
+                )
+            self._lookups[key] = next(
+                (
+                    position
+                    for position in positions
+                    if self._is_compatible(versions[position], gem5_version)
+                ),
+                None,
+            )
+        return self._lookups[key]
+
+    def versions(self, resource_id: str) -> List[Dict[str, Any]]:
+        """
+        :return: Every version of a resource, latest first.
+        """
+        if resource_id not in self._unsorted:
+            return []
+        if resource_id not in self._by_id:
+            versions = sorted(
+                self._unsorted[resource_id],
+                key=resource_sort_key,
+                reverse=True,
+            )
+            positions = {}
+            for position, resource in enumerate(versions):
+                positions.setdefault(resource["resource_version"], []).append(
+                    position
+                )
+            self._by_id[resource_id] = versions
+            self._by_version[resource_id] = positions
+        return self._by_id[resource_id]
+
+    @staticmethod
+    def _is_compatible(
+        resource: Dict[str, Any], gem5_version: Optional[str]
+    ) -> bool:
+        return (
+            gem5_version is None
+            or gem5_version.startswith("DEVELOP")
+            or gem5_version in resource["gem5_versions"]
+        )
+
+
+def get_file_catalog(path: Path) -> ResourceCatalog:
+    """
+    Gets the catalog stored in a local JSON file.
+
+    :param path: The path of the file.
+    """
+    stat = path.stat()
+    key = str(path.resolve())
+    version = (stat.st_mtime_ns, stat.st_size)
+    if key not in _catalogs or _catalogs[key][0] != version:
+        # A catalog read from an earlier version of the file is replaced.
+        with open(path) as f:
+            _catalogs[key] = (version, ResourceCatalog(json.load(f)))
+    return _catalogs[key][1]
+
+
+def get_url_catalog(url: str) -> ResourceCatalog:
+    """
+    Gets the catalog served at a URL, from the on-disk cache if it is still
+    valid.
+
+    :param url: The URL of the catalog.
+    """
+    ttl = float(os.environ.get("GEM5_RESOURCE_CATALOG_TTL", _DEFAULT_TTL))
+    if url in _catalogs:
+        fetched, catalog = _catalogs[url]
+        if time.time() - fetched < ttl:
+            return catalog
+
+    cache_path = _get_cache_path(url)
+    cached = _read_cache(cache_path)
+    if cached is not None and time.time() - cached["fetched"] < ttl:
+        resources = cached["resources"]
+    else:
+        resources = _fetch(url, cache_path, cached)
+    catalog = ResourceCatalog(resources)
+    _catalogs[url] = (time.time(), catalog)
+    return catalog
+
+
+def _fetch(
+    url: str, cache_path: Optional[Path], cached: Optional[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Downloads the catalog served at a URL, unless the server reports it is
+    unchanged since it was cached, and updates the cache. If the server is
+    unreachable or fails with a server error, the cached catalog is used.
+    """
+    req = request.Request(url)
+    if cached is not None:
+        if cached["etag"]:
+            req.add_header("If-None-Match", cached["etag"])
+        if cached["last_modified"]:
+            req.add_header("If-Modified-Since", cached["last_modified"])
+    try:
+        response = request.urlopen(req)
+    except HTTPError as e:
+        if cached is None or (e.code != 304 and e.code < 500):
+            raise Exception(f"Unable to open Resources location '{url}': {e}")
+        if e.code != 304:
+            return _use_stale_cache(url, cache_path, cached, e)
+        entry = cached
+    except URLError as e:
+        if cached is None:
+            raise Exception(f"Unable to open Resources location '{url}': {e}")
+        return _use_stale_cache(url, cache_path, cached, e)
+    else:
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "resources": json.loads(response.read().decode("utf-8")),
+        }
+    entry["fetched"] = time.time()
+    _write_cache(cache_path, entry)
+    return entry["resources"]
+
+
+def _use_stale_cache(
+    url: str,
+    cache_path: Optional[Path],
+    cached: Dict[str, Any],
+    error: URLError,
+) -> List[Dict[str, Any]]:
+    """
+    Warns that the catalog served at a URL could not be fetched, and returns
+    the cached catalog in its place.
+    """
+    warn(
+        f"Unable to open Resources location '{url}': {error}\n"
+        f"Using the catalog cached at '{cache_path}' instead."
+    )
+    return cached["resources"]
+
+
+def _get_cache_path(url: str) -> Optional[Path]:
+    """
+    :return: The path of the file caching the catalog served at a URL, or
+             ``None`` if there is nowhere to cache it.
+    """
+    directory = Path(
+        os.environ.get(
+            "GEM5_RESOURCE_CATALOG_DIR",
+            Path.home() / ".cache" / "gem5" / "catalogs",
+        )
+    )
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return directory / (hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+
+def _read_cache(cache_path: Optional[Path]) -> Optional[Dict[str, Any]]:
+    if cache_path is None:
+        return None
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(cache_path: Optional[Path], entry: Dict[str, Any]) -> None:
+    """
+    Writes a catalog to the cache. The catalog is written to a temporary file
+    which is then renamed, so that other processes never read a partially
+    written catalog. Failing to write the cache is not an error.
+    """
+    if cache_path is None:
+        return
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
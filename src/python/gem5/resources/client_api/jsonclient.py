@@ -24,7 +24,6 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-import json
 from pathlib import Path
 from typing import (
     Any,
@@ -35,12 +34,12 @@ from typing import (
     Type,
     Union,
 )
-from urllib import request
-from urllib.error import URLError
-
-from m5.util import warn
 
 from .abstract_client import AbstractClient
+from .catalog import (
+    get_file_catalog,
+    get_url_catalog,
+)
 from .client_query import ClientQuery
 
 
@@ -52,23 +51,16 @@ class JSONClient(AbstractClient):
         :param path: The path to the Resource, either URL or local.
         """
         self.path = path
-        self.resources = []
 
         if Path(self.path).is_file():
-            self.resources = json.load(open(self.path))
+            self.catalog = get_file_catalog(Path(self.path))
         elif not self._url_validator(self.path):
             raise Exception(
                 f"Resources location '{self.path}' is not a valid path or URL."
             )
         else:
-            req = request.Request(self.path)
-            try:
-                response = request.urlopen(req)
-            except URLError as e:
-                raise Exception(
-                    f"Unable to open Resources location '{self.path}': {e}"
-                )
-            self.resources = json.loads(response.read().decode("utf-8"))
+            self.catalog = get_url_catalog(self.path)
+        self.resources = self.catalog.resources
 
     def get_resources_json(self) -> List[Dict[str, Any]]:
         """Returns a JSON representation of the resources."""
@@ -78,59 +70,20 @@ class JSONClient(AbstractClient):
         self,
         client_queries: List[ClientQuery],
     ) -> Dict[str, Any]:
-        def filter_resource(resource, client_queries):
-            for resource_query in client_queries:
-                gem5_version_match = False
-                resource_version_match = False
-
-                if (
-                    resource_query.get_gem5_version() is not None
-                    and not resource_query.get_gem5_version().startswith(
-                        "DEVELOP"
-                    )
-                ):
-                    gem5_version_match = (
-                        resource_query.get_gem5_version()
-                        in resource["gem5_versions"]
-                    )
-                else:
-                    gem5_version_match = True
-
-                if resource_query.get_resource_version() is not None:
-                    resource_version_match = (
-                        resource["resource_version"]
-                        == resource_query.get_resource_version()
-                    )
-                else:
-                    resource_version_match = True
-
-                resource_id_match = (
-                    resource_query.get_resource_id() == resource["id"]
-                )
-
-                if (
-                    gem5_version_match
-                    and resource_version_match
-                    and resource_id_match
-                ):
-                    return True
-
-            return False
-
-        filtered_resources = filter(
-            lambda resource: filter_resource(resource, client_queries),
-            self.resources,
-        )
-
-        resources_by_id = {}
-        for resource in filtered_resources:
-            if resource["id"] in resources_by_id.keys():
-                resources_by_id[resource["id"]].append(resource)
-            else:
-                resources_by_id[resource["id"]] = [resource]
-
-        # Sort the resoruces by resoruce version and get the latest version.
-        for id, resource_list in resources_by_id.items():
-            resources_by_id[id] = self.sort_resources(resource_list)[0]
+        # Of the resources matching any of the queries, return the latest
+        # version of each resource.
+        positions = {}
+        for client_query in client_queries:
+            id = client_query.get_resource_id()
+            position = self.catalog.find(
+                id,
+                client_query.get_resource_version(),
+                client_query.get_gem5_version(),
+            )
+            if position is not None:
+                positions[id] = min(positions.get(id, position), position)
 
-        return resources_by_id
+        return {
+            id: self.catalog.versions(id)[position]
+            for id, position in positions.items()
+        }
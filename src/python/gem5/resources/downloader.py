@@ -25,6 +25,7 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import gzip
+import hashlib
 import os
 import random
 import shutil
@@ -34,6 +35,7 @@ import urllib.parse
 import urllib.request
 from pathlib import Path
 from typing import (
+    BinaryIO,
     Dict,
     List,
     Optional,
@@ -44,25 +46,57 @@ from urllib.parse import urlparse
 from _m5 import core
 
 from ..utils.filelock import FileLock
-from ..utils.progress_bar import (
-    progress_hook,
-    tqdm,
-)
+from ..utils.progress_bar import tqdm
 from ..utils.socks_ssl_context import get_proxy_context
 from .client import get_resource_json_obj
 from .client import list_resources as client_list_resources
 from .md5_utils import (
-    md5_dir,
-    md5_file,
+    cached_md5,
+    store_cached_md5,
 )
+from .store import get_resource_store
 
 """
 This Python module contains functions used to download, list, and obtain
 information about resources from resources.gem5.org.
 """
 
+# Resources are read from their source in chunks of this many bytes.
+_READ_SIZE = 1024 * 1024
+
+# Resources are written in blocks of this many bytes. Blocks of all zeros are
+# skipped over rather than written, leaving holes in the file.
+_SPARSE_BLOCK_SIZE = 4096
+
+_ZERO_BLOCK = memoryview(bytes(_SPARSE_BLOCK_SIZE))
+
 
-def _download(url: str, download_to: str, max_attempts: int = 6) -> None:
+class ResourceMD5MismatchError(Exception):
+    """
+    Raised when the md5 value of an obtained resource does not match the
+    md5 value expected by its data source. The mismatched file has already
+    been removed when this is raised.
+    """
+
+    def __init__(self, resource_name: str, path: str, md5: str, expected: str):
+        self.resource_name = resource_name
+        self.path = path
+        self.md5 = md5
+        self.expected = expected
+        super().__init__(
+            f"The md5 value of the obtained resource '{resource_name}', "
+            f"{md5}, does not match the expected md5 value, {expected}. "
+            f"The file at '{path}' has been removed."
+        )
+
+
+def _download(
+    url: str,
+    download_to: str,
+    max_attempts: int = 6,
+    unzip: bool = False,
+    untar: bool = False,
+) -> Optional[str]:
     """
     Downloads a file.
 
@@ -76,6 +110,14 @@ def _download(url: str, download_to: str, max_attempts: int = 6) -> None:
     :param max_attempts: The max number of download attempts before stopping.
                          The default is 6. This translates to roughly 1 minute
                          of retrying before stopping.
+
+    :param unzip: If ``True``, the file is gunzipped as it is downloaded.
+
+    :param untar: If ``True``, the file is a tar archive, which is unpacked
+                  into the ``download_to`` directory as it is downloaded.
+
+    :returns: The md5 value of the file stored, or ``None`` if a tar archive
+              was unpacked.
     """
 
     # TODO: This whole setup will only work for single files we can get via
@@ -88,34 +130,18 @@ def _download(url: str, download_to: str, max_attempts: int = 6) -> None:
         # number of download attempts has been reached or if a HTTP status code
         # other than 408, 429, or 5xx is received.
         try:
-            proxy_context = get_proxy_context()
-            if proxy_context:
-                # get the file as a bytes blob
-                request = urllib.request.Request(url)
-                with urllib.request.urlopen(
-                    request, context=proxy_context
-                ) as fr:
-                    with tqdm.wrapattr(
-                        open(download_to, "wb"),
-                        "write",
-                        miniters=1,
-                        desc="Downloading {download_to}",
-                        total=getattr(fr, "length", None),
-                    ) as fw:
-                        for chunk in fr:
-                            fw.write(chunk)
-            else:
-                with tqdm(
-                    unit="B",
-                    unit_scale=True,
-                    unit_divisor=1024,
-                    miniters=1,
+            request = urllib.request.Request(url)
+            with urllib.request.urlopen(
+                request, context=get_proxy_context()
+            ) as fr:
+                return _write_resource(
+                    fr,
+                    download_to,
+                    unzip=unzip,
+                    untar=untar,
+                    total=getattr(fr, "length", None),
                     desc=f"Downloading {download_to}",
-                ) as t:
-                    urllib.request.urlretrieve(
-                        url, download_to, reporthook=progress_hook(t)
-                    )
-            return
+                )
         except HTTPError as e:
             # If the error code retrieved is retryable, we retry using a
             # Truncated Exponential backoff algorithm, truncating after
@@ -165,6 +191,109 @@ def _download(url: str, download_to: str, max_attempts: int = 6) -> None:
             )
 
 
+def _write_resource(
+    source: BinaryIO,
+    to_path: str,
+    unzip: bool,
+    untar: bool,
+    total: Optional[int],
+    desc: str,
+) -> Optional[str]:
+    """
+    Writes a resource read from a stream (e.g., an HTTP response) to the file
+    system, decompressing and unpacking it on the fly, so that it is never
+    stored in its compressed or archived form.
+
+    If anything fails, whatever was written is removed.
+
+    :param source: The stream the resource is read from.
+    :param to_path: The path the resource is to be stored at.
+    :param unzip: If ``True``, the stream is gunzipped.
+    :param untar: If ``True``, the stream is a tar archive, which is unpacked
+                  into the ``to_path`` directory.
+    :param total: The length of the stream, if known, for the progress bar.
+    :param desc: The description shown on the progress bar.
+
+    :returns: The md5 value of the file stored, or ``None`` if a tar archive
+              was unpacked.
+    """
+    try:
+        with tqdm.wrapattr(
+            source, "read", miniters=1, desc=desc, total=total
+        ) as source:
+            if unzip:
+                source = gzip.GzipFile(fileobj=source, mode="rb")
+            if untar:
+                _extract_tar_stream(source, to_path)
+                return None
+            return _write_sparse(source, to_path)
+    except BaseException:
+        if os.path.isdir(to_path):
+            shutil.rmtree(to_path, ignore_errors=True)
+        elif os.path.exists(to_path):
+            os.remove(to_path)
+        raise
+
+
+def _write_sparse(source: BinaryIO, to_path: str) -> str:
+    """
+    Writes a stream to a file, seeking over blocks of zeros rather than
+    writing them, so that the file is sparse (mostly-empty disk images take
+    only the space of their contents). The md5 value of the stream is
+    computed as it is written.
+
+    :returns: The md5 value of the file.
+    """
+    hash = hashlib.md5()
+    position = 0
+    with open(to_path, "wb") as f:
+        while True:
+            chunk = source.read(_READ_SIZE)
+            if not chunk:
+                break
+            hash.update(chunk)
+            view = memoryview(chunk)
+            while view:
+                # Blocks are aligned in the file, not in the chunk.
+                size = min(
+                    len(view),
+                    _SPARSE_BLOCK_SIZE - position % _SPARSE_BLOCK_SIZE,
+                )
+                if view[:size] == _ZERO_BLOCK[:size]:
+                    f.seek(size, os.SEEK_CUR)
+                else:
+                    f.write(view[:size])
+                position += size
+                view = view[size:]
+        # Seeking past the end does not extend the file, so trailing zeros
+        # are accounted for here.
+        f.truncate(position)
+    return hash.hexdigest()
+
+
+def _is_within_directory(directory: str, target: str) -> bool:
+    abs_directory = os.path.abspath(directory)
+    abs_target = os.path.abspath(target)
+
+    prefix = os.path.commonprefix([abs_directory, abs_target])
+
+    return prefix == abs_directory
+
+
+def _extract_tar_stream(source: BinaryIO, unpack_to: str) -> None:
+    """
+    Unpacks a tar archive read from a stream. As the archive cannot be read
+    twice, each member is checked to be within ``unpack_to`` as it is
+    extracted, rather than all members being checked first.
+    """
+    with tarfile.open(fileobj=source, mode="r|") as tar:
+        for member in tar:
+            member_path = os.path.join(unpack_to, member.name)
+            if not _is_within_directory(unpack_to, member_path):
+                raise Exception("Attempted Path Traversal in Tar File")
+            tar.extract(member, unpack_to)
+
+
 def list_resources(
     clients: Optional[List] = None, gem5_version: Optional[str] = None
 ) -> Dict[str, List[str]]:
@@ -240,6 +369,11 @@ def get_resource(
                        ``to_path`` but it does not have the correct md5 sum. An
                        exception will also be thrown is a directory is present
                        at ``to_path``.
+
+    :raises ResourceMD5MismatchError: If the md5 value of the downloaded or
+                                      copied file does not match the expected
+                                      md5 value. The file is removed, rather
+                                      than left at ``to_path``.
     """
 
     # We apply a lock for a specific resource. This is to avoid circumstances
@@ -256,17 +390,16 @@ def get_resource(
         )
 
         if os.path.exists(to_path):
-            if os.path.isfile(to_path):
-                md5 = md5_file(Path(to_path))
-            else:
-                md5 = md5_dir(Path(to_path))
+            # The md5 is only recomputed if the resource has changed since it
+            # was last verified.
+            md5 = cached_md5(Path(to_path))
 
             if md5 == resource_json["md5sum"]:
                 # In this case, the file has already been download, no need to
                 # do so again.
                 return
             elif download_md5_mismatch:
-                if os.path.isfile(to_path):
+                if os.path.isfile(to_path) or os.path.islink(to_path):
                     os.remove(to_path)
                 else:
                     shutil.rmtree(to_path)
@@ -276,7 +409,19 @@ def get_resource(
                     "its md5 value is invalid.".format(to_path)
                 )
 
-        download_dest = to_path
+        # If a resource store is configured and holds the resource, it only
+        # needs deploying to `to_path`.
+        store = get_resource_store()
+        if store is not None and store.deploy(
+            resource_json["md5sum"], Path(to_path)
+        ):
+            store_cached_md5(Path(to_path), resource_json["md5sum"])
+            if not quiet:
+                print(
+                    f"Resource '{resource_name}' deployed to '{to_path}' "
+                    f"from the resource store at '{store.root}'."
+                )
+            return
 
         # This if-statement is remain backwards compatable with the older,
         # string-based way of doing things. It can be refactored away over
@@ -304,14 +449,6 @@ def get_resource(
             and resource_json["is_tar_archive"]
         )
 
-        tar_extension = ".tar"
-        if run_tar_extract:
-            download_dest += tar_extension
-
-        zip_extension = ".gz"
-        if run_unzip:
-            download_dest += zip_extension
-
         file_uri_path = _file_uri_to_path(resource_json["url"])
         if file_uri_path:
             if not file_uri_path.exists():
@@ -322,71 +459,57 @@ def get_resource(
                 "Resource '{}' is being copied from '{}' to '{}'...".format(
                     resource_name,
                     urlparse(resource_json["url"]).path,
-                    download_dest,
+                    to_path,
                 )
             )
-            shutil.copy(file_uri_path, download_dest)
+            with open(file_uri_path, "rb") as source:
+                md5 = _write_resource(
+                    source,
+                    to_path,
+                    unzip=run_unzip,
+                    untar=run_tar_extract,
+                    total=file_uri_path.stat().st_size,
+                    desc=f"Copying {to_path}",
+                )
         else:
-            # TODO: Might be nice to have some kind of download status bar here..
             if not quiet:
                 print(
                     f"Resource '{resource_name}' was not found locally. "
-                    f"Downloading to '{download_dest}'..."
+                    f"Downloading to '{to_path}'..."
                 )
 
             # Get the URL.
             url = resource_json["url"]
 
-            _download(url=url, download_to=download_dest)
+            # The resource is decompressed and unpacked as it is downloaded.
+            md5 = _download(
+                url=url,
+                download_to=to_path,
+                unzip=run_unzip,
+                untar=run_tar_extract,
+            )
             if not quiet:
                 print(f"Finished downloading resource '{resource_name}'.")
 
-        if run_unzip:
-            if not quiet:
-                print(
-                    f"Decompressing resource '{resource_name}' "
-                    f"('{download_dest}')..."
-                )
-            unzip_to = download_dest[: -len(zip_extension)]
-            with gzip.open(download_dest, "rb") as f:
-                with open(unzip_to, "wb") as o:
-                    shutil.copyfileobj(f, o)
-            os.remove(download_dest)
-            download_dest = unzip_to
-            if not quiet:
-                print(f"Finished decompressing resource '{resource_name}'.")
-
-        if run_tar_extract:
-            if not quiet:
-                print(
-                    f"Unpacking the the resource '{resource_name}' "
-                    f"('{download_dest}')"
+        # The md5 of a file is computed as it is written, so it is verified
+        # here, and recorded so it need not be computed again. The md5 of an
+        # unpacked directory is computed when it is next needed.
+        if md5 is not None:
+            if md5 != resource_json["md5sum"]:
+                os.remove(to_path)
+                raise ResourceMD5MismatchError(
+                    resource_name, to_path, md5, resource_json["md5sum"]
                 )
-            unpack_to = download_dest[: -len(tar_extension)]
-            with tarfile.open(download_dest) as f:
-
-                def is_within_directory(directory, target):
-                    abs_directory = os.path.abspath(directory)
-                    abs_target = os.path.abspath(target)
-
-                    prefix = os.path.commonprefix([abs_directory, abs_target])
-
-                    return prefix == abs_directory
+            store_cached_md5(Path(to_path), md5)
 
-                def safe_extract(
-                    tar, path=".", members=None, *, numeric_owner=False
-                ):
-                    for member in tar.getmembers():
-                        member_path = os.path.join(path, member.name)
-                        if not is_within_directory(path, member_path):
-                            raise Exception(
-                                "Attempted Path Traversal in Tar File"
-                            )
-
-                    tar.extractall(path, members, numeric_owner=numeric_owner)
-
-                safe_extract(f, unpack_to)
-            os.remove(download_dest)
+        if store is not None:
+            # The md5 value of an unpacked directory is computed before it is
+            # shared with others.
+            if md5 is None:
+                md5 = cached_md5(Path(to_path))
+            if md5 == resource_json["md5sum"]:
+                store.add(Path(to_path), md5)
+                store_cached_md5(Path(to_path), md5)
 
 
 def _file_uri_to_path(uri: str) -> Optional[Path]:
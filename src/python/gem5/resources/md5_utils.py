@@ -26,8 +26,32 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Type
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+
+# Files are hashed in reads of this many bytes.
+_READ_SIZE = 1024 * 1024
+
+# When hashing a directory, files smaller than this are read whole, ahead of
+# being hashed, by a pool of threads. Larger files are streamed.
+_PREFETCH_SIZE = 8 * 1024 * 1024
+
+# The most bytes of read-ahead file contents held in memory at once.
+_PREFETCH_WINDOW = 128 * 1024 * 1024
+
+# The suffix of the sidecar file in which ``cached_md5`` stores the md5 of a
+# file or directory, along with the file system metadata it was computed from.
+_CACHE_SUFFIX = ".md5cache"
 
 
 def _md5_update_from_file(
@@ -50,21 +74,67 @@ def _md5_update_from_file(
         desc=f"Computing md5sum on {filename}",
         total=filename.stat().st_size,
     ) as f:
-        for chunk in iter(lambda: f.read(4096), b""):
+        for chunk in iter(lambda: f.read(_READ_SIZE), b""):
             hash.update(chunk)
     return hash
 
 
+def _md5_dir_entries(directory: Path) -> List[Tuple[bytes, Optional[Path]]]:
+    """Return, in the order they are hashed, the name of every entry under
+    the directory and, for files, the path whose contents follow the name."""
+    entries = []
+    for path in sorted(directory.iterdir(), key=lambda p: str(p).lower()):
+        if path.is_file():
+            entries.append((path.name.encode(), path))
+        else:
+            entries.append((path.name.encode(), None))
+            if path.is_dir():
+                entries.extend(_md5_dir_entries(path))
+    return entries
+
+
 def _md5_update_from_dir(
-    directory: Path, hash: Type[hashlib.md5]
+    directory: Path,
+    hash: Type[hashlib.md5],
+    max_workers: Optional[int] = None,
 ) -> Type[hashlib.md5]:
     assert directory.is_dir()
-    for path in sorted(directory.iterdir(), key=lambda p: str(p).lower()):
-        hash.update(path.name.encode())
-        if path.is_file():
-            hash = _md5_update_from_file(path, hash)
-        elif path.is_dir():
-            hash = _md5_update_from_dir(path, hash)
+
+    # The digest depends on the order the names and contents are fed to the
+    # hash, so it cannot be split across threads. Instead, a pool of threads
+    # reads small files ahead of time (which is where the time goes for
+    # directories of many files) and the contents are hashed here, in order.
+    entries = _md5_dir_entries(directory)
+    sizes = [path.stat().st_size if path else 0 for _, path in entries]
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+    prefetched = {}
+    prefetched_bytes = 0
+    ahead = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for index, (name, path) in enumerate(entries):
+            ahead = max(ahead, index)
+            while (
+                ahead < len(entries)
+                and prefetched_bytes < _PREFETCH_WINDOW
+                and len(prefetched) < max_workers * 16
+            ):
+                if (
+                    entries[ahead][1] is not None
+                    and sizes[ahead] < _PREFETCH_SIZE
+                ):
+                    prefetched[ahead] = executor.submit(
+                        entries[ahead][1].read_bytes
+                    )
+                    prefetched_bytes += sizes[ahead]
+                ahead += 1
+
+            hash.update(name)
+            if index in prefetched:
+                hash.update(prefetched.pop(index).result())
+                prefetched_bytes -= sizes[index]
+            elif path is not None:
+                hash = _md5_update_from_file(path, hash)
     return hash
 
 
@@ -93,15 +163,118 @@ def md5_file(filename: Path) -> str:
     return str(_md5_update_from_file(filename, hashlib.md5()).hexdigest())
 
 
-def md5_dir(directory: Path) -> str:
+def md5_dir(directory: Path, max_workers: Optional[int] = None) -> str:
     """
     Gives the md5 value of a directory.
 
     This is achieved by getting the md5 hash of all files in the directory.
+    Files are read concurrently, but hashed in a fixed order, so the value
+    does not depend on the number of threads used.
 
     .. note::
 
         The path of files are also hashed so the md5 of the directory changes
         if empty files are included or filenames are changed.
+
+    :param directory: The directory to get the md5 of.
+    :param max_workers: The number of threads reading files. If ``None``, the
+                        same default as
+                        ``concurrent.futures.ThreadPoolExecutor`` is used.
+    """
+    return str(
+        _md5_update_from_dir(
+            directory, hashlib.md5(), max_workers=max_workers
+        ).hexdigest()
+    )
+
+
+def _stat_key(path: Path) -> Dict[str, Any]:
+    """Return the file system metadata which, while unchanged, shows the
+    contents of the path are unchanged."""
+    st = path.stat()
+    key = {
+        "inode": st.st_ino,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+    }
+    if path.is_dir():
+        # Modifying a file does not change the metadata of the directory it
+        # is in, so a directory is keyed on the metadata of all its contents.
+        contents = hashlib.md5()
+        for entry in sorted(path.rglob("*")):
+            st = entry.stat()
+            contents.update(
+                f"{entry.relative_to(path)}:{st.st_ino}:{st.st_size}:"
+                f"{st.st_mtime_ns}\n".encode()
+            )
+        key["contents"] = contents.hexdigest()
+    return key
+
+
+def cached_md5(path: Path) -> str:
+    """
+    Gets the md5 value of a file or directory, as ``md5`` does, but avoids
+    rehashing a path whose contents have not changed.
+
+    The md5 value is cached in a sidecar file next to the path (the path with
+    ".md5cache" appended), keyed by the path and its inode, size and
+    modification time. If the key is unchanged the cached value is returned,
+    otherwise the path is hashed and the cache updated. Failing to write the
+    cache (e.g., the directory is read-only) is not an error.
+
+    :param path: The path to get the md5 of.
     """
-    return str(_md5_update_from_dir(directory, hashlib.md5()).hexdigest())
+    path = Path(path)
+    cache_path = path.with_name(path.name + _CACHE_SUFFIX)
+
+    try:
+        key = _stat_key(path)
+    except OSError:
+        return md5(path)
+    key["path"] = str(path.resolve())
+
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if cached["key"] == key:
+            return cached["md5"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    value = md5(path)
+
+    try:
+        # Only cache the value if the path did not change while it was being
+        # hashed.
+        after = _stat_key(path)
+        after["path"] = key["path"]
+        if after == key:
+            _write_cache(cache_path, key, value)
+    except OSError:
+        pass
+
+    return value
+
+
+def store_cached_md5(path: Path, value: str) -> None:
+    """
+    Records the md5 value of a file or directory, already known (e.g., it was
+    computed while the file was written), for ``cached_md5`` to return.
+
+    :param path: The path the md5 value is of.
+    :param value: The md5 value.
+    """
+    path = Path(path)
+    try:
+        key = _stat_key(path)
+        key["path"] = str(path.resolve())
+        _write_cache(path.with_name(path.name + _CACHE_SUFFIX), key, value)
+    except OSError:
+        pass
+
+
+def _write_cache(cache_path: Path, key: Dict[str, Any], value: str) -> None:
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"key": key, "md5": value}, f)
+    os.replace(tmp_path, cache_path)
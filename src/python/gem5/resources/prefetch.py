@@ -0,0 +1,222 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Obtain many resources at once, ahead of the simulations which use them.
+
+``obtain_resource`` resolves and downloads resources one at a time, when a
+simulation first needs them. When many simulations start on a cold cache
+(e.g., a MultiSim sweep), each one queries the resource catalog and downloads
+its resources in turn. ``prefetch_resources`` instead resolves a list of
+resources with a single catalog query, and downloads them concurrently into
+the resource directory, so that the simulations later find them there.
+"""
+
+import ast
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from _m5 import core
+
+from .client import get_multiple_resource_json_obj
+from .client_api.client_query import ClientQuery
+from .downloader import get_resource
+from .resource import _get_default_resource_dir
+
+
+def prefetch_resources(
+    resources: Iterable[Union[str, Tuple[str, Optional[str]]]],
+    resource_directory: Optional[str] = None,
+    max_workers: int = 4,
+    download_md5_mismatch: bool = True,
+    clients: Optional[List[str]] = None,
+    gem5_version: Optional[str] = core.gem5Version,
+    quiet: bool = False,
+) -> Dict[str, str]:
+    """
+    Downloads resources into the resource directory, where ``obtain_resource``
+    finds them.
+
+    Workloads and suites are expanded into the resources they use.
+
+    :param resources: The resources to download, each given by its ID, or by
+                      a tuple of its ID and version. If the version is not
+                      given, the latest compatible version is downloaded.
+    :param resource_directory: The directory the resources are downloaded
+                               to. If not set, the ``GEM5_RESOURCE_DIR``
+                               environment variable is used, and if that is
+                               not set, the default resource directory.
+    :param max_workers: The number of resources downloaded at once.
+    :param download_md5_mismatch: If a resource is present, but does not have
+                                  the correct md5 value, the resource will be
+                                  deleted and re-downloaded if this value is
+                                  ``True``. Otherwise an exception will be
+                                  thrown.
+    :param clients: A list of clients to search for the resources. If not
+                    set, all clients are searched.
+    :param gem5_version: The gem5 version to use to filter incompatible
+                         resource versions. By default set to the current gem5
+                         version.
+    :param quiet: If ``True``, suppress output. ``False`` by default.
+
+    :returns: A dictionary mapping the ID of each resource downloaded to its
+              local path.
+    """
+    if resource_directory is None:
+        resource_directory = os.getenv(
+            "GEM5_RESOURCE_DIR", _get_default_resource_dir()
+        )
+    os.makedirs(resource_directory, exist_ok=True)
+
+    to_download = {}
+    queries = [
+        (
+            ClientQuery(resource, gem5_version=gem5_version)
+            if isinstance(resource, str)
+            else ClientQuery(resource[0], resource[1], gem5_version)
+        )
+        for resource in resources
+    ]
+    # Workloads and suites refer to other resources by ID and version, so
+    # each level of the hierarchy takes one more query of the catalog.
+    while queries:
+        resource_jsons = get_multiple_resource_json_obj(queries, clients)
+        queries = []
+        for resource_json in resource_jsons:
+            if resource_json["category"] == "suite":
+                references = resource_json["workloads"]
+            elif resource_json["category"] == "workload":
+                references = resource_json["resources"].values()
+            else:
+                references = []
+            queries.extend(
+                ClientQuery(
+                    reference["id"],
+                    reference["resource_version"],
+                    gem5_version,
+                )
+                for reference in references
+            )
+
+            if not resource_json.get("url"):
+                continue
+            id = resource_json["id"]
+            version = resource_json["resource_version"]
+            if id in to_download and to_download[id] != version:
+                raise Exception(
+                    f"Resource '{id}' is required at both version "
+                    f"'{to_download[id]}' and version '{version}', but both "
+                    "would be downloaded to the same path."
+                )
+            to_download[id] = version
+
+    def download(id: str) -> str:
+        to_path = os.path.join(resource_directory, id)
+        get_resource(
+            resource_name=id,
+            to_path=to_path,
+            download_md5_mismatch=download_md5_mismatch,
+            resource_version=to_download[id],
+            clients=clients,
+            gem5_version=gem5_version,
+            quiet=quiet,
+        )
+        return to_path
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {id: executor.submit(download, id) for id in to_download}
+
+    local_paths = {}
+    errors = []
+    for id, future in futures.items():
+        try:
+            local_paths[id] = future.result()
+        except Exception as e:
+            errors.append(f"{id}: {e}")
+    if errors:
+        raise Exception(
+            "The following resources could not be obtained:\n"
+            + "\n".join(errors)
+        )
+    return local_paths
+
+
+def find_resources_in_config(
+    config_path: Path,
+) -> List[Tuple[str, Optional[str]]]:
+    """
+    Finds the resources a config script obtains, without running it.
+
+    Only calls of ``obtain_resource`` (and of the legacy ``Resource``) with
+    the resource ID, and version if any, given as literal strings are found.
+
+    :param config_path: The path of the config script.
+
+    :returns: The ID and version (``None`` if not given) of each resource.
+    """
+    tree = ast.parse(Path(config_path).read_text(), str(config_path))
+
+    def literal(node: Optional[ast.AST]) -> Optional[str]:
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return node.value
+        return None
+
+    calls = sorted(
+        (node for node in ast.walk(tree) if isinstance(node, ast.Call)),
+        key=lambda node: (node.lineno, node.col_offset),
+    )
+    found = []
+    for node in calls:
+        if isinstance(node.func, ast.Attribute):
+            name = node.func.attr
+        elif isinstance(node.func, ast.Name):
+            name = node.func.id
+        else:
+            continue
+        if name not in ("obtain_resource", "Resource"):
+            continue
+
+        keywords = {keyword.arg: keyword.value for keyword in node.keywords}
+        id = literal(
+            keywords.get("resource_id")
+            or keywords.get("resource_name")
+            or (node.args[0] if node.args else None)
+        )
+        if id is None:
+            continue
+        resource = (id, literal(keywords.get("resource_version")))
+        if resource not in found:
+            found.append(resource)
+    return found
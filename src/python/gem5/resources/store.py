@@ -0,0 +1,369 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+A content-addressed store of resources, shared between resource directories.
+
+Resources are obtained to a path (by default, in the resource directory), so
+every user, and every resource directory, holds its own copy of the same
+kernels and disk images. When the ``GEM5_RESOURCE_STORE`` environment
+variable is set to a directory, resources are also kept there, keyed by their
+md5 value, and obtaining a resource already in the store only deploys it to
+its path by linking to the store's copy.
+
+The following environment variables configure the store:
+
+* ``GEM5_RESOURCE_STORE``: The directory of the store.
+* ``GEM5_RESOURCE_STORE_SIZE``: The space (e.g., "200GiB") the store may take
+  up. When it is exceeded, the least recently used resources which are not
+  deployed anywhere are removed. By default, the size is not limited.
+* ``GEM5_RESOURCE_STORE_LINK``: How resources are deployed: "reflink" (a
+  copy-on-write copy, on file systems supporting it), "hardlink", "symlink"
+  or "copy". By default, the first of these which works is used.
+
+Resources in the store are made read-only, so that a resource deployed by a
+hard link or a symbolic link cannot be modified through its path.
+"""
+
+import fcntl
+import json
+import os
+import shutil
+import stat
+import threading
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+
+from ..utils.filelock import FileLock
+
+# The ways in which a resource can be deployed from the store, in the order
+# they are tried if the way is not specified.
+LINK_MODES = ("reflink", "hardlink", "symlink", "copy")
+
+# The ioctl request to clone a file (Linux's FICLONE).
+_FICLONE = 0x40049409
+
+
+class ResourceStore:
+    """
+    A directory of resources keyed by their md5 value.
+
+    The store's index records, for each resource, the space it takes up, when
+    it was last used, and the paths it is deployed to by a hard link or a
+    symbolic link (its references). Copies, including reflinks, do not refer
+    to the store.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        size_cap: Optional[int] = None,
+        link_mode: Optional[str] = None,
+    ):
+        """
+        :param root: The directory of the store.
+        :param size_cap: The space, in bytes, the store may take up. If
+                         ``None``, it is not limited.
+        :param link_mode: One of ``LINK_MODES``, or ``None`` to use the first
+                          which works.
+        """
+        if link_mode is not None and link_mode not in LINK_MODES:
+            raise Exception(
+                f"Unknown resource store link mode '{link_mode}'. Expected "
+                f"one of: {', '.join(LINK_MODES)}."
+            )
+        self.root = Path(root).absolute()
+        self.size_cap = size_cap
+        self.link_mode = link_mode
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+
+    def _object_path(self, md5: str) -> Path:
+        return self.root / "objects" / md5[:2] / md5
+
+    def _lock(self) -> FileLock:
+        return FileLock(str(self.root / "store"), timeout=900)
+
+    def _read_index(self) -> Dict[str, Any]:
+        try:
+            with open(self.root / "index.json") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"objects": {}}
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        tmp_path = self.root / f"index.json.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=4)
+        os.replace(tmp_path, self.root / "index.json")
+
+    def contains(self, md5: str) -> bool:
+        """
+        :returns: ``True`` if the resource with this md5 value is in the
+                  store.
+        """
+        return (
+            md5 in self._read_index()["objects"]
+            and self._object_path(md5).exists()
+        )
+
+    def deploy(self, md5: str, to_path: Path) -> bool:
+        """
+        Deploys the resource with this md5 value to a path, if it is in the
+        store.
+
+        :param md5: The md5 value of the resource.
+        :param to_path: The path, which must not exist, to deploy to.
+
+        :returns: ``True`` if the resource was deployed, ``False`` if it is
+                  not in the store.
+        """
+        with self._lock():
+            index = self._read_index()
+            if not self._deploy(index, md5, Path(to_path)):
+                return False
+            self._write_index(index)
+        return True
+
+    def _deploy(self, index: Dict[str, Any], md5: str, to_path: Path) -> bool:
+        entry = index["objects"].get(md5)
+        obj = self._object_path(md5)
+        if entry is None or not obj.exists():
+            index["objects"].pop(md5, None)
+            return False
+
+        mode = _link(obj, to_path, self.link_mode)
+        if mode in ("hardlink", "symlink"):
+            entry["refs"][str(to_path.absolute())] = mode
+        entry["last_used"] = time.time()
+        return True
+
+    def add(self, path: Path, md5: str) -> None:
+        """
+        Moves a resource into the store, and deploys it back to its path.
+
+        The caller is responsible for the md5 value being that of the
+        resource.
+
+        :param path: The path of the resource.
+        :param md5: The md5 value of the resource.
+        """
+        path = Path(path)
+        obj = self._object_path(md5)
+        obj.parent.mkdir(parents=True, exist_ok=True)
+
+        # The resource is staged into the store's file system before the
+        # store is locked, as that may mean copying it.
+        staged = obj.with_name(
+            f"{md5}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            os.replace(path, staged)
+        except OSError:
+            if path.is_dir():
+                shutil.copytree(path, staged, symlinks=True)
+                shutil.rmtree(path)
+            else:
+                shutil.copy2(path, staged)
+                os.remove(path)
+        _make_read_only(staged)
+
+        with self._lock():
+            index = self._read_index()
+            if md5 in index["objects"] and obj.exists():
+                # Another process added the same resource first.
+                _remove(staged)
+            else:
+                if obj.exists():
+                    _remove(obj)
+                os.replace(staged, obj)
+                index["objects"][md5] = {
+                    "size": _disk_usage(obj),
+                    "last_used": time.time(),
+                    "refs": {},
+                }
+            self._deploy(index, md5, path)
+            if self.size_cap is not None:
+                self._collect(index, self.size_cap)
+            self._write_index(index)
+
+    def gc(self, size_cap: Optional[int] = None) -> List[str]:
+        """
+        Removes the least recently used resources which are not deployed by
+        a hard link or symbolic link until the store fits within a size.
+
+        :param size_cap: The space, in bytes, the store may take up. If
+                         ``None``, the store's size cap is used, and if that
+                         too is ``None``, only the references which no longer
+                         exist are dropped.
+
+        :returns: The md5 values of the resources removed.
+        """
+        if size_cap is None:
+            size_cap = self.size_cap
+        with self._lock():
+            index = self._read_index()
+            removed = self._collect(index, size_cap)
+            self._write_index(index)
+        return removed
+
+    def _collect(
+        self, index: Dict[str, Any], size_cap: Optional[int]
+    ) -> List[str]:
+        objects = index["objects"]
+        for md5, entry in objects.items():
+            obj = self._object_path(md5)
+            entry["refs"] = {
+                path: mode
+                for path, mode in entry["refs"].items()
+                if _is_deployed(obj, Path(path), mode)
+            }
+
+        removed = []
+        if size_cap is None:
+            return removed
+        total = sum(entry["size"] for entry in objects.values())
+        for md5 in sorted(objects, key=lambda md5: objects[md5]["last_used"]):
+            if total <= size_cap:
+                break
+            if objects[md5]["refs"]:
+                continue
+            _remove(self._object_path(md5))
+            total -= objects[md5]["size"]
+            removed.append(md5)
+        for md5 in removed:
+            del objects[md5]
+        return removed
+
+
+def get_resource_store() -> Optional[ResourceStore]:
+    """
+    :returns: The resource store configured by the environment, or ``None``
+              if ``GEM5_RESOURCE_STORE`` is not set.
+    """
+    if not os.environ.get("GEM5_RESOURCE_STORE"):
+        return None
+
+    size_cap = None
+    if os.environ.get("GEM5_RESOURCE_STORE_SIZE"):
+        from m5.util.convert import toMemorySize
+
+        size_cap = toMemorySize(os.environ["GEM5_RESOURCE_STORE_SIZE"])
+
+    return ResourceStore(
+        root=Path(os.environ["GEM5_RESOURCE_STORE"]),
+        size_cap=size_cap,
+        link_mode=os.environ.get("GEM5_RESOURCE_STORE_LINK") or None,
+    )
+
+
+def _link(obj: Path, to_path: Path, link_mode: Optional[str]) -> str:
+    """
+    Deploys a resource in the store to a path.
+
+    :returns: The way in which the resource was deployed.
+    """
+    modes = LINK_MODES if link_mode is None else (link_mode,)
+    for mode in modes:
+        try:
+            if mode == "symlink":
+                os.symlink(obj, to_path, target_is_directory=obj.is_dir())
+            elif obj.is_dir():
+                shutil.copytree(
+                    obj,
+                    to_path,
+                    symlinks=True,
+                    copy_function=_COPY_FUNCTIONS[mode],
+                )
+            else:
+                _COPY_FUNCTIONS[mode](obj, to_path)
+            return mode
+        except OSError:
+            if mode == modes[-1]:
+                raise
+            _remove(to_path)
+    assert False
+
+
+def _reflink(src: str, dst: str) -> None:
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+
+
+def _copy(src: str, dst: str) -> None:
+    # Copies of a read-only resource in the store are writable.
+    shutil.copyfile(src, dst)
+
+
+_COPY_FUNCTIONS = {
+    "reflink": _reflink,
+    "hardlink": os.link,
+    "copy": _copy,
+}
+
+
+def _is_deployed(obj: Path, path: Path, mode: str) -> bool:
+    """
+    :returns: ``True`` if a path still refers to a resource in the store.
+    """
+    if mode == "symlink":
+        return path.is_symlink() and os.readlink(path) == str(obj)
+    if obj.is_dir():
+        return path.is_dir() and not path.is_symlink()
+    return path.exists() and obj.exists() and os.path.samefile(obj, path)
+
+
+def _make_read_only(path: Path) -> None:
+    """
+    Removes write permission from a file, or from the files in a directory.
+    Directories are left writable so the resource can be removed.
+    """
+    paths = list(path.rglob("*")) + [path] if path.is_dir() else [path]
+    for p in paths:
+        if p.is_file() and not p.is_symlink():
+            mode = p.stat().st_mode
+            p.chmod(mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+def _disk_usage(path: Path) -> int:
+    """
+    :returns: The space, in bytes, a file or directory takes up. Holes in
+              sparse files do not take up space.
+    """
+    paths = list(path.rglob("*")) + [path] if path.is_dir() else [path]
+    return sum(p.lstat().st_blocks * 512 for p in paths if not p.is_symlink())
+
+
+def _remove(path: Path) -> None:
+    if path.is_symlink() or path.is_file():
+        path.unlink()
+    elif path.is_dir():
+        shutil.rmtree(path)
@@ -52,8 +52,70 @@ def main():
         help="The path to the config script specifying the simulations to run using multisim.",
     )
 
+    parser.add_argument(
+        "--fork-server",
+        action="store_true",
+        help="Load the config script once and fork a worker per simulation "
+        "from it, rather than spawning a new gem5 process per simulation.",
+    )
+
+    parser.add_argument(
+        "--memory-budget",
+        type=str,
+        default=None,
+        help="The host memory the running simulations may use in total "
+        "(e.g., '64GiB'). Simulations are only started while their estimated "
+        "memory fits in the budget. By default memory is not limited.",
+    )
+    parser.add_argument(
+        "--history",
+        type=str,
+        default=None,
+        help="A JSON file of the wall-clock runtimes of previous runs, keyed "
+        "by simulation id, used to start the longest simulations first. It "
+        "is updated with the runtimes of this run.",
+    )
+
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Run every simulation, including those the completion journal "
+        "in the output directory records as complete.",
+    )
+
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=5.0,
+        help="How often, in seconds, to gather the progress of the running "
+        "simulations into 'multisim-status.json' in the output directory "
+        "(and display it, if attached to a terminal). 0 disables this.",
+    )
+
+    parser.add_argument(
+        "--prefetch-resources",
+        action="store_true",
+        help="Download the resources the config script obtains, "
+        "concurrently, before starting any simulation.",
+    )
+
     args = parser.parse_args()
-    run(module_path=Path(args.config))
+
+    memory_budget = None
+    if args.memory_budget:
+        from m5.util.convert import toMemorySize
+
+        memory_budget = toMemorySize(args.memory_budget)
+
+    run(
+        module_path=Path(args.config),
+        fork_server=args.fork_server,
+        memory_budget=memory_budget,
+        history=Path(args.history) if args.history else None,
+        resume=not args.no_resume,
+        progress_interval=args.progress_interval,
+        prefetch=args.prefetch_resources,
+    )
 
 
 if __name__ == "__m5_main__":
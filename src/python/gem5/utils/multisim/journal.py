@@ -0,0 +1,158 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+The MultiSim completion journal.
+
+As each simulator of a MultiSim sweep finishes, a line is appended to a JSON
+lines journal in the output directory recording the simulator's id, a hash
+of its configuration, its exit code and exit cause, its wall-clock time and a
+checksum of its stats file. When the sweep is run again, a simulator is
+skipped if the journal says it exited successfully, its configuration hash is
+unchanged and its stats file is still the one that was recorded.
+
+The configuration hash covers the contents of the config script and the
+simulator id: MultiSim config scripts are parameterless, so any change to a
+simulator's configuration is a change to the script. As a result, editing
+the script reruns every simulator in it.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+
+# The name of the file, in a simulator's output directory, in which the
+# simulator records why its simulation exited.
+EXIT_CAUSE_FILE = "multisim_exit.json"
+
+
+def write_exit_cause(outdir: Path, cause: str) -> None:
+    """Record, in the simulator's output directory, why its simulation
+    exited. This is called in the process running the simulator."""
+    with open(Path(outdir) / EXIT_CAUSE_FILE, "w") as f:
+        json.dump({"exit_cause": cause}, f)
+
+
+def _read_exit_cause(outdir: Path) -> Optional[str]:
+    try:
+        with open(Path(outdir) / EXIT_CAUSE_FILE) as f:
+            return json.load(f)["exit_cause"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _file_checksum(path: Path) -> Optional[str]:
+    if not os.path.isfile(path):
+        return None
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def stats_file_name(stats_file: str) -> str:
+    """Return the file name in a gem5 `--stats-file` argument, which may be
+    a URL such as "text://stats.txt?desc=False"."""
+    if "://" in stats_file:
+        stats_file = stats_file.split("://", 1)[1]
+    return stats_file.split("?", 1)[0]
+
+
+class Journal:
+    """The completion journal of a MultiSim sweep."""
+
+    def __init__(
+        self, path: Path, config_path: Path, outdir: Path, stats_file: str
+    ) -> None:
+        """
+        :param path: The path of the journal file.
+        :param config_path: The path of the config script of the sweep.
+        :param outdir: The output directory of the sweep. Each simulator's
+                       output is in the subdirectory named after its id.
+        :param stats_file: The gem5 `--stats-file` argument.
+        """
+        self._path = Path(path)
+        self._outdir = Path(outdir)
+        self._stats_file = stats_file_name(stats_file)
+        with open(config_path, "rb") as f:
+            self._config_digest = hashlib.sha256(f.read()).hexdigest()
+
+    def config_hash(self, id: str) -> str:
+        """Return the configuration hash of the simulator with the id."""
+        return hashlib.sha256(
+            f"{self._config_digest}:{id}".encode()
+        ).hexdigest()
+
+    def _stats_path(self, id: str) -> Path:
+        return self._outdir / id / self._stats_file
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """Return the latest journal entry of each simulator, keyed by id.
+        A line left incomplete by an interrupted write is ignored."""
+        entries = {}
+        if not self._path.exists():
+            return entries
+        with open(self._path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries[entry["id"]] = entry
+        return entries
+
+    def completed(self) -> Dict[str, Dict[str, Any]]:
+        """Return the journal entries, keyed by id, of the simulators which
+        do not need to be run again."""
+        return {
+            id: entry
+            for id, entry in self.entries().items()
+            if entry["exit_code"] == 0
+            and entry["config_hash"] == self.config_hash(id)
+            and entry["stats_checksum"] == _file_checksum(self._stats_path(id))
+        }
+
+    def record(self, id: str, exit_code: int, wall_time: float) -> None:
+        """Append the outcome of a finished simulator to the journal."""
+        entry = {
+            "id": id,
+            "config_hash": self.config_hash(id),
+            "exit_code": exit_code,
+            "exit_cause": _read_exit_cause(self._outdir / id),
+            "wall_time": wall_time,
+            "stats_checksum": _file_checksum(self._stats_path(id)),
+        }
+        with open(self._path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
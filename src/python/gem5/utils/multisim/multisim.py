@@ -47,28 +47,82 @@ config script is passed as a string referencing the config script as a module.
 This script is then passed to the child processes to load.
 
 2. The config script cannot accept parameters. It must be parameterless.
+
+Fork-server mode
+----------------
+
+By default every simulation is run in a freshly spawned gem5 process which
+loads the config script again. With ``run(..., fork_server=True)`` (or
+``--fork-server`` on the command line) a single spawned gem5 process loads the
+config script once and then forks a worker per simulator id. The workers
+start from the already loaded (but not instantiated) configuration, so the
+per-simulation start-up cost of importing gem5 and loading the config script
+is paid only once for the whole sweep.
+
+Resuming a sweep
+----------------
+
+As each simulation finishes, MultiSim records its outcome in a completion
+journal, "multisim-journal.jsonl", in the output directory. When a sweep is
+run again, simulations the journal records as complete, with an unchanged
+config, are skipped (see `gem5.utils.multisim.journal`). Pass `resume=False`
+(or `--no-resume`) to run every simulation.
+
+Monitoring progress
+-------------------
+
+Each simulation periodically writes its current tick, committed instructions
+and host time to "simulator-status.json" in its output directory. These are
+gathered into "multisim-status.json" in the output directory of the sweep,
+and shown as a table when MultiSim is attached to a terminal (see
+`gem5.utils.multisim.progress`).
 """
 
 import importlib
 import multiprocessing
+import time
+from multiprocessing.connection import wait
 from pathlib import Path
 from typing import (
+    Callable,
+    Dict,
+    List,
     Optional,
     Set,
+    Tuple,
+)
+
+from .journal import (
+    Journal,
+    write_exit_cause,
+)
+from .progress import (
+    ProgressMonitor,
+    StatusReporter,
+)
+from .scheduler import (
+    JobScheduler,
+    SimulatorJob,
+    load_history,
+    save_history,
 )
 
 # A global variable which __main__.py flips to `True` when multisim is run as
 # an executable module.
 module_run = False
 
-# A global variable to store the simulators to run in parallel. If `None`, then
-# `None` is passed to the `multiprocessing.Pool` which instructs
-# multiprocessing to use the maximum number of available threads.
-# threads.
+# A global variable to store the number of simulators to run in parallel. If
+# `None`, then the number of available threads is used.
 _num_processes = None
 
 _multi_sim: Set["Simulator"] = set()
 
+# The name of the completion journal in the output directory.
+JOURNAL_FILE = "multisim-journal.jsonl"
+
+# The cost hints passed to `add_simulator`, keyed by simulator id.
+_cost_hints: Dict[str, Dict[str, Optional[float]]] = {}
+
 
 def _load_module(module_path: Path) -> None:
     """Load the module at the given path."""
@@ -154,31 +208,339 @@ def get_num_processes(config_module_path: Path) -> Optional[int]:
     return num_processes_dict["num_processes"]
 
 
+def _get_simulator(id: str) -> "Simulator":
+    """Return the loaded simulator with the ID specified."""
+
+    global _multi_sim
+    sim_list = [sim for sim in _multi_sim if sim.get_id() == id]
+
+    assert len(sim_list) != 0, f"No simulator with id '{id}' found."
+    assert len(sim_list) == 1, f"Multiple simulators with id '{id}' found."
+    return sim_list[0]
+
+
+def _run_simulator(simulator: "Simulator") -> None:
+    """Run the simulator in its own subdirectory of the output directory."""
+
+    import m5
+
+    subdir = Path(Path(m5.options.outdir) / Path(simulator.get_id()))
+    simulator.override_outdir(subdir)
+
+    # The status reporter's event can only be scheduled once the simulation
+    # is instantiated (which may restore a checkpoint and move the current
+    # tick on), so instantiate before running.
+    simulator._instantiate()
+    reporter = StatusReporter(simulator.get_id(), subdir)
+    reporter.start()
+
+    simulator.run()
+
+    exit_cause = simulator.get_last_exit_event_cause()
+    reporter.finish(exit_cause)
+    write_exit_cause(subdir, exit_cause)
+
+
 def _run(module_path: Path, id: str) -> None:
     """Run the simulator with the ID specified."""
 
     _load_module(module_path)
+    _run_simulator(_get_simulator(id))
+
+
+def _run_forked(id: str) -> None:
+    """Run the simulator with the ID specified in a worker forked from the
+    fork server. The config script has already been loaded by the server.
+    """
+
+    from m5.simulate import _exit_cleanup
+
+    _run_simulator(_get_simulator(id))
+
+    # Forked workers leave through `os._exit`, which skips the atexit
+    # handlers, so run the teardown `m5.simulate` registers there (the C++
+    # exit cleanup and the final stats dump) explicitly.
+    _exit_cleanup()
+
+
+def _fork_server(
+    module_path: Path,
+    processes: Optional[int],
+    memory_budget: Optional[int],
+    history: Dict[str, float],
+    journal: Journal,
+    skip: Set[str],
+    progress_interval: Optional[float],
+    conn,
+) -> None:
+    """The body of the fork server.
+
+    This is run in a single spawned gem5 process. It loads the config script
+    once, which gives it the simulator ids, the number of processes and the
+    cost hints in one pass, and then forks a worker per simulator id not in
+    `skip`, in the order chosen by the `JobScheduler`. When all the workers
+    have finished the exit code and wall-clock runtime of each are sent back
+    through `conn`.
+    """
+
+    _load_module(module_path)
+
+    if processes is None:
+        processes = _num_processes
+    jobs = _make_jobs(_get_costs(), history, skip)
+
+    fork_context = multiprocessing.get_context("fork")
+
+    def start_job(id: str):
+        worker = fork_context.Process(
+            target=_run_forked, args=(id,), name=f"multisim-{id}"
+        )
+        worker.start()
+        return worker
+
+    conn.send(
+        _run_jobs(
+            jobs,
+            processes,
+            memory_budget,
+            start_job,
+            journal.record,
+            _make_monitor(jobs, progress_interval),
+        )
+    )
+    conn.close()
+
+
+def _run_fork_server(
+    module_path: Path,
+    processes: Optional[int],
+    memory_budget: Optional[int],
+    history: Dict[str, float],
+    journal: Journal,
+    skip: Set[str],
+    progress_interval: Optional[float],
+) -> Tuple[Dict[str, int], Dict[str, float]]:
+    """Run the simulators specified in the module with a fork server. See
+    `run`.
+    """
+
+    from ..multiprocessing.context import gem5Context
+
+    context = gem5Context()
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    server = context.Process(
+        target=_fork_server,
+        args=(
+            module_path,
+            processes,
+            memory_budget,
+            history,
+            journal,
+            skip,
+            progress_interval,
+            child_conn,
+        ),
+    )
+    server.start()
+    child_conn.close()
+
+    try:
+        results = parent_conn.recv()
+    except EOFError:
+        server.join()
+        raise Exception(
+            "The MultiSim fork server exited before running the simulators "
+            f"(exit code {server.exitcode})."
+        )
+    server.join()
+    return results
+
+
+def _estimate_memory(simulator: "Simulator") -> Optional[int]:
+    """Estimate the host memory needed to run a simulator as the size of its
+    board's simulated memory, which gem5 backs with host memory."""
+
+    try:
+        return simulator._board.get_memory().get_size()
+    except Exception:
+        return None
+
+
+def _get_costs() -> Dict[str, Tuple[Optional[int], Optional[float]]]:
+    """Return the (host memory, runtime) estimates of the loaded simulators,
+    keyed by id."""
 
     global _multi_sim
-    sim_list = [sim for sim in _multi_sim if sim.get_id() == id]
+    costs = {}
+    for sim in _multi_sim:
+        hints = _cost_hints.get(sim.get_id(), {})
+        memory = hints.get("host_memory")
+        if memory is None:
+            memory = _estimate_memory(sim)
+        costs[sim.get_id()] = (memory, hints.get("expected_runtime"))
+    return costs
+
+
+def _get_multisim_info_child_process(info_dict, module_path: Path) -> None:
+    """Get the number of processes and the cost estimates, keyed by id, of
+    the simulations to be run. As with `_get_simulator_ids_child_process`,
+    this is run in a child process which loads the module.
+    """
+
+    _load_module(module_path)
+    info_dict["num_processes"] = _num_processes
+    info_dict["costs"] = _get_costs()
+
+
+def _get_multisim_info(
+    config_module_path: Path,
+) -> Tuple[Optional[int], Dict[str, Tuple[Optional[int], Optional[float]]]]:
+    """Load the config script in a single child process and return the
+    number of processes it sets and the cost estimates of its simulators."""
+
+    manager = multiprocessing.Manager()
+    info_dict = manager.dict()
+    p = multiprocessing.Process(
+        target=_get_multisim_info_child_process,
+        args=(info_dict, config_module_path),
+    )
+    p.start()
+    p.join()
+    return info_dict["num_processes"], info_dict["costs"]
+
+
+def _make_jobs(
+    costs: Dict[str, Tuple[Optional[int], Optional[float]]],
+    history: Dict[str, float],
+    skip: Set[str],
+) -> List[SimulatorJob]:
+    """Create the scheduler's jobs for the simulators not in `skip`, taking
+    the runtime from the history when no estimate was given."""
+
+    from m5.util import inform
+
+    jobs = []
+    for id, (memory, runtime) in costs.items():
+        if id in skip:
+            inform("MultiSim: skipping '%s', its output is complete.", id)
+            continue
+        if runtime is None:
+            runtime = history.get(id)
+        jobs.append(SimulatorJob(id=id, memory=memory, runtime=runtime))
+    return jobs
+
+
+def _make_monitor(
+    jobs: List[SimulatorJob], progress_interval: Optional[float]
+) -> Optional[ProgressMonitor]:
+    """Create the progress monitor of the sweep, or return `None` if progress
+    is not to be monitored."""
+
+    if not progress_interval:
+        return None
 
-    assert len(sim_list) != 0, f"No simulator with id '{id}' found."
-    assert len(sim_list) == 1, f"Multiple simulators with id '{id}' found."
     import m5
 
-    subdir = Path(Path(m5.options.outdir) / Path(sim_list[0].get_id()))
-    sim_list[0].override_outdir(subdir)
+    return ProgressMonitor(
+        Path(m5.options.outdir),
+        [job.id for job in jobs],
+        progress_interval,
+    )
 
-    sim_list[0].run()
 
+def _run_jobs(
+    jobs: List[SimulatorJob],
+    processes: Optional[int],
+    memory_budget: Optional[int],
+    start_job: Callable[[str], multiprocessing.process.BaseProcess],
+    on_finished: Callable[[str, int, float], None],
+    monitor: Optional[ProgressMonitor],
+) -> Tuple[Dict[str, int], Dict[str, float]]:
+    """Run the jobs in the order chosen by a `JobScheduler`.
+
+    :param start_job: Starts the process running the simulator with the id
+    given and returns it.
+    :param on_finished: Called with the id, exit code and wall-clock runtime
+    of each simulator as it finishes.
+    :param monitor: If not `None`, the monitor is told as simulators start
+    and finish and is polled every `monitor.interval` seconds.
+
+    :returns: The exit code and the wall-clock runtime of each simulator,
+    keyed by id.
+    """
 
-def run(module_path: Path, processes: Optional[int] = None) -> None:
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    scheduler = JobScheduler(jobs, processes, memory_budget)
+
+    running = {}
+    exit_codes = {}
+    runtimes = {}
+    while scheduler.has_pending() or running:
+        job = scheduler.next_job()
+        while job is not None:
+            process = start_job(job.id)
+            running[process.sentinel] = (job, process, time.monotonic())
+            if monitor:
+                monitor.started(job.id)
+            job = scheduler.next_job()
+
+        timeout = monitor.interval if monitor else None
+        for sentinel in wait(list(running.keys()), timeout=timeout):
+            job, process, start_time = running.pop(sentinel)
+            process.join()
+            scheduler.finished(job)
+            exit_codes[job.id] = process.exitcode
+            runtimes[job.id] = time.monotonic() - start_time
+            on_finished(job.id, exit_codes[job.id], runtimes[job.id])
+            if monitor:
+                monitor.finished(job.id, exit_codes[job.id], runtimes[job.id])
+
+        if monitor:
+            monitor.poll()
+
+    return exit_codes, runtimes
+
+
+def run(
+    module_path: Path,
+    processes: Optional[int] = None,
+    fork_server: bool = False,
+    memory_budget: Optional[int] = None,
+    history: Optional[Path] = None,
+    resume: bool = True,
+    progress_interval: Optional[float] = 5.0,
+    prefetch: bool = False,
+) -> None:
     """Run the simulators specified in the module in parallel.
 
+    Simulators are started longest-first and, if a memory budget is given,
+    only while their estimated host memory fits in the budget (see
+    `gem5.utils.multisim.scheduler`).
+
     :param module_path: The path to the module containing the simulators to
     run.
     :param processes: The number of processes to run in parallel. If not
-    specified, the number of available threads will be used.
+    specified, the number set by the config script with `set_num_processes`
+    is used, or else the number of available threads.
+    :param fork_server: If True, load the config script once in a single
+    gem5 process and fork a worker per simulator from it instead of spawning
+    a new gem5 process per simulator.
+    :param memory_budget: The host memory, in bytes, the running simulators
+    may use in total. If not specified, memory is not limited.
+    :param history: A JSON file of the wall-clock runtimes of previous runs,
+    keyed by simulator id. It is used to estimate the runtime of simulators
+    without a runtime hint and is updated with the runtimes of this run.
+    :param resume: If True, skip the simulators which the completion journal
+    in the output directory records as complete (see
+    `gem5.utils.multisim.journal`).
+    :param progress_interval: How often, in seconds, to gather the progress
+    of the running simulators into "multisim-status.json" in the output
+    directory (and render it, if attached to a terminal). If `None` or 0,
+    progress is not monitored.
+    :param prefetch: If True, download the resources the config script
+    obtains concurrently before any simulator is started, rather than each
+    simulator downloading its own (see `gem5.resources.prefetch`).
     """
 
     assert len(_multi_sim) == 0, (
@@ -186,27 +548,87 @@ def run(module_path: Path, processes: Optional[int] = None) -> None:
         "(prior to determining number of jobs)."
     )
 
-    # Get the simulator IDs. This both provides us a list of targets
-    # and, by-proxy, the number of jobs.
-    ids = get_simulator_ids(module_path)
-    max_num_processes = get_num_processes(module_path)
+    previous_runtimes = load_history(history) if history else {}
 
-    assert len(_multi_sim) == 0, (
-        "Simulators instantiated in main thread instead of child thread "
-        "(after determining number of jobs)."
+    import m5
+
+    journal = Journal(
+        path=Path(m5.options.outdir) / JOURNAL_FILE,
+        config_path=module_path,
+        outdir=Path(m5.options.outdir),
+        stats_file=m5.options.stats_file,
     )
+    skip = set(journal.completed().keys()) if resume else set()
 
-    # Setup the multiprocessing pool. If the number of processes is not
-    # specified (i.e. `None`) the default is the number or available threads.
-    from ..multiprocessing.context import gem5Context
+    if prefetch:
+        from gem5.resources.prefetch import (
+            find_resources_in_config,
+            prefetch_resources,
+        )
 
-    pool = gem5Context().Pool(processes=max_num_processes, maxtasksperchild=1)
+        prefetch_resources(find_resources_in_config(module_path))
+
+    if fork_server:
+        exit_codes, runtimes = _run_fork_server(
+            module_path,
+            processes,
+            memory_budget,
+            previous_runtimes,
+            journal,
+            skip,
+            progress_interval,
+        )
+    else:
+        # Get the simulator IDs and their costs. This both provides us a
+        # list of targets and, by-proxy, the number of jobs.
+        max_num_processes, costs = _get_multisim_info(module_path)
+        if processes is None:
+            processes = max_num_processes
+
+        assert len(_multi_sim) == 0, (
+            "Simulators instantiated in main thread instead of child thread "
+            "(after determining number of jobs)."
+        )
 
-    # Use the starmap function to create N child processes each with same
-    # module path (the config script specifying all simulations using MultiSim)
-    # but a different ID. The ID is used to select the correct simulator to
-    # run.
-    pool.starmap(_run, zip([module_path for _ in range(len(ids))], tuple(ids)))
+        from ..multiprocessing.context import gem5Context
+
+        context = gem5Context()
+
+        # Each simulator is run in a new gem5 process which loads the module
+        # (the config script specifying all simulations using MultiSim) and
+        # uses the ID to select the correct simulator to run.
+        def start_job(id: str):
+            process = context.Process(
+                target=_run, args=(module_path, id), name=f"multisim-{id}"
+            )
+            process.start()
+            return process
+
+        jobs = _make_jobs(costs, previous_runtimes, skip)
+        exit_codes, runtimes = _run_jobs(
+            jobs,
+            processes,
+            memory_budget,
+            start_job,
+            journal.record,
+            _make_monitor(jobs, progress_interval),
+        )
+
+    failed = sorted(id for id, code in exit_codes.items() if code != 0)
+    if history:
+        save_history(
+            history,
+            {
+                id: runtime
+                for id, runtime in runtimes.items()
+                if id not in failed
+            },
+        )
+    if failed:
+        raise Exception(
+            "The following MultiSim simulators did not exit successfully: "
+            + ", ".join(failed)
+        )
 
 
 def set_num_processes(num_processes: int) -> None:
@@ -228,7 +650,11 @@ def num_simulators() -> int:
     return len(_multi_sim)
 
 
-def add_simulator(simulator: "Simulator") -> None:
+def add_simulator(
+    simulator: "Simulator",
+    host_memory: Optional[int] = None,
+    expected_runtime: Optional[float] = None,
+) -> None:
     """Add a single simulator to the Multisim. Doing so informs the simulators
     to run this simulator via multiprocessing.
 
@@ -240,9 +666,11 @@ def add_simulator(simulator: "Simulator") -> None:
     simulations having been run).
 
     :param simulator: The simulator to add to the multisim.
-    :param id: The id of the simulator. This is used to reference the
-    simulation. This is particularly important when referencing the correct
-    m5out subdirectory.
+    :param host_memory: An estimate of the host memory, in bytes, needed to
+    run the simulator. If not specified, the size of the board's memory is
+    used. This is only used when MultiSim is given a memory budget.
+    :param expected_runtime: An estimate of the wall-clock time, in seconds,
+    the simulation takes. Simulations are started longest-first.
     """
 
     global _multi_sim
@@ -252,6 +680,10 @@ def add_simulator(simulator: "Simulator") -> None:
         # id.
         simulator.set_id(f"sim_{len(_multi_sim)}")
     _multi_sim.add(simulator)
+    _cost_hints[simulator.get_id()] = {
+        "host_memory": host_memory,
+        "expected_runtime": expected_runtime,
+    }
 
     # The following code is used to enable a user to run a single simulation
     # from the config script, based on an ID, in the case the config script is
@@ -0,0 +1,283 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Live progress reporting for MultiSim.
+
+Each simulator process runs a `StatusReporter`, a periodic event which writes
+the current tick, the number of committed instructions and the host time to
+a small JSON status file in the simulator's output directory. The event's
+period, in ticks, is adjusted after every report so that reports are written
+roughly every `REPORT_INTERVAL` host seconds, however fast the simulation
+runs.
+
+The process running the sweep uses a `ProgressMonitor` to gather these
+status files into a single machine-readable status file in the sweep's
+output directory and, when attached to a terminal, to render them as a
+table.
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+
+# The name of the status file in a simulator's output directory.
+STATUS_FILE = "simulator-status.json"
+
+# The name of the aggregate status file in the sweep's output directory.
+SWEEP_STATUS_FILE = "multisim-status.json"
+
+# How often, in host seconds, a simulator reports its progress.
+REPORT_INTERVAL = 1.0
+
+# A running simulator whose status has not been updated for this many report
+# intervals is shown as stalled.
+_STALL_INTERVALS = 10
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> None:
+    # Write then rename so a reader never sees a partially written file.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def read_status(outdir: Path) -> Optional[Dict[str, Any]]:
+    """Read the status file in a simulator's output directory, or return
+    `None` if it has not been written yet."""
+    try:
+        with open(Path(outdir) / STATUS_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class StatusReporter:
+    """Periodically writes the progress of the simulation running in this
+    process to the status file in its output directory."""
+
+    def __init__(
+        self, id: str, outdir: Path, interval: float = REPORT_INTERVAL
+    ) -> None:
+        """
+        :param id: The id of the simulator.
+        :param outdir: The output directory of the simulator.
+        :param interval: How often, in host seconds, to report progress.
+        """
+        self._id = id
+        self._path = Path(outdir) / STATUS_FILE
+        self._interval = interval
+        self._event = None
+        self._cpus = None
+        self._start_time = time.monotonic()
+        self._last_time = self._start_time
+        self._last_tick = 0
+        # The initial period is 1us of simulated time. It is adjusted to
+        # the speed of the simulation after the first report.
+        self._period = 1000000
+
+    def start(self) -> None:
+        """Start reporting. This must be called after `m5.instantiate()`."""
+        import m5
+        from m5.event import (
+            create,
+            mainq,
+        )
+
+        self._start_time = time.monotonic()
+        self._last_time = self._start_time
+        self._last_tick = m5.curTick()
+        self._event = create(self._report)
+        mainq.schedule(self._event, m5.curTick() + self._period)
+        self._write("running")
+
+    def finish(self, exit_cause: Optional[str] = None) -> None:
+        """Stop reporting and write the final status."""
+        from m5.event import mainq
+
+        if self._event is not None and self._event.scheduled():
+            mainq.deschedule(self._event)
+        self._write("finished", exit_cause)
+
+    def _committed_insts(self) -> Optional[int]:
+        if self._cpus is None:
+            from m5.objects import (
+                BaseCPU,
+                Root,
+            )
+
+            self._cpus = [
+                obj
+                for obj in Root.getInstance().descendants()
+                if isinstance(obj, BaseCPU)
+            ]
+        if not self._cpus:
+            return None
+        return sum(cpu.totalInsts() for cpu in self._cpus)
+
+    def _write(self, state: str, exit_cause: Optional[str] = None) -> None:
+        import m5
+
+        host_seconds = time.monotonic() - self._start_time
+        insts = self._committed_insts()
+        _write_json(
+            self._path,
+            {
+                "id": self._id,
+                "pid": os.getpid(),
+                "state": state,
+                "exit_cause": exit_cause,
+                "tick": m5.curTick(),
+                "insts": insts,
+                "host_seconds": host_seconds,
+                "insts_per_host_second": (
+                    insts / host_seconds
+                    if insts is not None and host_seconds > 0
+                    else None
+                ),
+                "updated": time.time(),
+            },
+        )
+
+    def _report(self) -> None:
+        import m5
+        from m5.event import mainq
+
+        self._write("running")
+
+        # Scale the period so the next report comes after about `interval`
+        # host seconds, growing it by at most 10x at a time.
+        now = time.monotonic()
+        elapsed = now - self._last_time
+        ticks = m5.curTick() - self._last_tick
+        if elapsed > 0:
+            self._period = int(
+                min(ticks * self._interval / elapsed, self._period * 10)
+            )
+        else:
+            self._period *= 10
+        self._period = max(self._period, 1)
+        self._last_time = now
+        self._last_tick = m5.curTick()
+
+        mainq.schedule(self._event, m5.curTick() + self._period)
+
+
+class ProgressMonitor:
+    """Gathers the status of the simulators of a sweep."""
+
+    def __init__(self, outdir: Path, ids: List[str], interval: float) -> None:
+        """
+        :param outdir: The output directory of the sweep. Each simulator's
+                       output is in the subdirectory named after its id.
+        :param ids: The ids of the simulators to be run.
+        :param interval: How often, in host seconds, to gather the statuses.
+        """
+        self.interval = interval
+        self._outdir = Path(outdir)
+        self._statuses = {id: {"id": id, "state": "pending"} for id in ids}
+        self._lines = 0
+
+    def started(self, id: str) -> None:
+        self._statuses[id] = {"id": id, "state": "running"}
+
+    def finished(self, id: str, exit_code: int, wall_time: float) -> None:
+        status = read_status(self._outdir / id) or {"id": id}
+        status["state"] = "finished" if exit_code == 0 else "failed"
+        status["exit_code"] = exit_code
+        status["wall_time"] = wall_time
+        self._statuses[id] = status
+
+    def poll(self) -> Dict[str, Any]:
+        """Read the status of the running simulators, write the sweep's
+        status file and, if attached to a terminal, render the statuses.
+
+        :returns: The sweep's status.
+        """
+        now = time.time()
+        for id, status in self._statuses.items():
+            if status["state"] not in ("running", "stalled"):
+                continue
+            # A simulator which has written its final status is still
+            # running its exit handlers (e.g., dumping stats), so it is
+            # shown as running until its process exits.
+            status.update(read_status(self._outdir / id) or {})
+            updated = status.get("updated")
+            if (
+                updated is not None
+                and now - updated > _STALL_INTERVALS * REPORT_INTERVAL
+            ):
+                status["state"] = "stalled"
+            else:
+                status["state"] = "running"
+
+        counts = {}
+        for status in self._statuses.values():
+            counts[status["state"]] = counts.get(status["state"], 0) + 1
+        sweep_status = {
+            "updated": now,
+            "counts": counts,
+            "simulators": self._statuses,
+        }
+        _write_json(self._outdir / SWEEP_STATUS_FILE, sweep_status)
+
+        if sys.stdout.isatty():
+            self._render(counts)
+        return sweep_status
+
+    def _render(self, counts: Dict[str, int]) -> None:
+        lines = [
+            ", ".join(f"{n} {state}" for state, n in sorted(counts.items())),
+            f"{'id':<24} {'state':<8} {'tick':>16} {'insts':>14} "
+            f"{'host s':>9} {'MIPS':>8}",
+        ]
+        for id, status in sorted(self._statuses.items()):
+            if status["state"] not in ("running", "stalled"):
+                continue
+            ips = status.get("insts_per_host_second")
+            lines.append(
+                f"{id:<24.24} {status['state']:<8} "
+                f"{status.get('tick', 0):>16} "
+                f"{status.get('insts') or 0:>14} "
+                f"{status.get('host_seconds', 0.0):>9.1f} "
+                f"{(ips or 0.0) / 1e6:>8.2f}"
+            )
+
+        # Move back up over the previous table and clear it.
+        if self._lines:
+            sys.stdout.write(f"\x1b[{self._lines}F\x1b[J")
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+        self._lines = len(lines)
@@ -0,0 +1,177 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+The MultiSim job scheduler.
+
+Each simulator is a job with two optional costs: an estimate of the host
+memory its gem5 process needs and an estimate of its wall-clock runtime.
+Jobs are started longest-first (jobs with no runtime estimate are treated as
+the longest, so an unknown long job is never left until last), and a job
+only starts when it fits in what is left of the host memory budget. When the
+next job in order does not fit, the scheduler backfills with the next one
+that does, so free cores are not left idle behind a large job.
+
+Runtime estimates can be given as hints or taken from a history file, a JSON
+object mapping simulator ids to the wall-clock seconds of their previous run,
+which MultiSim updates after every sweep.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import (
+    Dict,
+    List,
+    Optional,
+)
+
+
+class SimulatorJob:
+    """A simulator to run and the costs used to schedule it."""
+
+    def __init__(
+        self,
+        id: str,
+        memory: Optional[int] = None,
+        runtime: Optional[float] = None,
+    ) -> None:
+        """
+        :param id: The id of the simulator.
+        :param memory: The estimated host memory, in bytes, needed to run the
+                       simulator. If `None` the simulator is assumed to need
+                       no memory from the budget.
+        :param runtime: The estimated wall-clock runtime, in seconds. If
+                        `None` the runtime is unknown.
+        """
+        self.id = id
+        self.memory = memory
+        self.runtime = runtime
+
+    def __repr__(self) -> str:
+        return (
+            f"SimulatorJob(id={self.id!r}, memory={self.memory!r}, "
+            f"runtime={self.runtime!r})"
+        )
+
+
+class JobScheduler:
+    """Decides which simulator to start next."""
+
+    def __init__(
+        self,
+        jobs: List[SimulatorJob],
+        processes: int,
+        memory_budget: Optional[int] = None,
+    ) -> None:
+        """
+        :param jobs: The simulators to run.
+        :param processes: The maximum number of simulators to run at once.
+        :param memory_budget: The host memory, in bytes, the running
+                              simulators may use in total. If `None` memory
+                              is not limited.
+        """
+        if processes < 1:
+            raise ValueError("Number of processes must be greater than 0.")
+
+        self._processes = processes
+        self._memory_budget = memory_budget
+        self._memory_used = 0
+        self._running: Dict[str, SimulatorJob] = {}
+
+        # Longest first, with unknown runtimes first of all. Ties are broken
+        # by id so the order is the same on every run.
+        self._pending = sorted(
+            jobs,
+            key=lambda job: (
+                job.runtime is not None,
+                -(job.runtime or 0.0),
+                job.id,
+            ),
+        )
+
+    def has_pending(self) -> bool:
+        """Returns True if there are simulators yet to be started."""
+        return len(self._pending) != 0
+
+    def num_running(self) -> int:
+        """Returns the number of started simulators yet to finish."""
+        return len(self._running)
+
+    def _fits(self, job: SimulatorJob) -> bool:
+        if self._memory_budget is None or not job.memory:
+            return True
+        return self._memory_used + job.memory <= self._memory_budget
+
+    def next_job(self) -> Optional[SimulatorJob]:
+        """Returns the next simulator to start, or `None` if none can be
+        started until a running simulator finishes.
+
+        A simulator which needs more memory than the whole budget is started
+        once nothing else is running, rather than never.
+        """
+        if not self._pending or len(self._running) >= self._processes:
+            return None
+
+        for index, job in enumerate(self._pending):
+            if self._fits(job):
+                break
+        else:
+            if self._running:
+                return None
+            index, job = 0, self._pending[0]
+
+        del self._pending[index]
+        self._running[job.id] = job
+        self._memory_used += job.memory or 0
+        return job
+
+    def finished(self, job: SimulatorJob) -> None:
+        """Marks a started simulator as finished, freeing its process and
+        memory for the simulators still pending."""
+        del self._running[job.id]
+        self._memory_used -= job.memory or 0
+
+
+def load_history(path: Path) -> Dict[str, float]:
+    """Load the wall-clock runtimes, keyed by simulator id, from a history
+    file. A missing file is an empty history.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {id: float(runtime) for id, runtime in json.load(f).items()}
+
+
+def save_history(path: Path, runtimes: Dict[str, float]) -> None:
+    """Merge the wall-clock runtimes, keyed by simulator id, into a history
+    file."""
+    history = load_history(path)
+    history.update(runtimes)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(history, f, indent=4, sort_keys=True)
+    os.replace(tmp_path, path)
@@ -46,18 +46,43 @@ def add_citation(sim_obj_cls: Type["SimObject"], citation: str):
     sim_obj_cls._citations += citation
 
 
-def gather_citations(root: "SimObject"):
+def gather_citations(root: "SimObject", objs=None):
     """Based on the root SimObject, walk the object hierarchy and gather all
     of the citations together and then print them to citations.bib in the
     output directory.
+
+    :param objs: An optional, already flattened list of the objects under
+                 root. If not given, the hierarchy is walked.
     """
 
-    citations = {}
-    for obj in root.descendants():
+    if objs is None:
+        objs = root.descendants()
+
+    # Citations are stored per class, so parse each distinct string once.
+    # Keys are ordered by the first object to cite them and, if a key
+    # repeats, the entry of the last object to cite it is kept, exactly as if
+    # every object's string had been parsed in turn.
+    first = {}
+    last = {}
+    for obj in objs:
+        first.setdefault(obj._citations, None)
+        last.pop(obj._citations, None)
+        last[obj._citations] = None
+
+    entries = {}
+    for string in first:
+        entries[string] = []
         loc = 0
         while loc >= 0:
-            key, cite, loc = _get_next_key_entry(obj._citations, loc)
-            # If a key repeats, then just overwrite it
+            key, cite, loc = _get_next_key_entry(string, loc)
+            entries[string].append((key, cite))
+
+    citations = {}
+    for string in first:
+        for key, cite in entries[string]:
+            citations.setdefault(key, cite)
+    for string in last:
+        for key, cite in entries[string]:
             citations[key] = cite
 
     with open(Path(m5.options.outdir) / "citations.bib", "w") as output:
@@ -25,6 +25,10 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 from .abstract_stat import AbstractStat
+from .deltastats import (
+    DeltaStatsReader,
+    DeltaStatsWriter,
+)
 from .group import (
     Group,
     SimObjectGroup,
@@ -41,5 +45,13 @@ from .statistic import (
     Vector,
     Vector2d,
 )
+from .statstxt import (
+    StatsTable,
+    StatsTxtReader,
+)
 from .storagetype import StorageType
 from .timeconversion import TimeConversion
+from .timeseries import (
+    TimeSeriesReader,
+    TimeSeriesWriter,
+)
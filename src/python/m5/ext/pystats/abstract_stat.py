@@ -25,6 +25,7 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import re
+import weakref
 from typing import (
     Any,
     Callable,
@@ -37,6 +38,22 @@ from typing import (
 
 from .serializable_stat import SerializableStat
 
+# Matches the index suffix of a SimObject vector element name, e.g. "cpu0".
+_VECTOR_INDEX_REGEX = re.compile("[0-9]+$")
+
+# The lookup index of each stat on which an index has been requested. The
+# indexes are held outside of the stats themselves so they do not appear as
+# children or in the JSON output.
+_indexes: "weakref.WeakKeyDictionary[AbstractStat, Any]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# The stats whose index covers each indexed stat. Setting an attribute of a
+# stat discards only the indexes of the trees which contain it.
+_index_roots: (
+    "weakref.WeakKeyDictionary[AbstractStat, weakref.WeakSet[AbstractStat]]"
+) = weakref.WeakKeyDictionary()
+
 
 class AbstractStat(SerializableStat):
     """
@@ -89,9 +106,60 @@ class AbstractStat(SerializableStat):
             pattern = re.compile(regex)
         else:
             pattern = regex
-        return self.children(
-            lambda _name: re.match(pattern, _name), recursive=True
-        )
+        return self._get_index().find(pattern)
+
+    def find_path(self, path: str) -> Optional["AbstractStat"]:
+        """Find the stat at a dotted path relative to this stat.
+
+        .. code-block::
+
+            >>> simstat.find_path("board.processor.cores0.core.ipc")
+            0.876748
+
+        Paths follow the ``stats.txt`` naming: the elements of SimObject
+        vectors with more than one element are suffixed with their index and
+        the elements of vector statistics are joined to the statistic name
+        with "::".
+
+        :param path: The dotted path to the stat.
+
+        :returns: The stat, or ``None`` if there is no stat at ``path``.
+        """
+        return self._get_index().get(path)
+
+    def find_prefix(self, prefix: str) -> List["AbstractStat"]:
+        """Find the stat at a dotted path and every stat beneath it.
+
+        .. code-block::
+
+            >>> simstat.find_prefix("board.cache_hierarchy.l1d-cache-0")
+
+        :param prefix: The dotted path. It must consist of whole path
+                       components, so ``board.proc`` will not match
+                       ``board.processor``.
+        """
+        return self._get_index().find_prefix(prefix)
+
+    def invalidate_index(self) -> None:
+        """Discard the lookup index used by ``find``, ``find_path`` and
+        ``find_prefix``.
+
+        The index is rebuilt automatically when an attribute of a stat within
+        the tree is set. This must be called if the ``value`` list or
+        dictionary of a stat within the tree is modified in place.
+        """
+        _indexes.pop(self, None)
+
+    def _get_index(self) -> "StatIndex":
+        from .statindex import StatIndex
+
+        index = _indexes.get(self)
+        if index is None:
+            index = StatIndex(self)
+            _indexes[self] = index
+            for stat in [self] + index.stats():
+                _index_roots.setdefault(stat, weakref.WeakSet()).add(self)
+        return index
 
     def _get_vector_item(self, item: str) -> Optional[Tuple[str, int, Any]]:
         """It has been the case in gem5 that SimObject vectors are stored as
@@ -101,8 +169,7 @@ class AbstractStat(SerializableStat):
         split into a SimObject name and index, or if the SimObject does not
         exit at `Simobject[index]`, the function returns None.
         """
-        regex = re.compile("[0-9]+$")
-        match = regex.search(item)
+        match = _VECTOR_INDEX_REGEX.search(item)
         if not match:
             return None
 
@@ -124,6 +191,12 @@ class AbstractStat(SerializableStat):
     def __iter__(self):
         return iter(self.__dict__)
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if _index_roots:
+            for root in list(_index_roots.get(self, ())):
+                _indexes.pop(root, None)
+        super().__setattr__(name, value)
+
     def __getattr__(self, item: str) -> Any:
         vector_item = self._get_vector_item(item)
         if not vector_item:
@@ -135,6 +208,11 @@ class AbstractStat(SerializableStat):
         return vector_item[2]
 
     def __getitem__(self, item: str):
+        if isinstance(item, str) and "." in item and item not in self.__dict__:
+            stat = self.find_path(item)
+            if stat is None:
+                raise KeyError(item)
+            return stat
         return getattr(self, item)
 
     def __contains__(self, item: Any) -> bool:
@@ -0,0 +1,475 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Aggregates the statistics of many gem5 runs into a single table.
+
+This walks a results tree (e.g., one output directory per benchmark), parses
+every ``stats.txt`` or ``stats.json`` it finds in a process pool, derives
+per-run metrics (IPC, and miss rate, MPKI and APKI for each cache) and writes
+one row per run to a CSV (or, if ``pyarrow`` is installed, Parquet) file.
+
+The ``json://`` stats output does not include Formula statistics, such as a
+core's ``ipc`` or a cache's ``overallMisses``, so the metrics are derived
+from the Scalar and Vector statistics present in both formats: the committed
+instructions and cycles of each core, and the per-command hit and miss counts
+of each cache.
+
+The statistics parsed from each file are cached alongside the results,
+keyed by the file path, modification time and size, so rerunning the
+aggregation after one more run finishes only parses that run's output.
+
+Usage
+-----
+
+.. code-block:: sh
+
+    python -m m5.ext.pystats.aggregate simulation_results/Q1 -o q1.csv
+    python -m m5.ext.pystats.aggregate results \\
+        --cache l1d=board.cache_hierarchy.l1d-cache-0 \\
+        --cache l2=board.cache_hierarchy.l2-cache-0
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import re
+import sys
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .statstxt import (
+    StatsTable,
+    StatsTxtReader,
+)
+
+STATS_FILE_NAMES = ("stats.txt", "stats.json")
+
+CACHE_FILE_NAME = ".pystats-aggregate-cache.json"
+
+# Matches the hit and miss counts of each command of a cache, per requestor,
+# e.g. "<cache>.ReadReq.hits::<requestor>". The groups are the cache, the
+# count and the requestor, which may itself contain dots.
+_CACHE_COUNT_REGEX = re.compile(r"^(.+)\.[^.:]+\.(hits|misses)::(.+)$")
+_CACHE_COUNT_PATTERNS = (".*.hits::*", ".*.misses::*")
+
+
+def find_stats_files(root: Path) -> Iterator[Path]:
+    """Yields every ``stats.txt`` and ``stats.json`` file under ``root``, in
+    a deterministic order. Where a directory contains both, only the
+    ``stats.txt`` file is used.
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in STATS_FILE_NAMES:
+            if name in filenames:
+                yield Path(dirpath) / name
+                break
+
+
+def flatten_json_stats(
+    obj: Dict[str, Any], prefix: str = ""
+) -> Dict[str, float]:
+    """Flattens the JSON representation of a ``SimStat`` (as written by the
+    ``json://`` stats output) into a dictionary keyed by the same dotted
+    names used in ``stats.txt``.
+    """
+    flat = {}
+
+    def join(name: str) -> str:
+        return f"{prefix}.{name}" if prefix else name
+
+    stat_type = obj.get("type")
+    if stat_type == "Scalar":
+        flat[prefix] = obj["value"]
+    elif stat_type in ("Vector", "Vector2d", "Distribution", "SparseHist"):
+        for key, value in obj["value"].items():
+            flat.update(flatten_json_stats(value, f"{prefix}::{key}"))
+    elif stat_type == "SimObjectVector":
+        values = obj["value"]
+        for index, value in enumerate(values):
+            # Mirrors the naming in ``m5.stats._bindStatHierarchy``.
+            name = prefix if len(values) == 1 else f"{prefix}{index}"
+            flat.update(flatten_json_stats(value, name))
+    else:
+        for key, value in obj.items():
+            if isinstance(value, dict):
+                flat.update(flatten_json_stats(value, join(key)))
+    return flat
+
+
+def _select(names: List[str], patterns: List[str]) -> List[str]:
+    regexes = [re.compile(fnmatch.translate(p)) for p in patterns]
+    return [name for name in names if any(r.match(name) for r in regexes)]
+
+
+def parse_stats_file(
+    path: Path, patterns: List[str]
+) -> Tuple[str, Dict[str, float]]:
+    """Parses the statistics matching ``patterns`` from the last dump of a
+    ``stats.txt`` or ``stats.json`` file.
+
+    :returns: A tuple of the path (as a string) and the selected values.
+    """
+    if path.suffix == ".json":
+        with open(path) as f:
+            flat = flatten_json_stats(json.load(f))
+        values = {name: flat[name] for name in _select(list(flat), patterns)}
+    else:
+        values = StatsTxtReader(path).select(patterns)
+    return str(path), values
+
+
+def _parse_stats_file_star(args: Tuple[Path, List[str]]):
+    return parse_stats_file(*args)
+
+
+class StatsCache:
+    """
+    An on-disk cache of the statistics parsed from each stats file. An entry
+    is only used if the file's modification time and size are unchanged and
+    it was parsed with the same set of patterns.
+    """
+
+    def __init__(self, path: Optional[Path], patterns: List[str]):
+        self._path = path
+        self._key = hashlib.md5("\n".join(patterns).encode()).hexdigest()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if path and path.exists():
+            try:
+                with open(path) as f:
+                    contents = json.load(f)
+                if contents.get("patterns") == self._key:
+                    self._entries = contents["entries"]
+            except (OSError, ValueError, KeyError):
+                # A corrupt cache is simply rebuilt.
+                self._entries = {}
+
+    @staticmethod
+    def _signature(path: Path) -> List[int]:
+        stat = path.stat()
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def get(self, path: Path) -> Optional[Dict[str, float]]:
+        entry = self._entries.get(str(path))
+        if entry and entry["signature"] == self._signature(path):
+            return entry["values"]
+        return None
+
+    def put(self, path: Path, values: Dict[str, float]) -> None:
+        self._entries[str(path)] = {
+            "signature": self._signature(path),
+            "values": values,
+        }
+
+    def save(self) -> None:
+        if not self._path:
+            return
+        tmp = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            # NaN is not valid JSON, but Python's json module round-trips it.
+            json.dump({"patterns": self._key, "entries": self._entries}, f)
+        os.replace(tmp, self._path)
+
+
+def _sum_matching(values: Dict[str, float], pattern: str) -> float:
+    matched = [values[name] for name in _select(list(values), [pattern])]
+    matched = [value for value in matched if not math.isnan(value)]
+    return sum(matched) if matched else float("nan")
+
+
+def _ipc(values: Dict[str, float], insts: str, cycles: str) -> float:
+    """Sums, over the instruction counts matching ``insts``, the count
+    divided by the ``cycles`` statistic of the closest object containing
+    it (e.g., ``core.commitStats0.numInsts / core.numCycles``).
+    """
+    total = float("nan")
+    for name in _select(list(values), [insts]):
+        owner = name.rsplit(".", 1)[0]
+        num_cycles = None
+        while num_cycles is None and owner:
+            num_cycles = values.get(f"{owner}.{cycles}")
+            owner = owner.rsplit(".", 1)[0] if "." in owner else ""
+        if not num_cycles or math.isnan(num_cycles):
+            continue
+        if math.isnan(values[name]):
+            continue
+        ipc = values[name] / num_cycles
+        total = ipc if math.isnan(total) else total + ipc
+    return total
+
+
+def _cache_counts(values: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+    """Sums the hit and miss counts of every command and requestor of each
+    cache. The per-vector totals in ``stats.txt`` are skipped so that they
+    are not counted twice.
+    """
+    counts = {}
+    for name, value in values.items():
+        match = _CACHE_COUNT_REGEX.match(name)
+        if not match or match.group(3) == "total" or math.isnan(value):
+            continue
+        cache = counts.setdefault(match.group(1), {"hits": 0, "misses": 0})
+        cache[match.group(2)] += value
+    return counts
+
+
+def derive_metrics(
+    values: Dict[str, float],
+    caches: Dict[str, str],
+    insts: str,
+    cycles: str,
+) -> Dict[str, float]:
+    """Derives the per-run metrics from the parsed statistics.
+
+    :param values: The statistics parsed for the run.
+    :param caches: A map of cache label to the dotted path of the cache.
+    :param insts: A glob matching the per-core committed instruction
+                  counts. The non-NaN matches are summed for MPKI and APKI,
+                  and each is divided by the cycles of its core for IPC.
+    :param cycles: The name of the cycle count statistic of each core.
+    """
+    metrics = {"IPC": _ipc(values, insts, cycles)}
+    kilo_insts = _sum_matching(values, insts) / 1000
+    counts = _cache_counts(values)
+    for label, prefix in caches.items():
+        cache = counts.get(prefix, {"hits": 0, "misses": 0})
+        misses = cache["misses"]
+        accesses = cache["hits"] + cache["misses"]
+        metrics[f"{label} Miss Rate"] = (
+            misses / accesses if accesses else float("nan")
+        )
+        metrics[f"{label} MPKI"] = (
+            misses / kilo_insts if kilo_insts else float("nan")
+        )
+        metrics[f"{label} APKI"] = (
+            accesses / kilo_insts if kilo_insts else float("nan")
+        )
+    return metrics
+
+
+def _discover_caches(values: Dict[str, float]) -> Dict[str, str]:
+    """Finds every cache with hit or miss counts and labels each by the
+    shortest trailing part of its path which no other cache shares (e.g.,
+    ``cores0.dcache`` and ``cores1.dcache``).
+    """
+    prefixes = sorted(_cache_counts(values))
+    caches = {}
+    for prefix in prefixes:
+        components = prefix.split(".")
+        for length in range(1, len(components) + 1):
+            label = ".".join(components[-length:])
+            if not any(
+                other != prefix
+                and (other == label or other.endswith("." + label))
+                for other in prefixes
+            ):
+                break
+        caches[label] = prefix
+    return caches
+
+
+def aggregate(
+    root: Path,
+    caches: Optional[Dict[str, str]] = None,
+    insts: str = "*.core.commitStats*.numInsts",
+    cycles: str = "numCycles",
+    processes: Optional[int] = None,
+    cache_path: Optional[Path] = None,
+) -> StatsTable:
+    """Aggregates the metrics of every run under ``root`` into one table.
+
+    :param root: The results tree to search for stats files.
+    :param caches: A map of cache label to the dotted path of the cache. If
+                   not given, every object with per-command ``hits`` or
+                   ``misses`` statistics is reported, labelled by the
+                   shortest part of its path which identifies it.
+    :param insts: A glob matching the per-core committed instruction counts.
+    :param cycles: The name of the cycle count statistic of each core.
+    :param processes: The number of parser processes. Defaults to the
+                      number of host CPUs.
+    :param cache_path: The parse cache. If ``None`` no cache is used.
+
+    :returns: A table with one row per run, labelled by the path of the run's
+              output directory relative to ``root``.
+    """
+    if caches:
+        cache_patterns = [
+            prefix + suffix
+            for prefix in caches.values()
+            for suffix in _CACHE_COUNT_PATTERNS
+        ]
+    else:
+        cache_patterns = ["*" + suffix for suffix in _CACHE_COUNT_PATTERNS]
+    patterns = [insts, f"*.{cycles}"] + cache_patterns
+
+    stats_cache = StatsCache(cache_path, patterns)
+    paths = list(find_stats_files(root))
+    results: Dict[str, Dict[str, float]] = {}
+    to_parse = []
+    for path in paths:
+        cached = stats_cache.get(path)
+        if cached is None:
+            to_parse.append((path, patterns))
+        else:
+            results[str(path)] = cached
+
+    if len(to_parse) > 1 and processes != 1:
+        with multiprocessing.Pool(processes=processes) as pool:
+            parsed = pool.imap_unordered(_parse_stats_file_star, to_parse)
+            results.update(parsed)
+    else:
+        results.update(map(_parse_stats_file_star, to_parse))
+
+    for path, _ in to_parse:
+        stats_cache.put(path, results[str(path)])
+    if to_parse:
+        stats_cache.save()
+
+    table = StatsTable()
+    for path in paths:
+        values = results[str(path)]
+        label = path.parent.relative_to(root).as_posix()
+        table.add_row(
+            label,
+            derive_metrics(
+                values,
+                caches if caches else _discover_caches(values),
+                insts,
+                cycles,
+            ),
+        )
+    return table
+
+
+def _write_parquet(table: StatsTable, output: Path) -> None:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        print(
+            "Writing Parquet output requires 'pyarrow' to be installed.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    columns = {"Benchmark": table.labels}
+    columns.update({name: list(col) for name, col in table.columns.items()})
+    pyarrow.parquet.write_table(pyarrow.table(columns), output)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Aggregate the statistics of many gem5 runs into one "
+        "table.",
+    )
+    parser.add_argument(
+        "root",
+        type=Path,
+        help="The results directory to search for stats.txt/stats.json files.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default="-",
+        help="The output file. Files ending in '.parquet' are written as "
+        "Parquet, otherwise CSV. Defaults to CSV on stdout.",
+    )
+    parser.add_argument(
+        "--cache",
+        action="append",
+        default=[],
+        metavar="LABEL=PATH",
+        help="Report the metrics for the cache at the dotted stat PATH, "
+        "labelled LABEL. May be repeated. By default all caches are reported.",
+    )
+    parser.add_argument(
+        "--insts",
+        type=str,
+        default="*.core.commitStats*.numInsts",
+        help="A glob matching the per-core committed instruction counts, "
+        "which are summed to compute MPKI and APKI.",
+    )
+    parser.add_argument(
+        "--cycles",
+        type=str,
+        default="numCycles",
+        help="The name of the cycle count stat of each core. IPC is the "
+        "sum of each core's instruction count divided by its cycles.",
+    )
+    parser.add_argument(
+        "-j",
+        "--processes",
+        type=int,
+        default=None,
+        help="The number of parser processes. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Do not read or write the '{CACHE_FILE_NAME}' parse cache.",
+    )
+    args = parser.parse_args()
+
+    caches = {}
+    for spec in args.cache:
+        label, sep, prefix = spec.partition("=")
+        if not sep:
+            parser.error(f"--cache expects LABEL=PATH, got '{spec}'")
+        caches[label] = prefix
+
+    table = aggregate(
+        args.root,
+        caches=caches,
+        insts=args.insts,
+        cycles=args.cycles,
+        processes=args.processes,
+        cache_path=None if args.no_cache else args.root / CACHE_FILE_NAME,
+    )
+
+    if args.output.endswith(".parquet"):
+        _write_parquet(table, Path(args.output))
+    elif args.output == "-":
+        table.to_csv(sys.stdout, label_header="Benchmark")
+    else:
+        with open(args.output, "w", newline="") as f:
+            table.to_csv(f, label_header="Benchmark")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Reads and writes delta-encoded statistics dumps.
+
+When statistics are dumped periodically most values are unchanged from one
+dump to the next. A delta stats file stores a full "keyframe" dump every N
+dumps and, in between, only the values which changed since the previous
+dump. Any dump can be reconstructed by replaying the deltas since the
+keyframe which precedes it.
+
+The file is line oriented text. Statistic names are written once and
+subsequently referred to by an integer id:
+
+.. code-block::
+
+    # gem5 delta stats: keyframe=100
+    N <id> <name>        declares the name of a statistic
+    K <tick>             starts a keyframe dump, containing every value
+    D <tick>             starts a delta dump, containing changed values
+    <id> <value>         the value of a statistic in the current dump
+    X <id>               the statistic is absent from the current dump
+"""
+
+import math
+from typing import (
+    IO,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+_HEADER = "# gem5 delta stats"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer() and abs(value) < 2**53:
+        return str(int(value))
+    return repr(value)
+
+
+def _unchanged(old: Optional[float], new: float) -> bool:
+    if old is None:
+        return False
+    if isinstance(new, float) and math.isnan(new):
+        return isinstance(old, float) and math.isnan(old)
+    return old == new
+
+
+class DeltaStatsWriter:
+    """
+    Writes a sequence of dumps, each a mapping of statistic name to value, to
+    a delta stats file.
+    """
+
+    def __init__(self, fp: IO[str], keyframe: int = 100):
+        """
+        :param fp: The text stream to write to.
+        :param keyframe: A full dump is written every ``keyframe`` dumps.
+                         The first dump is always a keyframe.
+        """
+        if keyframe < 1:
+            raise ValueError("The keyframe interval must be at least 1.")
+        self._fp = fp
+        self._keyframe = keyframe
+        self._ids: Dict[str, int] = {}
+        self._last: Dict[str, float] = {}
+        self._dumps = 0
+        fp.write(f"{_HEADER}: keyframe={keyframe}\n")
+
+    def _id(self, name: str, lines: List[str]) -> int:
+        stat_id = self._ids.get(name)
+        if stat_id is None:
+            stat_id = len(self._ids)
+            self._ids[name] = stat_id
+            lines.append(f"N {stat_id} {name}\n")
+        return stat_id
+
+    def write(self, tick: int, values: Dict[str, float]) -> None:
+        """Writes one dump.
+
+        :param tick: The tick at which the dump was taken.
+        :param values: The value of each statistic in the dump.
+        """
+        lines = []
+        if self._dumps % self._keyframe == 0:
+            records = [
+                f"{self._id(name, lines)} {_format_value(value)}\n"
+                for name, value in values.items()
+            ]
+            lines.append(f"K {tick}\n")
+        else:
+            records = [
+                f"{self._id(name, lines)} {_format_value(value)}\n"
+                for name, value in values.items()
+                if not _unchanged(self._last.get(name), value)
+            ]
+            records.extend(
+                f"X {self._ids[name]}\n"
+                for name in self._last
+                if name not in values
+            )
+            lines.append(f"D {tick}\n")
+        lines.extend(records)
+        self._fp.write("".join(lines))
+        self._last = dict(values)
+        self._dumps += 1
+
+
+class DeltaStatsReader:
+    """
+    Reads a delta stats file. The file is indexed in one pass on
+    construction; dumps are reconstructed on request by replaying from the
+    nearest preceding keyframe.
+
+    .. code-block::
+
+        from m5.ext.pystats.deltastats import DeltaStatsReader
+
+        reader = DeltaStatsReader("m5out/stats.delta")
+        for tick, values in reader:
+            print(tick, values["simInsts"])
+        print(reader.dump(42)["board.processor.cores.core.ipc"])
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._names: List[str] = []
+        # The tick, byte offset and keyframe index of each dump.
+        self._dumps: List[Tuple[int, int, int]] = []
+        self._build_index()
+
+    def _build_index(self) -> None:
+        keyframe = -1
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                kind = line[:2]
+                if kind == b"N ":
+                    _, stat_id, name = line.split(None, 2)
+                    assert int(stat_id) == len(self._names)
+                    self._names.append(name.decode().rstrip("\n"))
+                elif kind == b"K ":
+                    keyframe = len(self._dumps)
+                    self._dumps.append((int(line[2:]), offset, keyframe))
+                elif kind == b"D ":
+                    if keyframe < 0:
+                        raise ValueError(
+                            f"{self.path}: delta dump before first keyframe"
+                        )
+                    self._dumps.append((int(line[2:]), offset, keyframe))
+                offset += len(line)
+
+    def __len__(self) -> int:
+        return len(self._dumps)
+
+    @property
+    def ticks(self) -> List[int]:
+        """The tick of each dump."""
+        return [tick for tick, _, _ in self._dumps]
+
+    def _replay(self, first: int, last: int) -> Iterator[Dict[str, float]]:
+        # Yields the values of dumps ``first`` to ``last`` inclusive, where
+        # ``first`` is a keyframe.
+        values: Dict[str, float] = {}
+        dump = first - 1
+        with open(self.path, "rb") as f:
+            f.seek(self._dumps[first][1])
+            for line in f:
+                kind = line[:2]
+                if kind in (b"K ", b"D "):
+                    if dump >= first:
+                        yield values
+                    dump += 1
+                    if dump > last:
+                        return
+                    if kind == b"K ":
+                        values = {}
+                    else:
+                        values = dict(values)
+                elif kind == b"X ":
+                    values.pop(self._names[int(line[2:])], None)
+                elif kind != b"N " and not line.startswith(b"#"):
+                    stat_id, value = line.split()
+                    values[self._names[int(stat_id)]] = float(value)
+        if dump >= first:
+            yield values
+
+    def dump(self, index: int) -> Dict[str, float]:
+        """Reconstructs the values of the dump at ``index``."""
+        if index < 0:
+            index += len(self._dumps)
+        if not 0 <= index < len(self._dumps):
+            raise IndexError(f"dump index {index} out of range")
+        keyframe = self._dumps[index][2]
+        for values in self._replay(keyframe, index):
+            pass
+        return values
+
+    def __iter__(self) -> Iterator[Tuple[int, Dict[str, float]]]:
+        """Yields the tick and values of each dump, in order."""
+        if not self._dumps:
+            return
+        ticks = self.ticks
+        for index, values in enumerate(self._replay(0, len(self) - 1)):
+            yield ticks[index], values
+
+    def series(self, name: str) -> List[Optional[float]]:
+        """Returns the value of one statistic in every dump, or ``None``
+        for the dumps in which it is absent.
+        """
+        return [values.get(name) for _, values in self]
@@ -25,18 +25,34 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import json
+import mmap
+import re
 from json.decoder import JSONDecodeError
 from typing import (
     IO,
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
     Union,
 )
 
-from .group import Group
+from .abstract_stat import AbstractStat
+from .group import (
+    Group,
+    SimObjectGroup,
+    SimObjectVectorGroup,
+)
 from .simstat import SimStat
+from .statindex import _PATH_SEPARATOR
 from .statistic import (
     Distribution,
     Scalar,
+    SparseHist,
     Statistic,
+    Vector,
+    Vector2d,
 )
 
 
@@ -58,7 +74,7 @@ class JsonLoader(json.JSONDecoder):
     """
 
     def __init__(self):
-        super().__init__(self, object_hook=self.__json_to_simstat)
+        super().__init__(object_hook=self.__json_to_simstat)
 
     def __json_to_simstat(self, d: dict) -> Union[SimStat, Statistic, Group]:
         if "type" in d:
@@ -71,22 +87,299 @@ class JsonLoader(json.JSONDecoder):
                 return Distribution(**d)
 
             elif d["type"] == "Group":
-                return Group(**d)
+                return Group(**_group_members(d))
+
+            elif d["type"] == "SimObject":
+                d.pop("type", None)
+                return SimObjectGroup(**_group_members(d))
+
+            elif d["type"] == "SimObjectVector":
+                d.pop("type", None)
+                return SimObjectVectorGroup(**d)
 
             elif d["type"] == "Vector":
                 d.pop("type", None)
                 d.pop("time_conversion", None)
-                return Vector(d)
+                return Vector(**d)
+
+            elif d["type"] == "Vector2d":
+                d.pop("type", None)
+                return Vector2d(**d)
+
+            elif d["type"] == "SparseHist":
+                d.pop("type", None)
+                return SparseHist(**d)
 
             else:
                 raise ValueError(
                     f"SimStat object has invalid type {d['type']}"
                 )
         else:
-            return SimStat(**d)
+            # Objects without a type are the values of vectors, untyped
+            # groups, which their parent group constructs, or the SimStat
+            # itself, which ``decode`` constructs.
+            return d
+
+    def decode(self, s: str) -> Union[SimStat, Statistic, Group]:
+        decoded = super().decode(s)
+        if isinstance(decoded, dict):
+            return SimStat(**_group_members(decoded))
+        return decoded
+
+
+def _holds_stats(value: Any) -> bool:
+    """Returns whether ``value`` is an untyped JSON object with statistics
+    among its members, or among the members of its untyped members.
+    """
+    return isinstance(value, dict) and any(
+        isinstance(member, AbstractStat) or _holds_stats(member)
+        for member in value.values()
+    )
+
+
+def _as_group(value: Any) -> Any:
+    """Returns a member of a group, converting it to a Group if it is an
+    untyped JSON object which holds statistics.
+    """
+    if _holds_stats(value):
+        return Group(**_group_members(value))
+    return value
+
+
+def _group_members(members: Dict[str, Any]) -> Dict[str, Any]:
+    """Converts the untyped JSON objects which hold statistics among the
+    members of a group to Groups.
+    """
+    return {key: _as_group(value) for key, value in members.items()}
+
+
+# Members whose JSON is smaller than this are decoded as soon as their parent
+# is accessed. Larger groups are only decoded when they are accessed.
+_LAZY_MIN_BYTES = 4096
+
+# The types of JSON object which are loaded lazily, along with the SimStat at
+# the root of the file. All other objects are statistics which are decoded in
+# full when accessed.
+_LAZY_GROUP_TYPES = ("Group", "SimObject", "SimObjectVector")
+
+
+class _LazySource:
+    """
+    A memory-mapped JSON stats file, as written by ``SerializableStat.dump``
+    with indentation. Because JSON strings cannot contain raw newlines, the
+    members of an object at a given nesting depth are exactly the keys that
+    start a line with that depth's indentation. This allows the members of
+    an object to be found with a single regex scan over its bytes, without
+    decoding any of its values.
+    """
+
+    def __init__(self, buffer: mmap.mmap, indent: int):
+        self._buffer = buffer
+        self._indent = indent
+        self._decoder = JsonLoader()
+        self._member_regexes: Dict[int, "re.Pattern[bytes]"] = {}
+        self._element_regexes: Dict[int, "re.Pattern[bytes]"] = {}
+
+    @classmethod
+    def detect_indent(cls, buffer: mmap.mmap) -> Optional[int]:
+        """Returns the indentation of the JSON in ``buffer``, or ``None`` if
+        it is not indented.
+        """
+        match = re.match(rb"\s*\{\n( +)\S", buffer)
+        return len(match.group(1)) if match else None
+
+    def end(self, end: int) -> int:
+        """Returns ``end`` moved back over any separator and whitespace that
+        follows a value.
+        """
+        while self._buffer[end - 1] in b" \t\r\n,":
+            end -= 1
+        return end
+
+    def members(
+        self, start: int, end: int, depth: int
+    ) -> Dict[str, Tuple[int, int]]:
+        """Returns the extent of each member value of the object in
+        ``buffer[start:end]``, whose members are at nesting ``depth``.
+        """
+        if depth not in self._member_regexes:
+            self._member_regexes[depth] = re.compile(
+                rb"\n"
+                + b" " * (depth * self._indent)
+                + rb'("(?:[^"\\]|\\.)*"): '
+            )
+        matches = list(
+            self._member_regexes[depth].finditer(self._buffer, start, end)
+        )
+        # The last member ends before the closing brace of the object.
+        limits = [match.start() for match in matches[1:]] + [end - 1]
+        return {
+            json.loads(match.group(1)): (match.end(), self.end(limit))
+            for match, limit in zip(matches, limits)
+        }
 
+    def elements(
+        self, start: int, end: int, depth: int
+    ) -> List[Tuple[int, int]]:
+        """Returns the extent of each element of the list of objects in
+        ``buffer[start:end]``, whose elements are at nesting ``depth``.
+        """
+        if depth not in self._element_regexes:
+            self._element_regexes[depth] = re.compile(
+                rb"\n" + b" " * (depth * self._indent) + rb"\{"
+            )
+        begins = [
+            match.end() - 1
+            for match in self._element_regexes[depth].finditer(
+                self._buffer, start, end
+            )
+        ]
+        limits = begins[1:] + [end - 1]
+        return [
+            (begin, self.end(limit)) for begin, limit in zip(begins, limits)
+        ]
 
-def load(json_file: IO) -> SimStat:
+    def decode(self, start: int, end: int) -> Any:
+        """Decodes ``buffer[start:end]`` in full."""
+        # ``raw_decode`` does not wrap untyped objects in a SimStat.
+        text = self._buffer[start:end].decode()
+        return self._decoder.raw_decode(text)[0]
+
+    def load(self, start: int, end: int, depth: int) -> Any:
+        """Loads the value in ``buffer[start:end]``, whose members (if it is
+        an object) are at nesting ``depth``. Groups are loaded lazily.
+        """
+        if end - start < _LAZY_MIN_BYTES or self._buffer[start] != ord("{"):
+            value = self.decode(start, end)
+            # The value at depth 1 is the SimStat at the root of the file.
+            if depth == 1 and isinstance(value, dict):
+                return SimStat(**_group_members(value))
+            return _as_group(value)
+
+        members = self.members(start, end, depth)
+        stat_type = (
+            self.decode(*members["type"]) if "type" in members else None
+        )
+        if stat_type is None and depth == 1:
+            return LazySimStat._from_members(self, members, depth)
+        if stat_type not in _LAZY_GROUP_TYPES:
+            return _as_group(self.decode(start, end))
+
+        if stat_type == "SimObjectVector":
+            kwargs = {
+                key: self.decode(*extent)
+                for key, extent in members.items()
+                if key not in ("type", "value")
+            }
+            value_start, value_end = members["value"]
+            return SimObjectVectorGroup(
+                value=[
+                    self.load(begin, limit, depth + 2)
+                    for begin, limit in self.elements(
+                        value_start, value_end, depth + 1
+                    )
+                ],
+                **kwargs,
+            )
+
+        if stat_type == "SimObject":
+            return LazySimObjectGroup._from_members(self, members, depth)
+        return LazyGroup._from_members(self, members, depth)
+
+
+class _LazyGroupMixin:
+    """
+    Defers decoding the larger members of a Group until they are accessed.
+    Pending members are held in slots, not the instance dictionary, so they
+    are never mistaken for statistics.
+    """
+
+    __slots__ = ("_lazy_source", "_lazy_pending")
+
+    @classmethod
+    def _from_members(
+        cls,
+        source: _LazySource,
+        members: Dict[str, Tuple[int, int]],
+        depth: int,
+    ) -> "_LazyGroupMixin":
+        kwargs = {}
+        pending = {}
+        for key, (start, end) in members.items():
+            if end - start < _LAZY_MIN_BYTES:
+                kwargs[key] = _as_group(source.decode(start, end))
+            else:
+                pending[key] = (start, end, depth + 1)
+        # The type is implied by the class.
+        if cls is not LazyGroup:
+            kwargs.pop("type", None)
+
+        group = cls.__new__(cls)
+        object.__setattr__(group, "_lazy_source", source)
+        object.__setattr__(group, "_lazy_pending", pending)
+        group.__init__(**kwargs)
+        return group
+
+    def _load_member(self, item: str) -> Any:
+        start, end, depth = self._lazy_pending.pop(item)
+        value = self._lazy_source.load(start, end, depth)
+        setattr(self, item, value)
+        return value
+
+    def _materialize(self) -> None:
+        for item in list(self._lazy_pending):
+            self._load_member(item)
+
+    def __getattr__(self, item: str) -> Any:
+        if item.startswith("_lazy_"):
+            raise AttributeError(item)
+        if item in self._lazy_pending:
+            return self._load_member(item)
+        return super().__getattr__(item)
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._lazy_pending or super().__contains__(item)
+
+    def __iter__(self):
+        self._materialize()
+        return super().__iter__()
+
+    def children(self, *args, **kwargs) -> List[AbstractStat]:
+        self._materialize()
+        return super().children(*args, **kwargs)
+
+    def to_json(self) -> Dict:
+        self._materialize()
+        return super().to_json()
+
+    def find_path(self, path: str) -> Optional[AbstractStat]:
+        # Only decode the members along the path, rather than building an
+        # index of the entire subtree.
+        match = _PATH_SEPARATOR.search(path)
+        name = path[: match.start()] if match else path
+        child = self[name]
+        if not isinstance(child, AbstractStat):
+            return None
+        if not match:
+            return child
+        return child.find_path(path[match.end() :])
+
+
+class LazySimStat(_LazyGroupMixin, SimStat):
+    """A SimStat whose groups are decoded from the JSON file on access."""
+
+
+class LazyGroup(_LazyGroupMixin, Group):
+    """A Group whose members are decoded from the JSON file on access."""
+
+
+class LazySimObjectGroup(_LazyGroupMixin, SimObjectGroup):
+    """A SimObjectGroup whose members are decoded from the JSON file on
+    access.
+    """
+
+
+def load(json_file: IO, lazy: bool = False) -> SimStat:
     """
     Wrapper function that provides a cleaner interface for using the
     JsonLoader class.
@@ -101,7 +394,22 @@ def load(json_file: IO) -> SimStat:
             with open(path) as f:
                 pystats.jsonloader.load(f)
 
+    :param json_file: The JSON stats file.
+    :param lazy: If ``True``, the file is memory-mapped and each group is
+                 only decoded when it is first accessed, so memory use scales
+                 with the stats queried rather than the file size. The file
+                 must not be modified while the returned SimStat is in use.
+                 This requires the indented JSON written by gem5's ``json://``
+                 stats output; other files are loaded in full.
     """
 
+    if lazy:
+        buffer = mmap.mmap(json_file.fileno(), 0, access=mmap.ACCESS_READ)
+        indent = _LazySource.detect_indent(buffer)
+        if indent is not None:
+            source = _LazySource(buffer, indent)
+            return source.load(0, source.end(len(buffer)), 1)
+        buffer.close()
+
     simstat_object = json.load(json_file, cls=JsonLoader)
     return simstat_object
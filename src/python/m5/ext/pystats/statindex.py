@@ -0,0 +1,179 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+A lookup index over a PyStats tree. The index is built in a single walk of
+the tree and serves ``AbstractStat.find`` as well as dotted-path and prefix
+lookups without walking the tree again.
+"""
+
+import re
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from .abstract_stat import AbstractStat
+
+# Splits a dotted stat path into its components. Vector elements are
+# separated from the vector name by "::", as in the ``stats.txt`` output.
+_PATH_SEPARATOR = re.compile(r"\.|::")
+
+
+class _TrieNode:
+    __slots__ = ("stat", "children")
+
+    def __init__(self):
+        self.stat: Optional["AbstractStat"] = None
+        self.children: Dict[str, "_TrieNode"] = {}
+
+
+class StatIndex:
+    """
+    An index of every stat beneath a root stat.
+
+    Paths follow the ``stats.txt`` naming: Group members are joined with
+    ".", the elements of a SimObject vector with more than one element are
+    suffixed with their index (e.g., ``cpu0``), and the elements of a
+    Vector, Vector2d or Distribution are joined to the stat name with "::".
+    """
+
+    def __init__(self, root: "AbstractStat"):
+        # ``find`` matches on the names of the stats returned by
+        # ``children``, so the index records them in exactly that order.
+        names: List[str] = []
+
+        def record(name: str) -> bool:
+            names.append(name)
+            return True
+
+        self._ordered = root.children(predicate=record, recursive=True)
+        assert len(names) == len(self._ordered)
+
+        self._positions: Dict[str, List[int]] = {}
+        for position, name in enumerate(names):
+            self._positions.setdefault(name, []).append(position)
+
+        self._find_cache: Dict[Pattern, List["AbstractStat"]] = {}
+
+        self._stats: List["AbstractStat"] = []
+        self._paths: Dict[str, "AbstractStat"] = {}
+        self._trie = _TrieNode()
+        self._add_children(root, "")
+
+    def _add_children(self, stat: "AbstractStat", path: str) -> None:
+        for suffix, child in _named_children(stat):
+            child_path = path + suffix if path else suffix.lstrip(".:")
+            self._stats.append(child)
+            self._paths[child_path] = child
+            node = self._trie
+            for component in _PATH_SEPARATOR.split(child_path):
+                node = node.children.setdefault(component, _TrieNode())
+            node.stat = child
+            self._add_children(child, child_path)
+
+    def stats(self) -> List["AbstractStat"]:
+        """Returns every stat beneath the root."""
+        return list(self._stats)
+
+    def find(self, pattern: Pattern) -> List["AbstractStat"]:
+        """Returns the stats whose names match ``pattern`` (using
+        ``re.match``), in the order ``AbstractStat.children`` yields them.
+        """
+        if pattern not in self._find_cache:
+            positions = []
+            for name, name_positions in self._positions.items():
+                if pattern.match(name):
+                    positions.extend(name_positions)
+            positions.sort()
+            self._find_cache[pattern] = [self._ordered[p] for p in positions]
+        return list(self._find_cache[pattern])
+
+    def get(self, path: str) -> Optional["AbstractStat"]:
+        """Returns the stat at the given dotted path, or ``None``."""
+        return self._paths.get(path)
+
+    def find_prefix(self, prefix: str) -> List["AbstractStat"]:
+        """Returns the stat at ``prefix`` and every stat beneath it. The
+        prefix must consist of whole path components.
+        """
+        node = self._trie
+        if prefix:
+            for component in _PATH_SEPARATOR.split(prefix):
+                node = node.children.get(component)
+                if node is None:
+                    return []
+        found = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.stat is not None:
+                found.append(node.stat)
+            stack.extend(reversed(list(node.children.values())))
+        return found
+
+
+def _named_children(stat: "AbstractStat") -> List[Tuple[str, "AbstractStat"]]:
+    """Returns the direct children of ``stat`` paired with the suffix which
+    is appended to the path of ``stat`` to form the path of the child.
+    """
+    from .abstract_stat import AbstractStat
+    from .group import (
+        Group,
+        SimObjectVectorGroup,
+    )
+    from .statistic import (
+        Vector,
+        Vector2d,
+    )
+
+    if isinstance(stat, SimObjectVectorGroup):
+        # As in ``m5.stats._bindStatHierarchy``, the element of a vector
+        # with a single element shares the name of the vector.
+        single = len(stat.value) == 1
+        return [
+            ("" if single else str(index), child)
+            for index, child in enumerate(stat.value)
+            if isinstance(child, AbstractStat)
+        ]
+    if isinstance(stat, Group):
+        return [
+            (f".{name}", child)
+            for name, child in stat.__dict__.items()
+            if isinstance(child, AbstractStat)
+        ]
+    if isinstance(stat, (Vector, Vector2d)) and isinstance(stat.value, dict):
+        return [
+            (f"::{key}", child)
+            for key, child in stat.value.items()
+            if isinstance(child, AbstractStat)
+        ]
+    return []
@@ -0,0 +1,362 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+A streaming reader for the text statistics format produced by gem5's
+``stats.txt`` output.
+
+A ``stats.txt`` file may contain many dumps, each delimited by a
+"Begin Simulation Statistics" and "End Simulation Statistics" line. The
+reader makes a single pass over the file and records, for each dump, the
+byte offset of every statistic line. The statistic names are stored once and
+shared by every dump, each of which only holds an array of offsets, and
+values are only read back from the file when they are requested. The memory
+required is therefore one table of names plus eight bytes per statistic per
+dump, however long the lines of the dumps are.
+
+Usage
+-----
+
+.. code-block::
+
+    from m5.ext.pystats.statstxt import StatsTxtReader, load_table
+
+    reader = StatsTxtReader("m5out/stats.txt")
+    ipc = reader.get("board.processor.cores.core.ipc")
+
+    table = load_table(
+        ["results/astar", "results/mcf"],
+        ["simInsts", "board.cache_hierarchy.*.overallMisses::total"],
+    )
+    table.to_csv(open("table.csv", "w"))
+"""
+
+import array
+import fnmatch
+import re
+from pathlib import Path
+from typing import (
+    IO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Union,
+)
+
+_BEGIN_MARKER = b"---------- Begin Simulation Statistics"
+_END_MARKER = b"---------- End Simulation Statistics"
+
+
+def _parse_value(token: bytes) -> float:
+    """Converts a value token from a ``stats.txt`` line to a float. Tokens
+    which cannot be interpreted as a number (e.g., "nan" variants printed by
+    different C libraries) are returned as NaN.
+    """
+    try:
+        return float(token)
+    except ValueError:
+        return float("nan")
+
+
+def _is_glob(pattern: str) -> bool:
+    return any(c in pattern for c in "*?[")
+
+
+class StatsTxtDump:
+    """
+    The index of a single dump within a ``stats.txt`` file. Records the byte
+    offset of the line on which each statistic appears.
+    """
+
+    def __init__(self, reader: "StatsTxtReader", begin: int):
+        self._reader = reader
+        self.begin = begin
+        self.end: Optional[int] = None
+        # The offset of each statistic, indexed by the position of its name
+        # in the reader's name table, or -1 if it is not in this dump.
+        self._offsets = array.array("q", [-1]) * len(reader._names)
+        self._count = 0
+
+    def _add(self, name: str, offset: int) -> None:
+        names = self._reader._names
+        position = names.setdefault(name, len(names))
+        if position >= len(self._offsets):
+            self._offsets.extend([-1] * (position + 1 - len(self._offsets)))
+        if self._offsets[position] < 0:
+            self._count += 1
+        self._offsets[position] = offset
+
+    def _offset(self, name: str) -> int:
+        position = self._reader._names.get(name)
+        if position is None or position >= len(self._offsets):
+            return -1
+        return self._offsets[position]
+
+    def names(self) -> List[str]:
+        """Returns the names of all the statistics in this dump, in the order
+        in which they appear in the file.
+        """
+        found = [
+            (self._offsets[position], name)
+            for name, position in self._reader._names.items()
+            if position < len(self._offsets) and self._offsets[position] >= 0
+        ]
+        return [name for _, name in sorted(found)]
+
+    def __contains__(self, name: str) -> bool:
+        return self._offset(name) >= 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def match(self, patterns: Iterable[str]) -> List[str]:
+        """Returns the names of the statistics in this dump which match any of
+        the given patterns. A pattern is either an exact statistic name or a
+        shell-style glob (see ``fnmatch``).
+
+        :param patterns: The exact names or globs to match.
+
+        :returns: The matching statistic names, in the order of ``patterns``
+                  and then in file order, without duplicates.
+        """
+        found = {}
+        names = None
+        for pattern in patterns:
+            if not _is_glob(pattern):
+                if pattern in self:
+                    found[pattern] = None
+                continue
+            if names is None:
+                names = self.names()
+            regex = re.compile(fnmatch.translate(pattern))
+            for name in names:
+                if regex.match(name):
+                    found[name] = None
+        return list(found)
+
+    def get(self, name: str) -> Optional[float]:
+        """Returns the value of the named statistic, or ``None`` if the
+        statistic is not present in this dump.
+        """
+        values = self.read([name])
+        return values.get(name)
+
+    def read(self, names: Iterable[str]) -> Dict[str, float]:
+        """Reads the values of the named statistics from the file. Names not
+        present in this dump are omitted from the returned dictionary, which
+        is otherwise ordered as ``names``.
+        """
+        offsets = {name: self._offset(name) for name in names}
+        names = [name for name in names if offsets[name] >= 0]
+        # Visit the lines in file order so the reads only ever seek forward.
+        values = {}
+        with open(self._reader.path, "rb") as f:
+            for name in sorted(names, key=offsets.__getitem__):
+                f.seek(offsets[name])
+                tokens = f.readline().split(None, 2)
+                values[name] = _parse_value(tokens[1])
+        return {name: values[name] for name in names}
+
+
+class StatsTxtReader:
+    """
+    Reads a gem5 ``stats.txt`` file. The file is indexed lazily, in a single
+    streaming pass, the first time a dump is accessed.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        :param path: The path to the ``stats.txt`` file, or to a directory
+                     containing one (e.g., a gem5 output directory).
+        """
+        path = Path(path)
+        if path.is_dir():
+            path = path / "stats.txt"
+        self.path = path
+        # The position of each statistic name in the dumps' offset arrays.
+        self._names: Dict[str, int] = {}
+        self._dumps: Optional[List[StatsTxtDump]] = None
+
+    def _build_index(self) -> List[StatsTxtDump]:
+        dumps = []
+        current = None
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                line_offset = offset
+                offset += len(line)
+                if line.startswith(b"-"):
+                    if line.startswith(_BEGIN_MARKER):
+                        current = StatsTxtDump(self, line_offset)
+                        dumps.append(current)
+                    elif line.startswith(_END_MARKER) and current:
+                        current.end = offset
+                        current = None
+                    continue
+                if current is None:
+                    continue
+                tokens = line.split(None, 1)
+                if not tokens or tokens[0].startswith(b"#"):
+                    continue
+                current._add(tokens[0].decode(), line_offset)
+        return dumps
+
+    @property
+    def dumps(self) -> List[StatsTxtDump]:
+        """The dumps in the file, in the order in which they were written."""
+        if self._dumps is None:
+            self._dumps = self._build_index()
+        return self._dumps
+
+    def __len__(self) -> int:
+        return len(self.dumps)
+
+    def __iter__(self) -> Iterator[StatsTxtDump]:
+        return iter(self.dumps)
+
+    def __getitem__(self, dump: int) -> StatsTxtDump:
+        return self.dumps[dump]
+
+    def get(self, name: str, dump: int = -1) -> Optional[float]:
+        """Returns the value of a statistic.
+
+        :param name: The full dotted name of the statistic as it appears in
+                     the file (e.g., ``board.processor.cores.core.ipc``).
+        :param dump: The index of the dump to read from. By default the last
+                     dump in the file is used.
+
+        :returns: The value, or ``None`` if the statistic is not present.
+        """
+        if not self.dumps:
+            return None
+        return self.dumps[dump].get(name)
+
+    def select(
+        self, patterns: Iterable[str], dump: int = -1
+    ) -> Dict[str, float]:
+        """Returns the values of all statistics which match the given exact
+        names or globs.
+
+        :param patterns: The exact names or globs to select.
+        :param dump: The index of the dump to read from. By default the last
+                     dump in the file is used.
+        """
+        if not self.dumps:
+            return {}
+        selected = self.dumps[dump]
+        return selected.read(selected.match(patterns))
+
+
+class StatsTable:
+    """
+    A columnar table of statistics. Each row corresponds to one ``stats.txt``
+    dump (typically one simulation) and each column to one statistic. Columns
+    are stored as ``array.array("d")`` objects, so they can be wrapped by
+    NumPy (``numpy.frombuffer``) or Arrow without copying. Missing values are
+    stored as NaN.
+    """
+
+    def __init__(self):
+        self.labels: List[str] = []
+        self.columns: Dict[str, array.array] = {}
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def add_row(self, label: str, values: Dict[str, float]) -> None:
+        """Appends a row to the table. New columns are created as required
+        and back-filled with NaN for the rows which preceded them.
+        """
+        nrows = len(self.labels)
+        for name in values:
+            if name not in self.columns:
+                self.columns[name] = array.array("d", [float("nan")] * nrows)
+        for name, column in self.columns.items():
+            column.append(values.get(name, float("nan")))
+        self.labels.append(label)
+
+    def column(self, name: str) -> array.array:
+        return self.columns[name]
+
+    def to_numpy(self) -> Dict[str, "numpy.ndarray"]:
+        """Returns the columns as NumPy arrays which share memory with this
+        table. Requires NumPy to be installed.
+        """
+        import numpy
+
+        return {
+            name: numpy.frombuffer(column, dtype=numpy.float64)
+            for name, column in self.columns.items()
+        }
+
+    def to_csv(self, fp: IO[str], label_header: str = "label") -> None:
+        """Writes the table to ``fp`` in CSV format, one row per label."""
+        import csv
+
+        writer = csv.writer(fp)
+        names = list(self.columns)
+        writer.writerow([label_header] + names)
+        for row, label in enumerate(self.labels):
+            writer.writerow(
+                [label] + [repr(self.columns[name][row]) for name in names]
+            )
+
+
+def load_table(
+    paths: Iterable[Union[str, Path]],
+    patterns: Iterable[str],
+    dump: int = -1,
+    labels: Optional[Iterable[str]] = None,
+) -> StatsTable:
+    """
+    Materialises the selected statistics from many ``stats.txt`` files into
+    a single ``StatsTable``.
+
+    :param paths: The ``stats.txt`` files, or the output directories which
+                  contain them.
+    :param patterns: The exact statistic names or globs to select.
+    :param dump: The index of the dump to read from each file. By default the
+                 last dump is used.
+    :param labels: Optional row labels. If not given, the name of the
+                   output directory for each file is used.
+    """
+    patterns = list(patterns)
+    table = StatsTable()
+    paths = list(paths)
+    labels = list(labels) if labels is not None else None
+    if labels is not None and len(labels) != len(paths):
+        raise ValueError(
+            "The number of labels must match the number of paths."
+        )
+
+    for i, path in enumerate(paths):
+        reader = StatsTxtReader(path)
+        label = labels[i] if labels is not None else reader.path.parent.name
+        table.add_row(label, reader.select(patterns, dump=dump))
+    return table
@@ -0,0 +1,248 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Reads and writes the binary time-series stats format.
+
+The file begins with a schema which lists every statistic, its type and the
+names of its elements once. It is followed by one fixed-width row per dump,
+so a statistic can be read as an array over time directly from the file
+without parsing.
+
+.. code-block::
+
+    magic           8 bytes, b"GEM5TS01"
+    schema length   4 bytes, unsigned little-endian
+    schema          UTF-8 JSON, padded with spaces to an 8-byte boundary
+    rows            float64 little-endian: the tick, then one value per
+                    column, for each dump
+
+The schema is a JSON object of the form:
+
+.. code-block::
+
+    {"columns": 5,
+     "stats": [{"name": "simInsts", "type": "Scalar", "column": 0,
+                "elements": [""]},
+               {"name": "system.cpu.numCycles", ...}, ...]}
+
+Each statistic occupies consecutive columns, one per element. The element
+names are the ``::`` suffixes used in the text output (e.g., the bucket
+index of a distribution); a scalar has a single unnamed element.
+"""
+
+import array
+import json
+import mmap
+import struct
+import sys
+from typing import (
+    IO,
+    Any,
+    Dict,
+    List,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+MAGIC = b"GEM5TS01"
+
+_HEADER = struct.Struct("<8sI")
+
+
+class TimeSeriesWriter:
+    """
+    Writes dumps to a binary time-series stats file.
+    """
+
+    def __init__(
+        self,
+        fp: IO[bytes],
+        schema: Sequence[Tuple[str, str, Sequence[str]]],
+    ):
+        """
+        :param fp: The binary stream to write to.
+        :param schema: The name, type and element names of each statistic.
+                       A scalar statistic has the single element ``""``.
+        """
+        self._fp = fp
+        stats = []
+        column = 0
+        for name, stat_type, elements in schema:
+            stats.append(
+                {
+                    "name": name,
+                    "type": stat_type,
+                    "column": column,
+                    "elements": list(elements),
+                }
+            )
+            column += len(elements)
+        self.columns = column
+
+        encoded = json.dumps({"columns": column, "stats": stats}).encode()
+        # Pad so that the rows are aligned for memory-mapped access.
+        encoded += b" " * (-(_HEADER.size + len(encoded)) % 8)
+        fp.write(_HEADER.pack(MAGIC, len(encoded)))
+        fp.write(encoded)
+
+    def write(self, tick: int, values: Sequence[float]) -> None:
+        """Writes one dump.
+
+        :param tick: The tick at which the dump was taken.
+        :param values: The value of each column, in schema order.
+        """
+        if len(values) != self.columns:
+            raise ValueError(
+                f"Expected {self.columns} values, got {len(values)}."
+            )
+        row = array.array("d", [tick])
+        row.extend(values)
+        if sys.byteorder != "little":
+            row.byteswap()
+        self._fp.write(row.tobytes())
+
+
+class TimeSeriesReader:
+    """
+    Reads a binary time-series stats file by memory-mapping it. If NumPy is
+    installed, series are returned as ``numpy.ndarray`` views of the file
+    (via ``numpy.memmap``); otherwise they are returned as
+    ``array.array("d")`` objects.
+
+    .. code-block::
+
+        from m5.ext.pystats.timeseries import TimeSeriesReader
+
+        reader = TimeSeriesReader("m5out/stats.ts")
+        insts = reader.series("simInsts")
+        hist = reader.series("system.cpu.fetch.nisnDist")  # dumps x buckets
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, length = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a time-series stats file.")
+            schema = json.loads(f.read(length))
+
+        self._columns: int = schema["columns"]
+        self._stats: Dict[str, Dict[str, Any]] = {
+            stat["name"]: stat for stat in schema["stats"]
+        }
+        self._offset = _HEADER.size + length
+        self._row_size = 8 * (self._columns + 1)
+
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+
+        with open(path, "rb") as f:
+            f.seek(0, 2)
+            rows = (f.tell() - self._offset) // self._row_size
+            self._rows = rows
+            if numpy is not None and rows == 0:
+                self._data = numpy.empty((0, self._columns + 1))
+                self._numpy = numpy
+            elif numpy is not None:
+                self._data = numpy.memmap(
+                    f,
+                    dtype="<f8",
+                    mode="r",
+                    offset=self._offset,
+                    shape=(rows, self._columns + 1),
+                )
+                self._numpy = numpy
+            else:
+                self._numpy = None
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._data = memoryview(self._mmap)[
+                    self._offset : self._offset + rows * self._row_size
+                ].cast("d")
+
+    def __len__(self) -> int:
+        """The number of dumps."""
+        return self._rows
+
+    def names(self) -> List[str]:
+        """The names of the statistics, in schema order."""
+        return list(self._stats)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._stats
+
+    def stat_type(self, name: str) -> str:
+        """The type of a statistic, e.g. ``Scalar`` or ``Distribution``."""
+        return self._stats[name]["type"]
+
+    def elements(self, name: str) -> List[str]:
+        """The element names of a statistic."""
+        return list(self._stats[name]["elements"])
+
+    def _column(self, column: int) -> Union[array.array, "numpy.ndarray"]:
+        if self._numpy is not None:
+            return self._data[:, column]
+        stride = self._columns + 1
+        values = array.array("d", self._data[column::stride])
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values
+
+    @property
+    def ticks(self) -> Union[array.array, "numpy.ndarray"]:
+        """The tick of each dump."""
+        return self._column(0)
+
+    def series(
+        self, name: str, element: Union[str, None] = None
+    ) -> Union[array.array, "numpy.ndarray", Dict[str, array.array]]:
+        """Returns the value of a statistic over time.
+
+        :param name: The statistic's name.
+        :param element: Optional. The name of one element of a vector or
+                        distribution.
+
+        :returns: For a scalar, or when ``element`` is given, the value in
+                  each dump. Otherwise, with NumPy, a 2D array of dumps by
+                  elements, or without NumPy, a dictionary of element name
+                  to series.
+        """
+        stat = self._stats[name]
+        first = stat["column"] + 1
+        elements = stat["elements"]
+        if element is not None:
+            return self._column(first + elements.index(element))
+        if elements == [""]:
+            return self._column(first)
+        if self._numpy is not None:
+            return self._data[:, first : first + len(elements)]
+        return {
+            element: self._column(first + index)
+            for index, element in enumerate(elements)
+        }
@@ -227,6 +227,22 @@ def parse_options():
         default="stats.txt",
         help="Sets the output file for statistics [Default: %default]",
     )
+    option(
+        "--stats-include",
+        metavar="GLOB[,GLOB]",
+        action="append",
+        split=",",
+        help="Only output the statistics whose dotted names match GLOB "
+        "(e.g., 'board.processor.*.ipc') to the statistics file",
+    )
+    option(
+        "--stats-exclude",
+        metavar="GLOB[,GLOB]",
+        action="append",
+        split=",",
+        help="Do not output the statistics whose dotted names match GLOB "
+        "to the statistics file",
+    )
     option(
         "--stats-help",
         action="callback",
@@ -557,7 +573,11 @@ def main():
     sys.path[0:0] = options.path
 
     # set stats options
-    stats.addStatVisitor(options.stats_file)
+    stats.addStatVisitor(
+        options.stats_file,
+        include=options.stats_include,
+        exclude=options.stats_exclude,
+    )
 
     # Disable listeners unless running interactively or explicitly
     # enabled
@@ -42,7 +42,154 @@
 #
 #####################################################################
 
-import copy
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# The resolution cache in use while a whole hierarchy is unproxied (see
+# memoized_resolution()), or None.
+_resolution_cache = None
+
+
+class _ResolutionCache:
+    """Memoizes the tree searches behind Parent.any and Self.all.
+
+    The objects are given in descendants() order, so every subtree is a
+    contiguous slice of the list and a search of a subtree becomes a bisect
+    into per-type position lists built once. The shape of the hierarchy must
+    not change while the cache is in use, but parameter values may (they are
+    replaced as proxies are resolved), so only where candidates live is
+    cached and their current values are read on every lookup.
+    """
+
+    def __init__(self, objs):
+        self._objs = list(objs)
+        self._pos = {id(obj): i for i, obj in enumerate(self._objs)}
+
+        # _end[i] is one past the last descendant of _objs[i]
+        sizes = [1] * len(self._objs)
+        for i in range(len(self._objs) - 1, 0, -1):
+            parent = self._pos.get(id(self._objs[i]._parent))
+            if parent is not None:
+                sizes[parent] += sizes[i]
+        self._end = [i + size for i, size in enumerate(sizes)]
+
+        # (class, ptype) -> names of the class's params of type ptype
+        self._param_names = {}
+        # (id(obj), ptype) -> obj's direct children of type ptype
+        self._any_children = {}
+        # ptype -> positions of the objects of type ptype
+        self._type_index = {}
+        # ptype -> positions of the objects with a param of type ptype
+        self._param_index = {}
+
+    def _params_of_type(self, cls, ptype):
+        key = (cls, ptype)
+        names = self._param_names.get(key)
+        if names is None:
+            names = [
+                pname
+                for pname, pdesc in cls._params.items()
+                if issubclass(pdesc.ptype, ptype)
+            ]
+            self._param_names[key] = names
+        return names
+
+    def _in_subtree(self, index, ptype, pos, end):
+        positions = index[ptype]
+        first = bisect_left(positions, pos)
+        last = bisect_left(positions, end, first)
+        return positions[first:last]
+
+    def find_any(self, obj, ptype):
+        pos = self._pos.get(id(obj))
+        if pos is None:
+            return obj.find_any(ptype)
+
+        if isinstance(obj, ptype):
+            return obj, True
+
+        key = (id(obj), ptype)
+        children = self._any_children.get(key)
+        if children is None:
+            children = [
+                child
+                for child in obj._children.values()
+                if isinstance(child, ptype)
+            ]
+            self._any_children[key] = children
+
+        found_obj = None
+        for child in children:
+            if getattr(child, "_visited", False):
+                continue
+            if found_obj != None and child != found_obj:
+                raise AttributeError(
+                    "parent.any matched more than one: %s %s"
+                    % (found_obj.path, child.path)
+                )
+            found_obj = child
+        # search param space
+        for pname in self._params_of_type(type(obj), ptype):
+            match_obj = obj._values[pname]
+            if found_obj != None and found_obj != match_obj:
+                raise AttributeError(
+                    "parent.any matched more than one: %s and %s"
+                    % (found_obj.path, match_obj.path)
+                )
+            found_obj = match_obj
+        return found_obj, found_obj != None
+
+    def find_all(self, obj, ptype):
+        from .params import isNullPointer
+
+        pos = self._pos.get(id(obj))
+        if pos is None:
+            return obj.find_all(ptype)
+
+        if ptype not in self._type_index:
+            self._type_index[ptype] = [
+                i for i, o in enumerate(self._objs) if isinstance(o, ptype)
+            ]
+            self._param_index[ptype] = [
+                i
+                for i, o in enumerate(self._objs)
+                if self._params_of_type(type(o), ptype)
+            ]
+
+        end = self._end[pos]
+        all = {}
+        # search the sub-tree, excluding obj itself
+        for i in self._in_subtree(self._type_index, ptype, pos + 1, end):
+            child = self._objs[i]
+            if not isproxy(child) and not isNullPointer(child):
+                all[child] = True
+        # search the param space of obj and the sub-tree
+        for i in self._in_subtree(self._param_index, ptype, pos, end):
+            o = self._objs[i]
+            for pname in self._params_of_type(type(o), ptype):
+                match_obj = o._values[pname]
+                if not isproxy(match_obj) and not isNullPointer(match_obj):
+                    all[match_obj] = True
+        # Also make sure to sort the keys based on the objects' path to
+        # ensure that the order is the same on all hosts
+        return sorted(all.keys(), key=lambda o: o.path()), True
+
+
+@contextmanager
+def memoized_resolution(objs):
+    """Memoize Parent.any and Self.all resolution within the block.
+
+    :param objs: Every object in the hierarchy being unproxied, in
+                 descendants() order. The hierarchy must not gain or lose
+                 objects inside the block.
+    """
+    global _resolution_cache
+    previous = _resolution_cache
+    _resolution_cache = _ResolutionCache(objs)
+    try:
+        yield
+    finally:
+        _resolution_cache = previous
 
 
 class BaseProxy:
@@ -185,7 +332,7 @@ class AttrProxy(BaseProxy):
         # Return a copy of self rather than modifying self in place
         # since self could be an indirect reference via a variable or
         # parameter
-        new_self = copy.deepcopy(self)
+        new_self = self._copy()
         new_self._modifiers.append(attr)
         return new_self
 
@@ -195,10 +342,20 @@ class AttrProxy(BaseProxy):
             raise TypeError("Proxy object requires integer index")
         if hasattr(self, "_pdesc"):
             raise AttributeError("Index operation on bound proxy")
-        new_self = copy.deepcopy(self)
+        new_self = self._copy()
         new_self._modifiers.append(key)
         return new_self
 
+    def _copy(self):
+        # An unbound proxy only holds its attribute name and the lists of
+        # modifiers and operations, so copying those lists is enough; a
+        # deepcopy would also copy any proxies used as operands.
+        new_self = object.__new__(self.__class__)
+        new_self.__dict__.update(self.__dict__)
+        new_self._modifiers = list(self._modifiers)
+        new_self._ops = list(self._ops)
+        return new_self
+
     def find(self, obj):
         try:
             val = getattr(obj, self._attr)
@@ -244,6 +401,8 @@ class AttrProxy(BaseProxy):
 
 class AnyProxy(BaseProxy):
     def find(self, obj):
+        if _resolution_cache is not None:
+            return _resolution_cache.find_any(obj, self._pdesc.ptype)
         return obj.find_any(self._pdesc.ptype)
 
     def path(self):
@@ -254,6 +413,8 @@ class AnyProxy(BaseProxy):
 # and adds all objects of a specific type
 class AllProxy(BaseProxy):
     def find(self, obj):
+        if _resolution_cache is not None:
+            return _resolution_cache.find_all(obj, self._pdesc.ptype)
         return obj.find_all(self._pdesc.ptype)
 
     def path(self):
@@ -40,6 +40,8 @@
 import atexit
 import os
 import sys
+import time
+from contextlib import contextmanager
 
 from m5.util.dot_writer import (
     do_dot,
@@ -61,9 +63,11 @@ from . import (
     ticks,
 )
 from .citations import gather_citations
+from .proxy import memoized_resolution
 from .util import (
     attrdict,
     fatal,
+    inform,
     warn,
 )
 
@@ -74,6 +78,52 @@ _drain_manager = _m5.drain.DrainManager.instance()
 
 _instantiated = False  # Has m5.instantiate() been called?
 
+# The flattened SimObject hierarchy, in descendants() order, built once by
+# m5.instantiate(). The hierarchy cannot change after instantiation, so later
+# whole-tree passes reuse this list rather than re-walking the tree.
+_instantiated_objects = []
+
+
+def _flatten_hierarchy(root):
+    """Walk the hierarchy under root once, returning the objects in
+    descendants() order together with a dict mapping id(obj) to its path.
+
+    Paths are derived from the parent's (already computed) path, so each
+    object costs O(1) rather than a walk back up to the root.
+    """
+    objs = list(root.descendants())
+    paths = {}
+    for obj in objs:
+        ppath = paths.get(id(obj._parent))
+        if ppath is None:
+            path = obj.path()
+        elif ppath == "root":
+            path = obj._name
+        else:
+            path = ppath + "." + obj._name
+        paths[id(obj)] = path
+    return objs, paths
+
+
+def _descendants(root):
+    """Return the objects under root, reusing the list built by
+    m5.instantiate() when root is the instantiated root."""
+    if _instantiated_objects and _instantiated_objects[0] is root:
+        return _instantiated_objects
+    return root.descendants()
+
+
+@contextmanager
+def _timed_phase(name, verbose):
+    start = time.perf_counter()
+    yield
+    if verbose:
+        inform(
+            "instantiate: %s took %.3f ms",
+            name,
+            (time.perf_counter() - start) * 1000.0,
+        )
+
 
 # The final call to instantiate the SimObject graph and initialize the
 # system.
@@ -91,66 +141,90 @@ def instantiate(ckpt_dir=None):
     if not root:
         fatal("Need to instantiate Root() before calling instantiate()")
 
+    # Per-phase timings are reported with --verbose.
+    verbose = getattr(options, "verbose", 0) > 0
+
     # we need to fix the global frequency
     ticks.fixGlobalFrequency()
 
     # Make sure SimObject-valued params are in the configuration
-    # hierarchy so we catch them with future descendants() walks
-    for obj in root.descendants():
-        obj.adoptOrphanParams()
+    # hierarchy so we catch them with future descendants() walks. This
+    # pass may add children, so it has to walk the live tree.
+    with _timed_phase("adoptOrphanParams", verbose):
+        for obj in root.descendants():
+            obj.adoptOrphanParams()
+
+    # The hierarchy is fixed from here on: flatten it once and reuse the
+    # list (and the paths) for every remaining pass.
+    with _timed_phase("flatten hierarchy", verbose):
+        objs, paths = _flatten_hierarchy(root)
+    _instantiated_objects[:] = objs
 
     # Unproxy in sorted order for determinism
-    for obj in root.descendants():
-        obj.unproxyParams()
+    with _timed_phase("unproxyParams", verbose):
+        with memoized_resolution(objs):
+            for obj in objs:
+                obj.unproxyParams()
 
     if options.dump_config:
-        ini_file = open(os.path.join(options.outdir, options.dump_config), "w")
-        # Print ini sections in sorted order for easier diffing
-        for obj in sorted(root.descendants(), key=lambda o: o.path()):
-            obj.print_ini(ini_file)
-        ini_file.close()
+        with _timed_phase("dump_config", verbose):
+            ini_file = open(
+                os.path.join(options.outdir, options.dump_config), "w"
+            )
+            # Print ini sections in sorted order for easier diffing
+            for obj in sorted(objs, key=lambda o: paths[id(o)]):
+                obj.print_ini(ini_file)
+            ini_file.close()
 
     if options.json_config:
-        try:
-            import json
-
-            json_file = open(
-                os.path.join(options.outdir, options.json_config), "w"
-            )
-            d = root.get_config_as_dict()
-            json.dump(d, json_file, indent=4)
-            json_file.close()
-        except ImportError:
-            pass
+        with _timed_phase("json_config", verbose):
+            try:
+                import json
+
+                json_file = open(
+                    os.path.join(options.outdir, options.json_config), "w"
+                )
+                d = root.get_config_as_dict()
+                json.dump(d, json_file, indent=4)
+                json_file.close()
+            except ImportError:
+                pass
 
     if options.dot_config:
-        do_dot(root, options.outdir, options.dot_config)
-        do_ruby_dot(root, options.outdir, options.dot_config)
+        with _timed_phase("dot_config", verbose):
+            do_dot(root, options.outdir, options.dot_config)
+            do_ruby_dot(root, options.outdir, options.dot_config)
 
     # Initialize the global statistics
     stats.initSimStats()
 
     # Create the C++ sim objects and connect ports
-    for obj in root.descendants():
-        obj.createCCObject()
-    for obj in root.descendants():
-        obj.connectPorts()
+    with _timed_phase("createCCObject", verbose):
+        for obj in objs:
+            obj.createCCObject()
+    with _timed_phase("connectPorts", verbose):
+        for obj in objs:
+            obj.connectPorts()
 
     # Do a second pass to finish initializing the sim objects
-    for obj in root.descendants():
-        obj.init()
+    with _timed_phase("init", verbose):
+        for obj in objs:
+            obj.init()
 
     # Do a third pass to initialize statistics
-    stats._bindStatHierarchy(root)
-    root.regStats()
+    with _timed_phase("regStats", verbose):
+        stats._bindStatHierarchy(root)
+        root.regStats()
 
     # Do a fourth pass to initialize probe points
-    for obj in root.descendants():
-        obj.regProbePoints()
+    with _timed_phase("regProbePoints", verbose):
+        for obj in objs:
+            obj.regProbePoints()
 
     # Do a fifth pass to connect probe listeners
-    for obj in root.descendants():
-        obj.regProbeListeners()
+    with _timed_phase("regProbeListeners", verbose):
+        for obj in objs:
+            obj.regProbeListeners()
 
     # We want to generate the DVFS diagram for the system. This can only be
     # done once all of the CPP objects have been created and initialised so
@@ -163,43 +237,69 @@ def instantiate(ckpt_dir=None):
 
     # Restore checkpoint (if any)
     if ckpt_dir:
-        _drain_manager.preCheckpointRestore()
-        ckpt = _m5.core.getCheckpoint(ckpt_dir)
-        for obj in root.descendants():
-            obj.loadState(ckpt)
+        with _timed_phase("loadState", verbose):
+            _drain_manager.preCheckpointRestore()
+            ckpt = _m5.core.getCheckpoint(ckpt_dir)
+            for obj in objs:
+                obj.loadState(ckpt)
     else:
-        for obj in root.descendants():
-            obj.initState()
+        with _timed_phase("initState", verbose):
+            for obj in objs:
+                obj.initState()
 
     # Check to see if any of the stat events are in the past after resuming from
     # a checkpoint, If so, this call will shift them to be at a valid time.
     updateStatEvents()
 
-    gather_citations(root)
+    with _timed_phase("gather_citations", verbose):
+        gather_citations(root, objs)
 
 
 need_startup = True
 
+# Has simulate() registered _exit_cleanup() to run at exit?
+_exit_cleanup_pending = False
+
+
+def _exit_cleanup():
+    """Run the C++ exit callbacks and then dump the final stats.
+
+    simulate() registers this with atexit. Processes which leave through
+    os._exit(), such as forked multisim workers, skip the atexit handlers and
+    call this directly instead. It does nothing after the first call.
+    """
+    global _exit_cleanup_pending
+
+    if not _exit_cleanup_pending:
+        return
+    _exit_cleanup_pending = False
+    atexit.unregister(_exit_cleanup)
+
+    # We want to dump stats last.
+    try:
+        _m5.core.doExitCleanup()
+    finally:
+        stats.dump()
+
 
 def simulate(*args, **kwargs):
     global need_startup
     global _instantiated
+    global _exit_cleanup_pending
 
     if not _instantiated:
         fatal("m5.instantiate() must be called before m5.simulate().")
 
     if need_startup:
         root = objects.Root.getInstance()
-        for obj in root.descendants():
+        for obj in _descendants(root):
             obj.startup()
         need_startup = False
 
-        # Python exit handlers happen in reverse order.
-        # We want to dump stats last.
-        atexit.register(stats.dump)
-
-        # register our C++ exit callback function with Python
-        atexit.register(_m5.core.doExitCleanup)
+        # register our C++ exit callback function and the final stats dump
+        # with Python
+        atexit.register(_exit_cleanup)
+        _exit_cleanup_pending = True
 
         # Reset to put the stats in a consistent state.
         stats.reset()
@@ -312,12 +412,12 @@ def drain():
 
 
 def memWriteback(root):
-    for obj in root.descendants():
+    for obj in _descendants(root):
         obj.memWriteback()
 
 
 def memInvalidate(root):
-    for obj in root.descendants():
+    for obj in _descendants(root):
         obj.memInvalidate()
 
 
@@ -430,7 +530,7 @@ def switchCpus(system, cpuList, verbose=True):
 
 
 def notifyFork(root):
-    for obj in root.descendants():
+    for obj in _descendants(root):
         obj.notifyFork()
 
 
@@ -51,10 +51,19 @@ import _m5.stats
 from _m5.stats import periodicStatDump
 from _m5.stats import schedStatEvent as schedEvent
 
+from .flatstats import (
+    DeltaOutputVisitor,
+    StatSelection,
+    TimeSeriesOutputVisitor,
+)
 from .gem5stats import JsonOutputVistor
 
 outputList = []
 
+# The StatSelection of each output in outputList which only dumps a subset
+# of the statistics.
+outputSelections = {}
+
 # Dictionary of stat visitor factories populated by the _url_factory
 # visitor.
 factories = {}
@@ -202,7 +211,52 @@ def _jsonFactory(fn):
     return JsonOutputVistor(fn)
 
 
-def addStatVisitor(url):
+@_url_factory(["delta"])
+def _deltaFactory(fn, keyframe=100):
+    """Output stats as a delta-encoded text file.
+
+    Periodic stat dumps mostly repeat unchanged values. This format
+    writes a full keyframe dump every 'keyframe' dumps and, between
+    keyframes, only the stats whose values changed since the previous
+    dump. Use m5.ext.pystats.deltastats.DeltaStatsReader to
+    reconstruct any dump.
+
+    Parameters:
+      * keyframe (unsigned): Number of dumps between full dumps
+        (default: 100)
+
+    Example:
+      delta://stats.delta?keyframe=100
+
+    """
+
+    return DeltaOutputVisitor(fn, keyframe)
+
+
+@_url_factory(["ts"])
+def _timeSeriesFactory(fn):
+    """Output stats in a binary time-series format.
+
+    The file starts with a schema listing every stat, its type and
+    its elements once, followed by one fixed-width row of float64
+    values per dump. Unlike the HDF5 output this has no external
+    dependencies and supports vectors, formulas and distributions.
+    Use m5.ext.pystats.timeseries.TimeSeriesReader to read any stat
+    as an array over time.
+
+    Known limitations:
+      * The stats to record are fixed at the first dump, so SparseHist
+        samples first seen in later dumps are not recorded.
+
+    Example:
+      ts://stats.ts
+
+    """
+
+    return TimeSeriesOutputVisitor(fn)
+
+
+def addStatVisitor(url, include=None, exclude=None):
     """Add a stat visitor specified using a URL string
 
     Stat visitors are specified using URLs on the following format:
@@ -213,6 +267,13 @@ def addStatVisitor(url):
     parameters are keyword arguments. Parameter values must be valid
     Python literals.
 
+    The stats dumped by the visitor can be restricted with lists of
+    glob patterns on the dotted stat names, e.g.
+    include=["board.processor.*.ipc"]. A stat is dumped if it
+    matches any include pattern and no exclude pattern. The patterns
+    are resolved once, when the stats are enabled, so dumps only visit
+    the selected stat groups.
+
     """
 
     try:
@@ -231,7 +292,13 @@ def addStatVisitor(url):
     if factory is None:
         fatal(f"Stat type '{parsed.scheme}' disabled at compile time")
 
-    outputList.append(factory(parsed))
+    output = factory(parsed)
+    outputList.append(output)
+
+    if include or exclude:
+        if isinstance(output, JsonOutputVistor):
+            fatal(f"Stat type '{parsed.scheme}' does not support selection.")
+        outputSelections[output] = StatSelection(include, exclude)
 
 
 def printStatVisitorTypes():
@@ -343,6 +410,9 @@ def enable():
 
     _m5.stats.enable()
 
+    for selection in outputSelections.values():
+        selection.resolve()
+
 
 def prepare():
     """Prepare all stats for data access.  This must be done before
@@ -356,6 +426,19 @@ def prepare():
     _visit_stats(lambda g, s: s.prepare())
 
 
+def _prepare_for_dump():
+    """Prepare the stats the outputs will dump.  When every output only
+    dumps a selection of the stats, only the selected stats are prepared."""
+
+    selections = [outputSelections.get(output) for output in outputList]
+    if not selections or not all(selections):
+        prepare()
+        return
+
+    for selection in {id(s): s for s in selections}.values():
+        selection.prepare()
+
+
 def _dump_to_visitor(visitor, roots=None):
     # New stats
     def dump_group(group):
@@ -415,18 +498,27 @@ def dump(roots=None):
         sim_root = Root.getInstance()
         if sim_root:
             sim_root.preDumpStats()
-        prepare()
+        _prepare_for_dump()
 
     for output in outputList:
+        selection = outputSelections.get(output)
         if isinstance(output, JsonOutputVistor):
             if not all_roots:
                 output.dump(Root.getInstance())
             else:
                 output.dump(all_roots)
+        elif isinstance(output, (DeltaOutputVisitor, TimeSeriesOutputVisitor)):
+            output.dump(
+                all_roots if all_roots else Root.getInstance(),
+                selection=selection,
+            )
         else:
             if output.valid():
                 output.begin()
-                _dump_to_visitor(output, roots=all_roots)
+                if selection:
+                    selection.visit(output, roots=all_roots or None)
+                else:
+                    _dump_to_visitor(output, roots=all_roots)
                 output.end()
 
 
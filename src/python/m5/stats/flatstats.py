@@ -0,0 +1,410 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Flattens the gem5 statistics hierarchy into a mapping of dotted stat name to
+value, using the same names as the text (``stats.txt``) output, and provides
+the stat outputs which are built on this flat representation.
+"""
+
+import fnmatch
+import os
+import re
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+    Union,
+)
+
+import m5
+from m5.ext.pystats.deltastats import DeltaStatsWriter
+from m5.ext.pystats.timeseries import TimeSeriesWriter
+from m5.objects import Root
+from m5.SimObject import SimObject
+
+import _m5.stats
+
+
+def _subname(subnames: List[str], index: int) -> str:
+    if index < len(subnames) and subnames[index]:
+        return str(subnames[index])
+    return str(index)
+
+
+def flatten_stat(
+    name: str, info: _m5.stats.Info, flat: Dict[str, float]
+) -> None:
+    """Adds the values of a single statistic to ``flat``. Vectors,
+    distributions and histograms contribute one entry per element, named
+    ``<name>::<element>``.
+    """
+    if isinstance(info, _m5.stats.ScalarInfo):
+        flat[name] = info.result
+    elif isinstance(info, _m5.stats.VectorInfo):
+        # Includes formulas, which are vectors of computed values.
+        result = info.result
+        if len(result) == 1 and not info.subnames:
+            flat[name] = result[0]
+            return
+        for index, value in enumerate(result):
+            flat[f"{name}::{_subname(info.subnames, index)}"] = value
+        flat[f"{name}::total"] = info.total
+    elif isinstance(info, _m5.stats.DistInfo):
+        flat[f"{name}::min_value"] = info.min_val
+        flat[f"{name}::max_value"] = info.max_val
+        flat[f"{name}::underflows"] = info.underflow
+        flat[f"{name}::overflows"] = info.overflow
+        flat[f"{name}::sum"] = info.sum
+        flat[f"{name}::squares"] = info.squares
+        flat[f"{name}::logs"] = info.logs
+        for index, value in enumerate(info.values):
+            flat[f"{name}::{index}"] = value
+    elif isinstance(info, _m5.stats.Vector2dInfo):
+        values = info.value
+        for x in range(info.x_size):
+            xname = _subname(info.subnames, x)
+            for y in range(info.y_size):
+                yname = _subname(info.ysubnames, y)
+                flat[f"{name}::{xname}::{yname}"] = values[x * info.y_size + y]
+    elif isinstance(info, _m5.stats.SparseHistInfo):
+        for sample, count in info.values.items():
+            flat[f"{name}::{sample}"] = count
+
+
+def stat_type(info: _m5.stats.Info) -> str:
+    """Returns the name of the type of a statistic, as used by PyStats."""
+    # FormulaInfo is a subclass of VectorInfo, so must be checked first.
+    for info_type, name in (
+        (_m5.stats.ScalarInfo, "Scalar"),
+        (_m5.stats.FormulaInfo, "Formula"),
+        (_m5.stats.VectorInfo, "Vector"),
+        (_m5.stats.DistInfo, "Distribution"),
+        (_m5.stats.Vector2dInfo, "Vector2d"),
+        (_m5.stats.SparseHistInfo, "SparseHist"),
+    ):
+        if isinstance(info, info_type):
+            return name
+    return "Unknown"
+
+
+def _walk_groups(
+    group: _m5.stats.Group,
+    path: List[str],
+    visit: Callable[[List[str], _m5.stats.Group], None],
+) -> None:
+    visit(path, group)
+    for name, child in group.getStatGroups().items():
+        _walk_groups(child, path + [name], visit)
+
+
+def _prefix(path: List[str]) -> str:
+    return "".join(f"{p}." for p in path)
+
+
+def get_stat_infos(
+    roots: Optional[Union[Root, List[SimObject]]] = None,
+) -> List[Tuple[str, _m5.stats.Info]]:
+    """Returns the full name and Info object of every statistic beneath the
+    given roots, in the order of the text output.
+
+    :param roots: The SimObjects whose statistics are returned. By default
+                  all statistics, including legacy statistics, are returned.
+    """
+    stats = []
+
+    def visit(path: List[str], group: _m5.stats.Group) -> None:
+        prefix = _prefix(path)
+        stats.extend(
+            (f"{prefix}{info.name}", info) for info in group.getStats()
+        )
+
+    if roots is None or isinstance(roots, Root):
+        _walk_groups(Root.getInstance(), [], visit)
+        stats.extend((info.name, info) for info in m5.stats.stats_list)
+    else:
+        for root in roots:
+            _walk_groups(root, root.path_list(), visit)
+    return stats
+
+
+def _compile_globs(patterns: List[str]) -> Optional[Pattern]:
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns))
+
+
+class StatSelection:
+    """
+    The statistics selected for one output by include and exclude globs on
+    their dotted names (e.g., ``board.cache_hierarchy.*.overallMisses``). A
+    statistic is selected if it matches any include pattern and no exclude
+    pattern.
+
+    The globs are matched once, when the selection is resolved (normally by
+    ``m5.stats.enable()``), into the list of selected statistics grouped by
+    their stat group. Dumps then only prepare and visit those groups and
+    statistics.
+    """
+
+    def __init__(
+        self,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+    ):
+        self.include = list(include) if include else ["*"]
+        self.exclude = list(exclude) if exclude else []
+        self._include = _compile_globs(self.include)
+        self._exclude = _compile_globs(self.exclude)
+        # The path and selected statistics of each group with a selected
+        # statistic, in the order of the text output.
+        self._groups: Optional[List[Tuple[List[str], List]]] = None
+        self._legacy: Optional[List[_m5.stats.Info]] = None
+
+    def selects(self, name: str) -> bool:
+        """Returns whether the statistic with the given dotted name is
+        selected.
+        """
+        return bool(self._include.match(name)) and not (
+            self._exclude and self._exclude.match(name)
+        )
+
+    def resolve(self) -> None:
+        """Resolves the patterns against the statistics hierarchy. The
+        statistics cannot change once they are enabled, so this only needs to
+        be done once.
+        """
+        groups = []
+
+        def visit(path: List[str], group: _m5.stats.Group) -> None:
+            prefix = _prefix(path)
+            selected = [
+                info
+                for info in group.getStats()
+                if self.selects(f"{prefix}{info.name}")
+            ]
+            if selected:
+                groups.append((path, selected))
+
+        _walk_groups(Root.getInstance(), [], visit)
+        self._groups = groups
+        self._legacy = [
+            info for info in m5.stats.stats_list if self.selects(info.name)
+        ]
+
+    def _selected_groups(
+        self, roots: Optional[Union[Root, List[SimObject]]]
+    ) -> List[Tuple[List[str], List]]:
+        if self._groups is None:
+            self.resolve()
+        if roots is None or isinstance(roots, Root):
+            return self._groups
+        prefixes = [root.path_list() for root in roots]
+        return [
+            (path, infos)
+            for path, infos in self._groups
+            if any(path[: len(prefix)] == prefix for prefix in prefixes)
+        ]
+
+    def get_stat_infos(
+        self, roots: Optional[Union[Root, List[SimObject]]] = None
+    ) -> List[Tuple[str, _m5.stats.Info]]:
+        """As ``get_stat_infos``, but only for the selected statistics."""
+        stats = []
+        for path, infos in self._selected_groups(roots):
+            prefix = _prefix(path)
+            stats.extend((f"{prefix}{info.name}", info) for info in infos)
+        if roots is None or isinstance(roots, Root):
+            stats.extend((info.name, info) for info in self._legacy)
+        return stats
+
+    def prepare(self) -> None:
+        """Prepares the selected statistics for data access."""
+        for _, infos in self._selected_groups(None):
+            for info in infos:
+                info.prepare()
+        for info in self._legacy:
+            info.prepare()
+
+    def visit(
+        self,
+        visitor: _m5.stats.Output,
+        roots: Optional[Union[Root, List[SimObject]]] = None,
+    ) -> None:
+        """Visits the selected statistics with a C++ stat output."""
+        for path, infos in self._selected_groups(roots):
+            for p in path:
+                visitor.beginGroup(p)
+            for info in infos:
+                info.visit(visitor)
+            for p in path:
+                visitor.endGroup()
+        if roots is None or isinstance(roots, Root):
+            for info in self._legacy:
+                info.visit(visitor)
+
+
+def get_flat_stats(
+    roots: Optional[Union[Root, List[SimObject]]] = None,
+) -> Dict[str, float]:
+    """Returns the value of every statistic beneath the given roots.
+
+    .. warning::
+
+        This assumes the statistics have already been prepared.
+
+    :param roots: The SimObjects whose statistics are returned. By default
+                  all statistics, including legacy statistics, are returned.
+    """
+    flat: Dict[str, float] = {}
+    for name, info in get_stat_infos(roots):
+        flatten_stat(name, info, flat)
+    return flat
+
+
+class DeltaOutputVisitor:
+    """
+    Writes statistics as a delta stats file (see
+    ``m5.ext.pystats.deltastats``), in which only the values which changed
+    since the previous dump are written between periodic keyframes.
+    """
+
+    def __init__(self, file: str, keyframe: int = 100):
+        """
+        :param file: The output file, relative to the output directory.
+        :param keyframe: A full dump is written every ``keyframe`` dumps.
+        """
+        self.file = os.path.join(m5.options.outdir, file)
+        self.keyframe = keyframe
+        self._fp = None
+        self._writer = None
+
+    def dump(
+        self,
+        roots: Union[List[SimObject], Root],
+        selection: Optional[StatSelection] = None,
+    ) -> None:
+        """Writes one dump of the stats of the given roots.
+
+        .. warning::
+
+            This dump assumes the statistics have already been prepared
+            for the target root.
+
+        :param roots: The Root, or List of roots, whose stats are dumped.
+        :param selection: Optional. Only dump the selected statistics.
+        """
+        if self._writer is None:
+            self._fp = open(self.file, "w")
+            self._writer = DeltaStatsWriter(self._fp, self.keyframe)
+        infos = (
+            selection.get_stat_infos(roots)
+            if selection
+            else get_stat_infos(roots)
+        )
+        flat: Dict[str, float] = {}
+        for name, info in infos:
+            flatten_stat(name, info, flat)
+        self._writer.write(m5.curTick(), flat)
+        self._fp.flush()
+
+
+class TimeSeriesOutputVisitor:
+    """
+    Writes statistics in the binary time-series format (see
+    ``m5.ext.pystats.timeseries``): a schema naming every statistic once,
+    followed by one fixed-width row of float64 values per dump.
+    """
+
+    def __init__(self, file: str):
+        """
+        :param file: The output file, relative to the output directory.
+        """
+        self.file = os.path.join(m5.options.outdir, file)
+        self._fp = None
+        self._writer = None
+        self._infos = None
+        self._columns = None
+
+    def _open(
+        self,
+        roots: Union[List[SimObject], Root],
+        selection: Optional[StatSelection],
+    ) -> None:
+        # The statistics cannot change once enabled, so the schema and the
+        # statistics to visit are fixed at the first dump. The elements of a
+        # SparseHist are the samples seen so far, so later samples are not
+        # recorded.
+        self._infos = (
+            selection.get_stat_infos(roots)
+            if selection
+            else get_stat_infos(roots)
+        )
+        schema = []
+        self._columns = []
+        for name, info in self._infos:
+            flat = {}
+            flatten_stat(name, info, flat)
+            schema.append(
+                (
+                    name,
+                    stat_type(info),
+                    [key[len(name) + 2 :] for key in flat],
+                )
+            )
+            self._columns.append(list(flat))
+        self._fp = open(self.file, "wb")
+        self._writer = TimeSeriesWriter(self._fp, schema)
+
+    def dump(
+        self,
+        roots: Union[List[SimObject], Root],
+        selection: Optional[StatSelection] = None,
+    ) -> None:
+        """Writes one dump of the stats of the given roots.
+
+        .. warning::
+
+            This dump assumes the statistics have already been prepared
+            for the target root.
+
+        :param roots: The Root, or List of roots, whose stats are dumped. The
+                      statistics recorded are fixed at the first dump.
+        :param selection: Optional. Only dump the selected statistics.
+        """
+        if self._writer is None:
+            self._open(roots, selection)
+        nan = float("nan")
+        values = []
+        for (name, info), columns in zip(self._infos, self._columns):
+            flat = {}
+            flatten_stat(name, info, flat)
+            values.extend(flat.get(column, nan) for column in columns)
+        self._writer.write(m5.curTick(), values)
+        self._fp.flush()
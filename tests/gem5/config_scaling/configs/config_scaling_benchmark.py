@@ -0,0 +1,370 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+A benchmark of the Python side of gem5 configuration.
+
+For each core count this script builds a SimpleBoard with an N-core
+processor, a private-cache hierarchy and a single channel of memory, and
+then measures the time (and, unless ``--timing-only`` is given, the peak
+Python heap usage) of the configuration phases ``m5.instantiate()`` goes
+through before any C++ object is created:
+
+* ``construction``: building the components, ``_pre_instantiate`` and Root.
+* ``adoptOrphanParams`` and ``unproxyParams``.
+* ``print_ini``, ``get_config_as_dict`` and ``do_dot`` (the
+  ``--dump-config``, ``--json-config`` and ``--dot-config`` outputs).
+
+Nothing is instantiated, so a fresh tree is built for every core count. The
+results are written as a JSON report, by default to ``config_scaling.json``
+in the output directory.
+
+With ``--max-growth``, the script fails if the configuration time per
+SimObject at the largest core count is more than the given factor of that at
+the smallest core count. Configuration which scales linearly in the number of
+SimObjects keeps this near (or below) 1, while a phase which is quadratic in
+the number of SimObjects makes it grow with the core count.
+``--max-memory-growth`` checks the peak Python heap usage per SimObject in
+the same way. Unlike the time, the heap usage does not depend on the load of
+the host, so it is the check to use on shared machines.
+
+Usage
+-----
+
+```
+scons build/ALL/gem5.opt
+./build/ALL/gem5.opt \
+    tests/gem5/config_scaling/configs/config_scaling_benchmark.py \
+    --cores 1 2 4 8 16 32 64 128 256 --hierarchy classic
+```
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import resource
+import tempfile
+import time
+import tracemalloc
+
+import m5
+from m5.objects import Root
+from m5.proxy import memoized_resolution
+from m5.util.dot_writer import do_dot
+
+from gem5.components.boards.simple_board import SimpleBoard
+from gem5.components.memory import SingleChannelDDR4_2400
+from gem5.components.processors.cpu_types import CPUTypes
+from gem5.components.processors.simple_processor import SimpleProcessor
+from gem5.isas import get_isa_from_str
+from gem5.runtime import get_supported_isas
+
+parser = argparse.ArgumentParser(
+    description="Measure the time and memory taken to configure SimpleBoards "
+    "of increasing core counts."
+)
+
+parser.add_argument(
+    "--cores",
+    type=int,
+    nargs="+",
+    default=[1, 2, 4, 8, 16, 32, 64, 128, 256],
+    help="The core counts to benchmark.",
+)
+
+parser.add_argument(
+    "--hierarchy",
+    type=str,
+    choices=["classic", "mesi_two_level", "chi"],
+    default="classic",
+    help="The cache hierarchy. The Ruby hierarchies require a gem5 binary "
+    "compiled with the matching coherence protocol.",
+)
+
+parser.add_argument(
+    "--isa",
+    type=str,
+    default=None,
+    help="The ISA of the cores. Defaults to an ISA compiled into the binary.",
+)
+
+parser.add_argument(
+    "--output",
+    type=str,
+    default=None,
+    help="The path of the JSON report. Defaults to 'config_scaling.json' in "
+    "the output directory.",
+)
+
+parser.add_argument(
+    "--timing-only",
+    action="store_true",
+    help="Do not trace Python memory allocations. Tracing slows every phase "
+    "down, so use this when only the times are of interest.",
+)
+
+parser.add_argument(
+    "--skip-dot",
+    action="store_true",
+    help="Do not benchmark the dot output.",
+)
+
+parser.add_argument(
+    "--max-growth",
+    type=float,
+    default=None,
+    help="Fail if the configuration time per SimObject at the largest core "
+    "count is more than this factor of that at the smallest core count.",
+)
+
+parser.add_argument(
+    "--max-memory-growth",
+    type=float,
+    default=None,
+    help="Fail if the peak Python heap usage per SimObject at the largest "
+    "core count is more than this factor of that at the smallest core count.",
+)
+
+args = parser.parse_args()
+
+if args.max_memory_growth is not None and args.timing_only:
+    parser.error("--max-memory-growth requires memory tracing")
+
+
+def get_cache_hierarchy(name):
+    if name == "classic":
+        from gem5.components.cachehierarchies.classic.private_l1_private_l2_cache_hierarchy import (
+            PrivateL1PrivateL2CacheHierarchy,
+        )
+
+        return PrivateL1PrivateL2CacheHierarchy(
+            l1d_size="32kB", l1i_size="32kB", l2_size="256kB"
+        )
+    elif name == "mesi_two_level":
+        from gem5.components.cachehierarchies.ruby.mesi_two_level_cache_hierarchy import (
+            MESITwoLevelCacheHierarchy,
+        )
+
+        return MESITwoLevelCacheHierarchy(
+            l1d_size="32kB",
+            l1d_assoc=8,
+            l1i_size="32kB",
+            l1i_assoc=8,
+            l2_size="256kB",
+            l2_assoc=16,
+            num_l2_banks=2,
+        )
+    elif name == "chi":
+        from gem5.components.cachehierarchies.chi.private_l1_cache_hierarchy import (
+            PrivateL1CacheHierarchy,
+        )
+
+        return PrivateL1CacheHierarchy(size="32kB", assoc=8)
+    raise ValueError(f"Unknown cache hierarchy '{name}'.")
+
+
+def get_isa():
+    if args.isa:
+        return get_isa_from_str(args.isa)
+    return sorted(get_supported_isas(), key=lambda isa: isa.value)[0]
+
+
+class PhaseRecorder:
+    """Times each phase and, optionally, records its peak heap usage."""
+
+    def __init__(self, trace_memory):
+        self._trace_memory = trace_memory
+        self.phases = {}
+
+    def run(self, name, func):
+        gc.collect()
+        if self._trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            result = func()
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = None
+            if self._trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        self.phases[name] = {"time_s": elapsed, "peak_bytes": peak}
+        return result
+
+    def skip(self, name, reason):
+        self.phases[name] = {"skipped": reason}
+
+
+def benchmark(num_cores, isa, dot_dir):
+    recorder = PhaseRecorder(trace_memory=not args.timing_only)
+
+    def construct():
+        board = SimpleBoard(
+            clk_freq="3GHz",
+            processor=SimpleProcessor(
+                cpu_type=CPUTypes.TIMING, num_cores=num_cores, isa=isa
+            ),
+            memory=SingleChannelDDR4_2400(size="2GB"),
+            cache_hierarchy=get_cache_hierarchy(args.hierarchy),
+        )
+        board._pre_instantiate()
+        return Root(full_system=False, board=board)
+
+    root = recorder.run("construction", construct)
+
+    def adopt_orphan_params():
+        for obj in root.descendants():
+            obj.adoptOrphanParams()
+        return list(root.descendants())
+
+    objs = recorder.run("adoptOrphanParams", adopt_orphan_params)
+
+    def unproxy_params():
+        with memoized_resolution(objs):
+            for obj in objs:
+                obj.unproxyParams()
+
+    recorder.run("unproxyParams", unproxy_params)
+
+    def print_ini():
+        ini_file = io.StringIO()
+        for obj in sorted(objs, key=lambda o: o.path()):
+            obj.print_ini(ini_file)
+        return ini_file.tell()
+
+    recorder.run("print_ini", print_ini)
+    recorder.run("get_config_as_dict", root.get_config_as_dict)
+
+    if args.skip_dot:
+        recorder.skip("do_dot", "--skip-dot")
+    else:
+        try:
+            import pydot
+        except ImportError:
+            recorder.skip("do_dot", "pydot is not installed")
+        else:
+            recorder.run(
+                "do_dot",
+                lambda: do_dot(root, dot_dir, f"config-{num_cores}.dot"),
+            )
+
+    result = {
+        "cores": num_cores,
+        "num_objects": len(objs),
+        "phases": recorder.phases,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+    # Nothing has been instantiated, so the Root singleton can be released
+    # to let the next core count build a tree of its own.
+    Root._the_instance = None
+    return result
+
+
+def total_time(result):
+    return sum(phase.get("time_s", 0.0) for phase in result["phases"].values())
+
+
+def total_peak_bytes(result):
+    return sum(
+        phase.get("peak_bytes") or 0 for phase in result["phases"].values()
+    )
+
+
+isa = get_isa()
+output = args.output or os.path.join(m5.options.outdir, "config_scaling.json")
+
+report = {
+    "hierarchy": args.hierarchy,
+    "isa": isa.value,
+    "python": platform.python_version(),
+    "trace_memory": not args.timing_only,
+    "results": [],
+}
+
+with tempfile.TemporaryDirectory() as dot_dir:
+    for num_cores in args.cores:
+        result = benchmark(num_cores, isa, dot_dir)
+        report["results"].append(result)
+        print(
+            f"{num_cores} cores: {result['num_objects']} SimObjects "
+            f"configured in {total_time(result):.3f} s"
+        )
+
+smallest = min(report["results"], key=lambda result: result["cores"])
+largest = max(report["results"], key=lambda result: result["cores"])
+
+
+def growth_per_object(measure):
+    return (measure(largest) / largest["num_objects"]) / (
+        measure(smallest) / smallest["num_objects"]
+    )
+
+
+growth = growth_per_object(total_time)
+report["time_per_object_growth"] = growth
+if report["trace_memory"]:
+    memory_growth = growth_per_object(total_peak_bytes)
+    report["peak_bytes_per_object_growth"] = memory_growth
+
+with open(output, "w") as f:
+    json.dump(report, f, indent=4)
+
+print(f"Config scaling report written to {output}")
+print(
+    f"Time per SimObject grew by a factor of {growth:.2f} from "
+    f"{smallest['cores']} to {largest['cores']} cores"
+)
+if report["trace_memory"]:
+    print(
+        f"Peak heap usage per SimObject grew by a factor of "
+        f"{memory_growth:.2f} from {smallest['cores']} to "
+        f"{largest['cores']} cores"
+    )
+
+if args.max_growth is not None and growth > args.max_growth:
+    m5.util.fatal(
+        "Configuration time per SimObject grew by a factor of %.2f, "
+        "more than the maximum of %.2f",
+        growth,
+        args.max_growth,
+    )
+if (
+    args.max_memory_growth is not None
+    and memory_growth > args.max_memory_growth
+):
+    m5.util.fatal(
+        "Peak heap usage per SimObject grew by a factor of %.2f, more than "
+        "the maximum of %.2f",
+        memory_growth,
+        args.max_memory_growth,
+    )
+if args.max_growth is not None or args.max_memory_growth is not None:
+    print("Config scaling check passed")
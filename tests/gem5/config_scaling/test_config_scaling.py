@@ -0,0 +1,107 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Runs the configuration scaling benchmark and checks that the configuration
+cost per SimObject does not grow by more than a factor of ``MAX_GROWTH``
+from the smallest to the largest core count, which catches phases that are
+quadratic in the number of SimObjects. The quick test covers up to 16 cores
+and only checks the peak Python heap usage, which does not depend on the
+load of the host. The long test covers the full 1 to 256 core range, also
+checks the time, and its JSON report is the one to compare across commits.
+"""
+
+import re
+
+from testlib import *
+
+# A linear configuration keeps the growth near 1. A quadratic phase grows it
+# roughly in proportion to the number of SimObjects, which increases by more
+# than ten times from 1 to 16 cores.
+MAX_GROWTH = 3.0
+# The heap usage is deterministic, so it can be held to a tighter bound.
+MAX_MEMORY_GROWTH = 2.0
+
+check_regex = re.compile(r"Config scaling check passed")
+
+gem5_verify_config(
+    name="test-config-scaling-classic-small",
+    verifiers=[verifier.MatchRegex(check_regex)],
+    fixtures=(),
+    config=joinpath(
+        config.base_dir,
+        "tests",
+        "gem5",
+        "config_scaling",
+        "configs",
+        "config_scaling_benchmark.py",
+    ),
+    config_args=[
+        "--cores",
+        "1",
+        "4",
+        "16",
+        "--skip-dot",
+        "--max-memory-growth",
+        str(MAX_MEMORY_GROWTH),
+    ],
+    valid_isas=(constants.all_compiled_tag,),
+    valid_hosts=constants.supported_hosts,
+    length=constants.quick_tag,
+)
+
+gem5_verify_config(
+    name="test-config-scaling-classic",
+    verifiers=[verifier.MatchRegex(check_regex)],
+    fixtures=(),
+    config=joinpath(
+        config.base_dir,
+        "tests",
+        "gem5",
+        "config_scaling",
+        "configs",
+        "config_scaling_benchmark.py",
+    ),
+    config_args=[
+        "--cores",
+        "1",
+        "2",
+        "4",
+        "8",
+        "16",
+        "32",
+        "64",
+        "128",
+        "256",
+        "--max-growth",
+        str(MAX_GROWTH),
+        "--max-memory-growth",
+        str(MAX_MEMORY_GROWTH),
+    ],
+    valid_isas=(constants.all_compiled_tag,),
+    valid_hosts=constants.supported_hosts,
+    length=constants.long_tag,
+)
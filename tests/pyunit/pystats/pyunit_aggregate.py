@@ -0,0 +1,186 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from m5.ext.pystats.aggregate import (
+    aggregate,
+    flatten_json_stats,
+)
+
+_STATS_TXT = """
+---------- Begin Simulation Statistics ----------
+board.cache_hierarchy.l1d-cache-0.ReadReq.hits::processor.cores.core.data          300                       # number of ReadReq hits (Count)
+board.cache_hierarchy.l1d-cache-0.ReadReq.hits::total          300                       # number of ReadReq hits (Count)
+board.cache_hierarchy.l1d-cache-0.ReadReq.misses::processor.cores.core.data           15                       # number of ReadReq misses (Count)
+board.cache_hierarchy.l1d-cache-0.ReadReq.misses::total           15                       # number of ReadReq misses (Count)
+board.cache_hierarchy.l1d-cache-0.WriteReq.hits::processor.cores.core.data           80                       # number of WriteReq hits (Count)
+board.cache_hierarchy.l1d-cache-0.WriteReq.hits::total           80                       # number of WriteReq hits (Count)
+board.cache_hierarchy.l1d-cache-0.WriteReq.misses::processor.cores.core.data            5                       # number of WriteReq misses (Count)
+board.cache_hierarchy.l1d-cache-0.WriteReq.misses::total            5                       # number of WriteReq misses (Count)
+board.cache_hierarchy.l1d-cache-0.overallMisses::total           20                       # number of overall misses (Count)
+board.cache_hierarchy.l1d-cache-0.overallAccesses::total        400                       # number of overall (read+write) accesses (Count)
+board.cache_hierarchy.l1d-cache-0.overallMissRate::total     0.050000                       # miss rate for overall accesses (Ratio)
+board.processor.cores.core.numCycles             4000                       # Number of cpu cycles simulated (Cycle)
+board.processor.cores.core.ipc                 0.500000                       # IPC: instructions per cycle (core level) ((Count/Cycle))
+board.processor.cores.core.commitStats0.numInsts         2000                       # Number of instructions committed (thread level) (Count)
+
+---------- End Simulation Statistics   ----------
+"""
+
+
+def _scalar(value):
+    return {"type": "Scalar", "value": value}
+
+
+def _vector(values):
+    return {
+        "type": "Vector",
+        "value": {key: _scalar(value) for key, value in values.items()},
+    }
+
+
+def _core(insts, cycles, hits, misses):
+    # Shaped like the json:// output, which omits Formula statistics such as
+    # the core's ipc and the cache's overall and demand counts.
+    return {
+        "type": "SimObject",
+        "core": {
+            "type": "SimObject",
+            "numCycles": _scalar(cycles),
+            "commitStats0": {"type": "Group", "numInsts": _scalar(insts)},
+        },
+        "dcache": {
+            "type": "SimObject",
+            "ReadReq": {
+                "type": "Group",
+                "hits": _vector({"data": hits}),
+                "misses": _vector({"data": misses}),
+            },
+            "mshrHits": _vector({"data": 1000}),
+        },
+    }
+
+
+_STATS_JSON = {
+    "name": "root",
+    "board": {
+        "type": "SimObject",
+        "processor": {
+            "type": "SimObject",
+            "cores": {
+                "type": "SimObjectVector",
+                "value": [_core(1000, 1000, 90, 10), _core(500, 2000, 40, 20)],
+            },
+        },
+    },
+}
+
+
+class AggregateTestSuite(unittest.TestCase):
+    """Test cases for m5.ext.pystats.aggregate"""
+
+    def setUp(self) -> None:
+        self.root = Path(tempfile.mkdtemp())
+        (self.root / "txt").mkdir()
+        with open(self.root / "txt" / "stats.txt", "w") as f:
+            f.write(_STATS_TXT)
+        (self.root / "json").mkdir()
+        with open(self.root / "json" / "stats.json", "w") as f:
+            json.dump(_STATS_JSON, f)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+        super().tearDown()
+
+    def test_flatten_json_stats(self) -> None:
+        flat = flatten_json_stats(_STATS_JSON)
+        self.assertEqual(
+            1000, flat["board.processor.cores0.core.commitStats0.numInsts"]
+        )
+        self.assertEqual(2000, flat["board.processor.cores1.core.numCycles"])
+        self.assertEqual(
+            20, flat["board.processor.cores1.dcache.ReadReq.misses::data"]
+        )
+        self.assertNotIn("board.processor.cores0.core.ipc", flat)
+
+    def test_aggregate(self) -> None:
+        table = aggregate(self.root, processes=1)
+        self.assertEqual(["json", "txt"], table.labels)
+        self.assertEqual([1.25, 0.5], list(table.column("IPC")))
+        self.assertEqual(10.0, table.column("l1d-cache-0 MPKI")[1])
+        self.assertEqual(200.0, table.column("l1d-cache-0 APKI")[1])
+        self.assertEqual(0.05, table.column("l1d-cache-0 Miss Rate")[1])
+
+    def test_aggregate_json_caches(self) -> None:
+        # Caches with the same name in different cores are reported
+        # separately.
+        table = aggregate(self.root, processes=1)
+        self.assertEqual(0.1, table.column("cores0.dcache Miss Rate")[0])
+        self.assertAlmostEqual(
+            1 / 3, table.column("cores1.dcache Miss Rate")[0]
+        )
+        self.assertAlmostEqual(10 / 1.5, table.column("cores0.dcache MPKI")[0])
+        self.assertAlmostEqual(60 / 1.5, table.column("cores1.dcache APKI")[0])
+
+    def test_aggregate_selected_cache(self) -> None:
+        table = aggregate(
+            self.root,
+            caches={"L1D": "board.processor.cores1.dcache"},
+            processes=1,
+        )
+        self.assertEqual(
+            ["IPC", "L1D Miss Rate", "L1D MPKI", "L1D APKI"],
+            list(table.columns),
+        )
+        self.assertAlmostEqual(20 / 1.5, table.column("L1D MPKI")[0])
+
+    def test_aggregate_cache(self) -> None:
+        cache_path = self.root / "cache.json"
+        aggregate(self.root, processes=1, cache_path=cache_path)
+        self.assertTrue(cache_path.exists())
+
+        # Cached entries are used while the stats file is unchanged, so
+        # corrupting the cache contents is visible in the results.
+        with open(cache_path) as f:
+            contents = json.load(f)
+        entry = contents["entries"][str(self.root / "json" / "stats.json")]
+        entry["values"]["board.processor.cores1.core.numCycles"] = 500
+        with open(cache_path, "w") as f:
+            json.dump(contents, f)
+        table = aggregate(self.root, processes=1, cache_path=cache_path)
+        self.assertEqual(2.0, table.column("IPC")[0])
+
+        # Once the file changes it is parsed again.
+        with open(self.root / "json" / "stats.json", "w") as f:
+            json.dump(_STATS_JSON, f, indent=4)
+        table = aggregate(self.root, processes=1, cache_path=cache_path)
+        self.assertEqual(1.25, table.column("IPC")[0])
@@ -0,0 +1,99 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import math
+import os
+import tempfile
+import unittest
+
+from m5.ext.pystats.deltastats import (
+    DeltaStatsReader,
+    DeltaStatsWriter,
+)
+
+_DUMPS = [
+    (100, {"simInsts": 10, "ipc": 0.5, "misses": 3}),
+    (200, {"simInsts": 20, "ipc": 0.5, "misses": 3}),
+    (300, {"simInsts": 30, "ipc": float("nan"), "misses": 3}),
+    (400, {"simInsts": 40, "ipc": float("nan")}),
+    (500, {"simInsts": 50, "ipc": 0.75, "misses": 9, "hits": 1}),
+]
+
+
+class DeltaStatsTestSuite(unittest.TestCase):
+    """Test cases for m5.ext.pystats.deltastats"""
+
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp(suffix=".delta")
+        os.close(fd)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+        super().tearDown()
+
+    def _write(self, keyframe: int) -> None:
+        with open(self.path, "w") as f:
+            writer = DeltaStatsWriter(f, keyframe=keyframe)
+            for tick, values in _DUMPS:
+                writer.write(tick, values)
+
+    def _assertDumpEqual(self, expected, actual) -> None:
+        self.assertEqual(set(expected), set(actual))
+        for name, value in expected.items():
+            if math.isnan(value):
+                self.assertTrue(math.isnan(actual[name]))
+            else:
+                self.assertEqual(value, actual[name])
+
+    def test_reconstruct_each_dump(self) -> None:
+        for keyframe in (1, 2, 100):
+            self._write(keyframe)
+            reader = DeltaStatsReader(self.path)
+            self.assertEqual([tick for tick, _ in _DUMPS], reader.ticks)
+            for index, (_, values) in enumerate(_DUMPS):
+                self._assertDumpEqual(values, reader.dump(index))
+
+    def test_iterate(self) -> None:
+        self._write(keyframe=3)
+        reader = DeltaStatsReader(self.path)
+        dumps = list(reader)
+        self.assertEqual(len(_DUMPS), len(dumps))
+        for (tick, values), (read_tick, read_values) in zip(_DUMPS, dumps):
+            self.assertEqual(tick, read_tick)
+            self._assertDumpEqual(values, read_values)
+        self.assertEqual([3, 3, 3, None, 9], reader.series("misses"))
+
+    def test_only_changes_written(self) -> None:
+        self._write(keyframe=100)
+        with open(self.path) as f:
+            lines = f.read().splitlines()
+        # Dump 1 only changes simInsts.
+        second = lines.index("D 200")
+        self.assertEqual(lines[second + 1 : second + 2], ["0 20"])
+        self.assertEqual(lines[second + 2][0], "D")
+        # Dump 3 removes misses.
+        self.assertIn("X 2", lines)
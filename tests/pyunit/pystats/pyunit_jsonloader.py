@@ -0,0 +1,144 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from m5.ext.pystats import (
+    Distribution,
+    Group,
+    Scalar,
+    SimObjectGroup,
+    SimObjectVectorGroup,
+    SimStat,
+    jsonloader,
+)
+
+
+def _get_simstat() -> SimStat:
+    cores = [
+        SimObjectGroup(
+            name=f"core{i}",
+            ipc=Scalar(value=0.5 * i, description="ipc"),
+            dist=Distribution(
+                value={0: Scalar(1), 1: Scalar(2)},
+                min=0,
+                max=1,
+                num_bins=2,
+                bin_size=1,
+            ),
+        )
+        for i in range(4)
+    ]
+    return SimStat(
+        creation_time=None,
+        time_conversion=None,
+        simulated_begin_time=0,
+        simulated_end_time=100,
+        board=SimObjectGroup(
+            processor=SimObjectGroup(cores=SimObjectVectorGroup(value=cores)),
+            memory=Group(type="Group", size=Scalar(value=1024)),
+            # A group without a type.
+            caches=Group(l1d=Group(hits=Scalar(value=10))),
+        ),
+    )
+
+
+class JsonLoaderTestSuite(unittest.TestCase):
+    """Test cases for m5.ext.pystats.jsonloader.load"""
+
+    def setUp(self) -> None:
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".json", delete=False
+        ) as f:
+            _get_simstat().dump(f)
+            self.path = f.name
+        # Load every group lazily, however small.
+        patcher = mock.patch.object(jsonloader, "_LAZY_MIN_BYTES", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+        super().tearDown()
+
+    def test_load(self) -> None:
+        with open(self.path) as f:
+            simstat = jsonloader.load(f)
+        self.assertIsInstance(simstat, SimStat)
+        self.assertIsInstance(
+            simstat.board.processor.cores, SimObjectVectorGroup
+        )
+        self.assertEqual(1.5, simstat.board.processor.cores[3].ipc.value)
+        self.assertIsInstance(simstat.board.memory, Group)
+        self.assertIsInstance(simstat.board.caches.l1d, Group)
+        self.assertEqual(10, simstat["board.caches.l1d.hits"].value)
+
+    def test_lazy_load_matches_load(self) -> None:
+        with open(self.path) as f:
+            eager = jsonloader.load(f)
+        with open(self.path) as f:
+            lazy = jsonloader.load(f, lazy=True)
+            self.assertIsInstance(lazy, SimStat)
+            self.assertEqual(eager.to_json(), lazy.to_json())
+            self.assertEqual(len(eager.find("ipc")), len(lazy.find("ipc")))
+
+    def test_lazy_load_small_file(self) -> None:
+        with open(self.path) as f:
+            eager = jsonloader.load(f)
+        with mock.patch.object(jsonloader, "_LAZY_MIN_BYTES", 1 << 30):
+            with open(self.path) as f:
+                lazy = jsonloader.load(f, lazy=True)
+        self.assertIsInstance(lazy, SimStat)
+        self.assertIsInstance(lazy.board.caches.l1d, Group)
+        self.assertEqual(eager.to_json(), lazy.to_json())
+
+    def test_lazy_load_untyped_group(self) -> None:
+        with open(self.path) as f:
+            lazy = jsonloader.load(f, lazy=True)
+            self.assertIsInstance(lazy.board.caches, Group)
+            self.assertIsInstance(lazy.board.caches.l1d, Group)
+            self.assertEqual(10, lazy["board.caches.l1d.hits"].value)
+
+    def test_lazy_load_on_access(self) -> None:
+        with open(self.path) as f:
+            lazy = jsonloader.load(f, lazy=True)
+            self.assertNotIn("board", lazy.__dict__)
+            ipc = lazy.find_path("board.processor.cores2.ipc")
+            self.assertEqual(1.0, ipc.value)
+            self.assertIn("board", lazy.__dict__)
+            self.assertNotIn("memory", lazy.board.__dict__)
+            self.assertEqual(1024, lazy["board.memory.size"].value)
+
+    def test_lazy_load_unindented(self) -> None:
+        with open(self.path, "w") as f:
+            _get_simstat().dump(f, indent=None)
+        with open(self.path) as f:
+            simstat = jsonloader.load(f, lazy=True)
+        self.assertEqual(1.5, simstat.board.processor.cores[3].ipc.value)
@@ -206,3 +206,57 @@ class NavigatingPyStatsTestCase(unittest.TestCase):
             self.simstat.find("sparse_hist"),
             [self.simstat.simobject_vector[1]["sparse_hist"]],
         )
+
+    def test_pystat_find_path(self):
+        self.assertIs(
+            self.simstat.find_path("simobject_vector1.sparse_hist"),
+            self.simstat.simobject_vector[1]["sparse_hist"],
+        )
+        self.assertIs(
+            self.simstat.find_path("simobject_vector0.vector2d::0::a"),
+            self.simstat.simobject_vector[0].vector2d[0]["a"],
+        )
+        self.assertIsNone(self.simstat.find_path("simobject_vector2.foo"))
+
+    def test_pystat_dotted_index(self):
+        self.assertIs(
+            self.simstat["simobject_vector1.distribution"],
+            self.simstat.simobject_vector[1]["distribution"],
+        )
+
+    def test_pystat_dotted_index_missing(self):
+        with self.assertRaises(KeyError):
+            self.simstat["simobject_vector1.foo"]
+
+    def test_pystat_find_path_single_element_vector(self):
+        ipc = Scalar(value=1.5)
+        simstat = SimStat(
+            cores=SimObjectVectorGroup(value=[SimObjectGroup(ipc=ipc)])
+        )
+        self.assertIs(ipc, simstat.find_path("cores.ipc"))
+        self.assertIsNone(simstat.find_path("cores0.ipc"))
+
+    def test_pystat_find_prefix(self):
+        found = self.simstat.find_prefix("simobject_vector1.distribution")
+        self.assertEqual(6, len(found))
+        self.assertIs(
+            found[0], self.simstat.simobject_vector[1]["distribution"]
+        )
+        self.assertEqual(
+            [], self.simstat.find_prefix("simobject_vector1.dist")
+        )
+
+    def test_pystat_find_after_update(self):
+        self.assertEqual([], self.simstat.find("new_stat"))
+        new_stat = Scalar(value=7)
+        self.simstat.simobject_vector[0].new_stat = new_stat
+        self.assertEqual([new_stat], self.simstat.find("new_stat"))
+        self.assertIs(
+            new_stat, self.simstat.find_path("simobject_vector0.new_stat")
+        )
+
+    def test_pystat_update_other_tree(self):
+        index = self.simstat._get_index()
+        other = _get_mock_simstat()
+        other.simobject_vector[0].new_stat = Scalar(value=7)
+        self.assertIs(index, self.simstat._get_index())
@@ -0,0 +1,192 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+from unittest import mock
+
+import m5.stats
+from m5.stats import flatstats
+from m5.stats.flatstats import StatSelection
+
+
+class _FakeInfo:
+    def __init__(self, name):
+        self.name = name
+        self.prepared = 0
+
+    def prepare(self):
+        self.prepared += 1
+
+    def visit(self, visitor):
+        visitor.visited.append(self.name)
+
+
+class _FakeGroup:
+    def __init__(self, path, stats, groups=None):
+        self._path = path
+        self._stats = [_FakeInfo(name) for name in stats]
+        self._groups = groups or {}
+
+    def getStats(self):
+        return self._stats
+
+    def getStatGroups(self):
+        return self._groups
+
+    def path_list(self):
+        return self._path
+
+
+class _FakeVisitor:
+    def __init__(self):
+        self.visited = []
+        self.path = []
+
+    def beginGroup(self, name):
+        self.path.append(name)
+
+    def endGroup(self):
+        self.path.pop()
+
+
+def _get_hierarchy():
+    core0 = _FakeGroup(["board", "cores0"], ["ipc", "numCycles"])
+    core1 = _FakeGroup(["board", "cores1"], ["ipc", "numCycles"])
+    l2 = _FakeGroup(["board", "l2"], ["overallMisses", "overallHits"])
+    board = _FakeGroup(
+        ["board"],
+        ["clk"],
+        {"cores0": core0, "cores1": core1, "l2": l2},
+    )
+    return _FakeGroup([], ["simTicks"], {"board": board})
+
+
+class StatSelectionTestSuite(unittest.TestCase):
+    """Test cases for m5.stats.flatstats.StatSelection"""
+
+    def setUp(self) -> None:
+        self.root = _get_hierarchy()
+        self.legacy = [_FakeInfo("hostSeconds"), _FakeInfo("simInsts")]
+        for patcher in (
+            mock.patch.object(
+                flatstats.Root, "getInstance", return_value=self.root
+            ),
+            mock.patch.object(m5.stats, "stats_list", self.legacy),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def _names(self, selection, roots=None):
+        return [name for name, _ in selection.get_stat_infos(roots)]
+
+    def test_default_selects_everything(self) -> None:
+        self.assertEqual(
+            [
+                "simTicks",
+                "board.clk",
+                "board.cores0.ipc",
+                "board.cores0.numCycles",
+                "board.cores1.ipc",
+                "board.cores1.numCycles",
+                "board.l2.overallMisses",
+                "board.l2.overallHits",
+                "hostSeconds",
+                "simInsts",
+            ],
+            self._names(StatSelection()),
+        )
+
+    def test_glob_matches_across_dots(self) -> None:
+        selection = StatSelection(include=["board.*.ipc"])
+        self.assertEqual(
+            ["board.cores0.ipc", "board.cores1.ipc"], self._names(selection)
+        )
+        self.assertTrue(StatSelection(["*.ipc"]).selects("a.b.c.ipc"))
+        self.assertFalse(StatSelection(["board.cores?.ipc"]).selects("ipc"))
+
+    def test_exclude_takes_precedence(self) -> None:
+        selection = StatSelection(
+            include=["board.*", "sim*"], exclude=["*.ipc", "board.l2.*"]
+        )
+        self.assertEqual(
+            [
+                "simTicks",
+                "board.clk",
+                "board.cores0.numCycles",
+                "board.cores1.numCycles",
+                "simInsts",
+            ],
+            self._names(selection),
+        )
+        self.assertFalse(
+            StatSelection(["*.ipc"], ["*.ipc"]).selects("board.cores0.ipc")
+        )
+
+    def test_roots_select_subtrees(self) -> None:
+        selection = StatSelection(include=["*.ipc", "hostSeconds"])
+        core1 = self.root.getStatGroups()["board"].getStatGroups()["cores1"]
+        # Legacy statistics are only dumped with the whole hierarchy.
+        self.assertEqual(["board.cores1.ipc"], self._names(selection, [core1]))
+
+        visitor = _FakeVisitor()
+        selection.visit(visitor, roots=[core1])
+        self.assertEqual(["ipc"], visitor.visited)
+        self.assertEqual([], visitor.path)
+
+    def test_legacy_stats(self) -> None:
+        selection = StatSelection(include=["host*"])
+        self.assertEqual(["hostSeconds"], self._names(selection))
+        visitor = _FakeVisitor()
+        selection.visit(visitor)
+        self.assertEqual(["hostSeconds"], visitor.visited)
+
+    def test_prepare_only_selected(self) -> None:
+        selection = StatSelection(include=["board.l2.*", "simInsts"])
+        selection.prepare()
+        l2 = self.root.getStatGroups()["board"].getStatGroups()["l2"]
+        self.assertEqual([1, 1], [info.prepared for info in l2.getStats()])
+        self.assertEqual([0, 1], [info.prepared for info in self.legacy])
+        self.assertEqual(0, self.root.getStats()[0].prepared)
+
+    def test_dump_prepares_selected_stats(self) -> None:
+        selection = StatSelection(include=["board.l2.*"])
+        output = object()
+        with mock.patch.object(
+            m5.stats, "outputList", [output]
+        ), mock.patch.object(
+            m5.stats, "outputSelections", {output: selection}
+        ), mock.patch.object(
+            m5.stats, "prepare"
+        ) as prepare:
+            m5.stats._prepare_for_dump()
+            prepare.assert_not_called()
+            # An output without a selection needs every stat prepared.
+            m5.stats.outputList.append(object())
+            m5.stats._prepare_for_dump()
+            prepare.assert_called_once()
+        l2 = self.root.getStatGroups()["board"].getStatGroups()["l2"]
+        self.assertEqual([1, 1], [info.prepared for info in l2.getStats()])
@@ -0,0 +1,143 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import io
+import math
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from m5.ext.pystats.statstxt import (
+    StatsTxtReader,
+    load_table,
+)
+
+_STATS_TXT = """
+---------- Begin Simulation Statistics ----------
+simSeconds                                   0.000100                       # Number of seconds simulated (Second)
+simInsts                                         1000                       # Number of instructions simulated (Count)
+board.cache_hierarchy.l1d-cache-0.overallMisses::total           10                       # number of overall misses (Count)
+board.cache_hierarchy.l2-cache-0.overallMisses::total            4                       # number of overall misses (Count)
+board.processor.core.ipc                         nan                       # IPC: instructions per cycle ((Count/Cycle))
+
+---------- End Simulation Statistics   ----------
+
+---------- Begin Simulation Statistics ----------
+simSeconds                                   0.000200                       # Number of seconds simulated (Second)
+simInsts                                         3000                       # Number of instructions simulated (Count)
+board.cache_hierarchy.l1d-cache-0.overallMisses::total           25                       # number of overall misses (Count)
+board.cache_hierarchy.l2-cache-0.overallMisses::total            7                       # number of overall misses (Count)
+board.processor.core.ipc                     1.500000                       # IPC: instructions per cycle ((Count/Cycle))
+
+---------- End Simulation Statistics   ----------
+"""
+
+
+class StatsTxtReaderTestSuite(unittest.TestCase):
+    """Test cases for m5.ext.pystats.statstxt.StatsTxtReader"""
+
+    def setUp(self) -> None:
+        self.outdir = Path(tempfile.mkdtemp())
+        with open(self.outdir / "stats.txt", "w") as f:
+            f.write(_STATS_TXT)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        os.remove(self.outdir / "stats.txt")
+        os.rmdir(self.outdir)
+        super().tearDown()
+
+    def test_dump_boundaries(self) -> None:
+        reader = StatsTxtReader(self.outdir)
+        self.assertEqual(2, len(reader))
+        self.assertEqual(5, len(reader[0]))
+        self.assertIn("simInsts", reader[1])
+
+    def test_get_last_dump(self) -> None:
+        reader = StatsTxtReader(self.outdir / "stats.txt")
+        self.assertEqual(3000, reader.get("simInsts"))
+        self.assertEqual(1.5, reader.get("board.processor.core.ipc"))
+        self.assertIsNone(reader.get("not.a.stat"))
+
+    def test_get_first_dump(self) -> None:
+        reader = StatsTxtReader(self.outdir)
+        self.assertEqual(1000, reader.get("simInsts", dump=0))
+        self.assertTrue(
+            math.isnan(reader.get("board.processor.core.ipc", dump=0))
+        )
+
+    def test_dumps_with_different_stats(self) -> None:
+        with open(self.outdir / "stats.txt", "a") as f:
+            f.write(
+                "---------- Begin Simulation Statistics ----------\n"
+                "hostSeconds                                  2.5  # Host time\n"
+                "simInsts                                     5000  # Insts\n"
+                "---------- End Simulation Statistics   ----------\n"
+            )
+        reader = StatsTxtReader(self.outdir)
+        self.assertEqual(3, len(reader))
+        self.assertEqual(["hostSeconds", "simInsts"], reader[2].names())
+        self.assertNotIn("hostSeconds", reader[0])
+        self.assertNotIn("simSeconds", reader[2])
+        self.assertEqual(5, len(reader[1]))
+        self.assertEqual(2.5, reader.get("hostSeconds"))
+        self.assertIsNone(reader.get("hostSeconds", dump=0))
+        self.assertEqual(
+            {"simInsts": 5000}, reader.select(["sim*", "board.*"])
+        )
+
+    def test_select_glob(self) -> None:
+        reader = StatsTxtReader(self.outdir)
+        self.assertEqual(
+            {
+                "board.cache_hierarchy.l1d-cache-0.overallMisses::total": 25,
+                "board.cache_hierarchy.l2-cache-0.overallMisses::total": 7,
+                "simInsts": 3000,
+            },
+            reader.select(["*.overallMisses::total", "simInsts"]),
+        )
+
+    def test_load_table(self) -> None:
+        table = load_table(
+            [self.outdir, self.outdir], ["simInsts", "*l2*"], labels=["a", "b"]
+        )
+        self.assertEqual(["a", "b"], table.labels)
+        self.assertEqual([3000, 3000], list(table.column("simInsts")))
+
+        csv = io.StringIO()
+        table.to_csv(csv)
+        self.assertEqual(
+            "label,simInsts,"
+            "board.cache_hierarchy.l2-cache-0.overallMisses::total",
+            csv.getvalue().splitlines()[0],
+        )
+
+    def test_table_missing_columns(self) -> None:
+        table = load_table([self.outdir], ["simInsts"], labels=["a"])
+        table.add_row("b", {"simSeconds": 1.0})
+        self.assertTrue(math.isnan(table.column("simSeconds")[0]))
+        self.assertTrue(math.isnan(table.column("simInsts")[1]))
@@ -0,0 +1,95 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import math
+import os
+import tempfile
+import unittest
+
+from m5.ext.pystats.timeseries import (
+    TimeSeriesReader,
+    TimeSeriesWriter,
+)
+
+_SCHEMA = [
+    ("simInsts", "Scalar", [""]),
+    ("system.cpu.dist", "Distribution", ["0", "1", "2"]),
+    ("system.cpu.ipc", "Formula", [""]),
+]
+
+
+class TimeSeriesTestSuite(unittest.TestCase):
+    """Test cases for m5.ext.pystats.timeseries"""
+
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp(suffix=".ts")
+        with os.fdopen(fd, "wb") as f:
+            writer = TimeSeriesWriter(f, _SCHEMA)
+            for dump in range(4):
+                writer.write(
+                    (dump + 1) * 1000,
+                    [dump * 10, dump, dump * 2, dump * 3, dump / 2],
+                )
+        super().setUp()
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+        super().tearDown()
+
+    def test_schema(self) -> None:
+        reader = TimeSeriesReader(self.path)
+        self.assertEqual(4, len(reader))
+        self.assertEqual(
+            ["simInsts", "system.cpu.dist", "system.cpu.ipc"], reader.names()
+        )
+        self.assertEqual("Distribution", reader.stat_type("system.cpu.dist"))
+        self.assertEqual(["0", "1", "2"], reader.elements("system.cpu.dist"))
+
+    def test_scalar_series(self) -> None:
+        reader = TimeSeriesReader(self.path)
+        self.assertEqual([1000, 2000, 3000, 4000], list(reader.ticks))
+        self.assertEqual([0, 10, 20, 30], list(reader.series("simInsts")))
+        self.assertEqual(
+            [0, 0.5, 1.0, 1.5], list(reader.series("system.cpu.ipc"))
+        )
+
+    def test_element_series(self) -> None:
+        reader = TimeSeriesReader(self.path)
+        self.assertEqual(
+            [0, 3, 6, 9], list(reader.series("system.cpu.dist", "2"))
+        )
+
+    def test_partial_row_ignored(self) -> None:
+        with open(self.path, "ab") as f:
+            f.write(b"\0" * 12)
+        self.assertEqual(4, len(TimeSeriesReader(self.path)))
+
+    def test_wrong_row_width(self) -> None:
+        with open(self.path, "wb") as f:
+            writer = TimeSeriesWriter(f, _SCHEMA)
+            with self.assertRaises(ValueError):
+                writer.write(0, [1.0])
+        self.assertEqual(0, len(TimeSeriesReader(self.path)))
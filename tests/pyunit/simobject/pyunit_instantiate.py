@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 ARM Limited
+# All rights reserved
+#
+# The license below extends only to copyright in the software and shall
+# not be construed as granting a license to any other intellectual
+# property including but not limited to intellectual property relating
+# to a hardware implementation of the functionality of the software
+# licensed hereunder.  You may use the software subject to the license
+# terms below provided that you ensure that this notice is replicated
+# unmodified and in its entirety in all distributions of the software,
+# modified or unmodified, in source code or in binary form.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import m5
+from m5 import simulate
+from m5.citations import gather_citations
+from m5.objects import VoltageDomain
+
+
+def _get_hierarchy():
+    top = VoltageDomain()
+    top.zeta = VoltageDomain()
+    top.alpha = [VoltageDomain(), VoltageDomain()]
+    top.alpha[1].inner = VoltageDomain()
+    top.mid = VoltageDomain()
+    top.mid.leaf = VoltageDomain()
+    return top
+
+
+class _Cited:
+    def __init__(self, citations):
+        self._citations = citations
+
+
+class FlattenHierarchyTestSuite(unittest.TestCase):
+    """Test cases for the flattened hierarchy used by m5.instantiate()"""
+
+    def test_descendants_order(self) -> None:
+        top = _get_hierarchy()
+        objs, paths = simulate._flatten_hierarchy(top)
+        self.assertEqual(list(top.descendants()), objs)
+        self.assertEqual(
+            [
+                top,
+                top.alpha[0],
+                top.alpha[1],
+                top.alpha[1].inner,
+                top.mid,
+                top.mid.leaf,
+                top.zeta,
+            ],
+            objs,
+        )
+
+    def test_paths(self) -> None:
+        top = _get_hierarchy()
+        objs, paths = simulate._flatten_hierarchy(top)
+        self.assertEqual(
+            [obj.path() for obj in objs], [paths[id(obj)] for obj in objs]
+        )
+        self.assertTrue(
+            paths[id(top.alpha[1].inner)].endswith(".alpha1.inner")
+        )
+
+    def test_instantiated_descendants(self) -> None:
+        top = _get_hierarchy()
+        other = _get_hierarchy()
+        objs, _ = simulate._flatten_hierarchy(top)
+        with mock.patch.object(simulate, "_instantiated_objects", objs):
+            self.assertIs(objs, simulate._descendants(top))
+            self.assertEqual(
+                list(other.descendants()), list(simulate._descendants(other))
+            )
+            # The mid subtree is not the instantiated root, so it is walked.
+            self.assertEqual(
+                [top.mid, top.mid.leaf], list(simulate._descendants(top.mid))
+            )
+
+
+class GatherCitationsTestSuite(unittest.TestCase):
+    """Test cases for m5.citations.gather_citations"""
+
+    def setUp(self) -> None:
+        self.outdir = tempfile.mkdtemp()
+        patcher = mock.patch.object(m5.options, "outdir", self.outdir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.outdir)
+        super().tearDown()
+
+    def _gather(self, objs):
+        gather_citations(None, objs)
+        with open(Path(self.outdir) / "citations.bib") as f:
+            return f.read()
+
+    def _expected(self, objs):
+        # How every object's citations were parsed before they were cached
+        # per string.
+        citations = {}
+        for obj in objs:
+            loc = 0
+            while loc >= 0:
+                key, cite, loc = m5.citations._get_next_key_entry(
+                    obj._citations, loc
+                )
+                citations[key] = cite
+        return "".join(citations.values())
+
+    def test_unchanged_output(self) -> None:
+        base = "@article{a,\n  title={A}\n}\n@book{b,\n  title={B}\n}\n"
+        extra = base + "@misc{c,\n  title={C}\n}\n"
+        # A later class which redefines a key that an earlier string reuses.
+        override = "@misc{a,\n  title={A2}\n}\n"
+        objs = [
+            _Cited(base),
+            _Cited(extra),
+            _Cited(base),
+            _Cited(override),
+            _Cited(extra),
+            _Cited(base),
+        ]
+        for end in range(1, len(objs) + 1):
+            self.assertEqual(
+                self._expected(objs[:end]), self._gather(objs[:end])
+            )
+
+    def test_descendants(self) -> None:
+        top = _get_hierarchy()
+        self.assertEqual(
+            self._gather(list(top.descendants())),
+            self._gather(simulate._flatten_hierarchy(top)[0]),
+        )
+        self.assertIn("Binkert:2011:gem5", self._gather([top]))
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 ARM Limited
+# All rights reserved
+#
+# The license below extends only to copyright in the software and shall
+# not be construed as granting a license to any other intellectual
+# property including but not limited to intellectual property relating
+# to a hardware implementation of the functionality of the software
+# licensed hereunder.  You may use the software subject to the license
+# terms below provided that you ensure that this notice is replicated
+# unmodified and in its entirety in all distributions of the software,
+# modified or unmodified, in source code or in binary form.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+
+import copy
+import unittest
+
+from m5 import proxy
+from m5.objects import (
+    ClockDomain,
+    DerivedClockDomain,
+    SimObject,
+    SrcClockDomain,
+    VoltageDomain,
+)
+from m5.proxy import (
+    Parent,
+    Self,
+)
+
+_PTYPES = (VoltageDomain, ClockDomain, SrcClockDomain, SimObject)
+
+
+def _get_hierarchy(ambiguous=False):
+    top = SrcClockDomain(clock="1GHz", voltage_domain=VoltageDomain())
+    top.domains = [
+        SrcClockDomain(clock="2GHz", voltage_domain=Parent.any),
+        DerivedClockDomain(clk_domain=Parent.any),
+    ]
+    top.nested = SrcClockDomain(clock="3GHz", voltage_domain=VoltageDomain())
+    top.nested.leaf = SrcClockDomain(clock="4GHz", voltage_domain=Parent.any)
+    top.nested.derived = DerivedClockDomain(clk_domain=Self.any)
+    if ambiguous:
+        # A second voltage domain makes Parent.any from top.domains match
+        # more than one object.
+        top.extra = VoltageDomain()
+    for obj in top.descendants():
+        obj.adoptOrphanParams()
+    return top
+
+
+def _outcome(func, *args):
+    try:
+        result, done = func(*args)
+    except AttributeError as e:
+        return AttributeError, str(e)
+    if isinstance(result, list):
+        return [obj.path() for obj in result], done
+    return result, done
+
+
+class ResolutionCacheTestSuite(unittest.TestCase):
+    """Test cases for m5.proxy._ResolutionCache"""
+
+    def _check_find(self, top):
+        objs = list(top.descendants())
+        cache = proxy._ResolutionCache(objs)
+        for obj in objs:
+            for ptype in _PTYPES:
+                with self.subTest(obj=obj.path(), ptype=ptype.__name__):
+                    self.assertEqual(
+                        _outcome(obj.find_any, ptype),
+                        _outcome(cache.find_any, obj, ptype),
+                    )
+                    self.assertEqual(
+                        _outcome(obj.find_all, ptype),
+                        _outcome(cache.find_all, obj, ptype),
+                    )
+
+    def test_find(self) -> None:
+        self._check_find(_get_hierarchy())
+
+    def test_find_ambiguous(self) -> None:
+        top = _get_hierarchy(ambiguous=True)
+        with self.assertRaises(AttributeError):
+            top.find_any(VoltageDomain)
+        self._check_find(top)
+
+    def test_find_outside_hierarchy(self) -> None:
+        top = _get_hierarchy()
+        other = _get_hierarchy()
+        cache = proxy._ResolutionCache(list(top.descendants()))
+        self.assertEqual(
+            _outcome(other.find_all, SrcClockDomain),
+            _outcome(cache.find_all, other, SrcClockDomain),
+        )
+
+    def _unproxy_all(self, top, memoize):
+        objs = list(top.descendants())
+        results = []
+
+        def unproxy():
+            for obj in objs:
+                for pname in sorted(obj._params):
+                    value = obj._values.get(pname)
+                    if proxy.isproxy(value):
+                        try:
+                            found = value.unproxy(obj)
+                        except AttributeError as e:
+                            found = e
+                        results.append((obj.path(), pname, str(found)))
+
+                # Resolve Self.all for every type from every object too.
+                for ptype in _PTYPES:
+                    all_proxy = Self.all
+                    all_proxy.set_param_desc(
+                        type("Desc", (), {"ptype": ptype, "ptype_str": ""})
+                    )
+                    found = all_proxy.unproxy(obj)
+                    results.append(
+                        (obj.path(), ptype, [o.path() for o in found])
+                    )
+
+        if memoize:
+            with proxy.memoized_resolution(objs):
+                unproxy()
+        else:
+            unproxy()
+        return results
+
+    def test_unproxy(self) -> None:
+        for ambiguous in (False, True):
+            with self.subTest(ambiguous=ambiguous):
+                expected = self._unproxy_all(
+                    _get_hierarchy(ambiguous), memoize=False
+                )
+                self.assertEqual(
+                    expected,
+                    self._unproxy_all(_get_hierarchy(ambiguous), memoize=True),
+                )
+                errors = [r for r in expected if "more than one" in r[2]]
+                self.assertEqual(bool(errors), ambiguous)
+
+    def test_cache_scope(self) -> None:
+        top = _get_hierarchy()
+        self.assertIsNone(proxy._resolution_cache)
+        with proxy.memoized_resolution(list(top.descendants())):
+            self.assertIsNotNone(proxy._resolution_cache)
+        self.assertIsNone(proxy._resolution_cache)
+
+
+class AttrProxyCopyTestSuite(unittest.TestCase):
+    """Test cases for m5.proxy.AttrProxy._copy"""
+
+    def _state(self, p):
+        return (
+            type(p),
+            p._search_self,
+            p._search_up,
+            p._attr,
+            p._modifiers,
+            [(op, str(operand)) for op, operand in p._ops],
+        )
+
+    def test_copy_matches_deepcopy(self) -> None:
+        for p in (
+            Parent.voltage_domain,
+            Self.domains[1],
+            Parent.nested.leaf,
+            Parent.clock * 2,
+            Self.clock / Parent.clock,
+        ):
+            with self.subTest(proxy=str(p)):
+                self.assertEqual(
+                    self._state(copy.deepcopy(p)), self._state(p._copy())
+                )
+
+    def test_copy_is_independent(self) -> None:
+        p = Parent.nested * 2
+        q = p._copy()
+        q._modifiers.append("leaf")
+        q._ops.append(q._ops[0])
+        self.assertEqual([], p._modifiers)
+        self.assertEqual(1, len(p._ops))
+        self.assertEqual("Parent.nested.leaf", str(q))
+
+    def test_modifiers_do_not_modify_proxy(self) -> None:
+        p = Parent.nested
+        self.assertEqual("Parent.nested.leaf", str(p.leaf))
+        self.assertEqual("Parent.nested[1]", str(p[1]))
+        self.assertEqual("Parent.nested", str(p))
+
+    def test_unproxy_copy(self) -> None:
+        top = _get_hierarchy()
+        leaf = top.nested.leaf
+        for p in (Parent.voltage_domain, Parent.nested.voltage_domain):
+            self.assertIs(
+                copy.deepcopy(p).unproxy(leaf), p._copy().unproxy(leaf)
+            )
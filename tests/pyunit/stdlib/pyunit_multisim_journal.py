@@ -0,0 +1,118 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from gem5.utils.multisim.journal import (
+    Journal,
+    stats_file_name,
+    write_exit_cause,
+)
+
+
+class MultiSimJournalTestSuite(unittest.TestCase):
+    """Tests for gem5.utils.multisim.journal."""
+
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.outdir = Path(self._tmpdir.name)
+        self.config = self.outdir / "config.py"
+        self.config.write_text("# a MultiSim config\n")
+        self.path = self.outdir / "multisim-journal.jsonl"
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def _journal(self) -> Journal:
+        return Journal(self.path, self.config, self.outdir, "stats.txt")
+
+    def _finish(self, id: str, stats: str = "simInsts 1\n") -> None:
+        os.makedirs(self.outdir / id, exist_ok=True)
+        (self.outdir / id / "stats.txt").write_text(stats)
+        write_exit_cause(self.outdir / id, "exiting with last active thread")
+
+    def test_record(self) -> None:
+        self._finish("sim_0")
+        self._journal().record("sim_0", 0, 12.5)
+
+        entry = self._journal().entries()["sim_0"]
+        self.assertEqual(0, entry["exit_code"])
+        self.assertEqual(12.5, entry["wall_time"])
+        self.assertEqual(
+            "exiting with last active thread", entry["exit_cause"]
+        )
+        self.assertIsNotNone(entry["stats_checksum"])
+
+    def test_completed(self) -> None:
+        journal = self._journal()
+        self._finish("sim_0")
+        self._finish("sim_1")
+        journal.record("sim_0", 0, 1.0)
+        journal.record("sim_1", 1, 1.0)
+
+        self.assertEqual({"sim_0"}, set(journal.completed().keys()))
+
+    def test_latest_entry_wins(self) -> None:
+        journal = self._journal()
+        self._finish("sim_0")
+        journal.record("sim_0", 1, 1.0)
+        journal.record("sim_0", 0, 2.0)
+
+        self.assertEqual({"sim_0"}, set(journal.completed().keys()))
+
+    def test_changed_stats_are_incomplete(self) -> None:
+        journal = self._journal()
+        self._finish("sim_0")
+        journal.record("sim_0", 0, 1.0)
+        (self.outdir / "sim_0" / "stats.txt").write_text("truncat")
+
+        self.assertEqual({}, journal.completed())
+
+    def test_changed_config_is_incomplete(self) -> None:
+        self._finish("sim_0")
+        self._journal().record("sim_0", 0, 1.0)
+        self.config.write_text("# a different MultiSim config\n")
+
+        self.assertEqual({}, self._journal().completed())
+
+    def test_interrupted_write_is_ignored(self) -> None:
+        journal = self._journal()
+        self._finish("sim_0")
+        journal.record("sim_0", 0, 1.0)
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"id": "sim_1"})[:8])
+
+        self.assertEqual({"sim_0"}, set(journal.entries().keys()))
+
+    def test_stats_file_name(self) -> None:
+        self.assertEqual("stats.txt", stats_file_name("stats.txt"))
+        self.assertEqual(
+            "stats.txt", stats_file_name("text://stats.txt?desc=False")
+        )
@@ -0,0 +1,97 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from gem5.utils.multisim.progress import (
+    STATUS_FILE,
+    SWEEP_STATUS_FILE,
+    ProgressMonitor,
+)
+
+
+class ProgressMonitorTestSuite(unittest.TestCase):
+    """Tests for gem5.utils.multisim.progress.ProgressMonitor."""
+
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.outdir = Path(self._tmpdir.name)
+        self.monitor = ProgressMonitor(
+            self.outdir, ["sim_0", "sim_1", "sim_2"], interval=1.0
+        )
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def _report(self, id: str, updated: float, **status) -> None:
+        os.makedirs(self.outdir / id, exist_ok=True)
+        status.update({"id": id, "updated": updated})
+        with open(self.outdir / id / STATUS_FILE, "w") as f:
+            json.dump(status, f)
+
+    def test_pending(self) -> None:
+        sweep_status = self.monitor.poll()
+        self.assertEqual({"pending": 3}, sweep_status["counts"])
+
+    def test_running(self) -> None:
+        self.monitor.started("sim_0")
+        self._report("sim_0", time.time(), state="running", tick=1000)
+
+        sweep_status = self.monitor.poll()
+        self.assertEqual({"pending": 2, "running": 1}, sweep_status["counts"])
+        self.assertEqual(1000, sweep_status["simulators"]["sim_0"]["tick"])
+
+        with open(self.outdir / SWEEP_STATUS_FILE) as f:
+            self.assertEqual(sweep_status["counts"], json.load(f)["counts"])
+
+    def test_stalled(self) -> None:
+        self.monitor.started("sim_0")
+        self._report("sim_0", time.time() - 3600, state="running", tick=10)
+
+        sweep_status = self.monitor.poll()
+        self.assertEqual(
+            "stalled", sweep_status["simulators"]["sim_0"]["state"]
+        )
+
+    def test_finished_and_failed(self) -> None:
+        self.monitor.started("sim_0")
+        self.monitor.started("sim_1")
+        self._report("sim_0", time.time(), state="finished", tick=99)
+        self.monitor.finished("sim_0", 0, 2.5)
+        self.monitor.finished("sim_1", 1, 0.5)
+
+        sweep_status = self.monitor.poll()
+        self.assertEqual(
+            {"finished": 1, "failed": 1, "pending": 1},
+            sweep_status["counts"],
+        )
+        self.assertEqual(99, sweep_status["simulators"]["sim_0"]["tick"])
+        self.assertEqual(2.5, sweep_status["simulators"]["sim_0"]["wall_time"])
@@ -0,0 +1,136 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import tempfile
+import unittest
+
+from gem5.utils.multisim.scheduler import (
+    JobScheduler,
+    SimulatorJob,
+    load_history,
+    save_history,
+)
+
+
+def _start_all(scheduler):
+    started = []
+    job = scheduler.next_job()
+    while job is not None:
+        started.append(job)
+        job = scheduler.next_job()
+    return started
+
+
+class JobSchedulerTestSuite(unittest.TestCase):
+    """Tests for gem5.utils.multisim.scheduler.JobScheduler."""
+
+    def test_longest_first(self) -> None:
+        scheduler = JobScheduler(
+            [
+                SimulatorJob("short", runtime=1.0),
+                SimulatorJob("long", runtime=100.0),
+                SimulatorJob("unknown"),
+                SimulatorJob("medium", runtime=10.0),
+            ],
+            processes=4,
+        )
+        self.assertEqual(
+            ["unknown", "long", "medium", "short"],
+            [job.id for job in _start_all(scheduler)],
+        )
+
+    def test_process_limit(self) -> None:
+        jobs = [SimulatorJob(f"sim_{i}", runtime=float(i)) for i in range(5)]
+        scheduler = JobScheduler(jobs, processes=2)
+
+        started = _start_all(scheduler)
+        self.assertEqual(["sim_4", "sim_3"], [job.id for job in started])
+        self.assertEqual(2, scheduler.num_running())
+
+        scheduler.finished(started[0])
+        self.assertEqual("sim_2", scheduler.next_job().id)
+        self.assertIsNone(scheduler.next_job())
+
+    def test_memory_budget_backfills(self) -> None:
+        scheduler = JobScheduler(
+            [
+                SimulatorJob("big", memory=6, runtime=50.0),
+                SimulatorJob("bigger", memory=8, runtime=40.0),
+                SimulatorJob("small", memory=2, runtime=10.0),
+                SimulatorJob("tiny", memory=1, runtime=5.0),
+            ],
+            processes=4,
+            memory_budget=10,
+        )
+
+        # "bigger" does not fit alongside "big", so the smaller jobs are
+        # started in its place.
+        started = _start_all(scheduler)
+        self.assertEqual(["big", "small", "tiny"], [job.id for job in started])
+
+        for job in started:
+            scheduler.finished(job)
+        self.assertEqual("bigger", scheduler.next_job().id)
+        self.assertFalse(scheduler.has_pending())
+
+    def test_oversized_job_runs_alone(self) -> None:
+        scheduler = JobScheduler(
+            [
+                SimulatorJob("huge", memory=20, runtime=50.0),
+                SimulatorJob("small", memory=2, runtime=10.0),
+            ],
+            processes=2,
+            memory_budget=10,
+        )
+
+        small = scheduler.next_job()
+        self.assertEqual("small", small.id)
+        self.assertIsNone(scheduler.next_job())
+
+        scheduler.finished(small)
+        self.assertEqual("huge", scheduler.next_job().id)
+
+    def test_invalid_processes(self) -> None:
+        with self.assertRaises(ValueError):
+            JobScheduler([], processes=0)
+
+
+class HistoryTestSuite(unittest.TestCase):
+    """Tests for the MultiSim runtime history file."""
+
+    def test_missing_history(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.assertEqual(
+                {}, load_history(os.path.join(tmpdir, "history.json"))
+            )
+
+    def test_save_merges(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "history.json")
+            save_history(path, {"sim_0": 1.5, "sim_1": 2.0})
+            save_history(path, {"sim_1": 3.0})
+            self.assertEqual({"sim_0": 1.5, "sim_1": 3.0}, load_history(path))
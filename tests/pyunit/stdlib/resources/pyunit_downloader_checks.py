@@ -0,0 +1,176 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from gem5.resources.downloader import (
+    ResourceMD5MismatchError,
+    _write_resource,
+    get_resource,
+)
+from gem5.resources.md5_utils import md5_file
+
+
+class WriteResourceTestSuite(unittest.TestCase):
+    """Test cases for gem5.resources.downloader._write_resource(), which
+    decompresses and unpacks resources as they are downloaded."""
+
+    def setUp(self) -> None:
+        self.dir = Path(tempfile.mkdtemp())
+        # A mostly-empty "disk image", ending in zeros.
+        self.image = (
+            b"\0" * (1024 * 1024 + 17)
+            + b"boot sector" * 1000
+            + b"\0" * (4 * 1024 * 1024)
+            + b"root partition"
+            + b"\0" * 12345
+        )
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def test_write_gzipped_sparse(self) -> None:
+        # Tests a gzipped file is decompressed as it is read, written with
+        # holes in place of its zeros, and its md5 computed along the way.
+
+        compressed = io.BytesIO(gzip.compress(self.image))
+        to_path = self.dir / "image"
+
+        md5 = _write_resource(
+            compressed,
+            str(to_path),
+            unzip=True,
+            untar=False,
+            total=None,
+            desc="test",
+        )
+
+        self.assertEqual(self.image, to_path.read_bytes())
+        self.assertEqual(md5_file(to_path), md5)
+        self.assertLess(to_path.stat().st_blocks * 512, to_path.stat().st_size)
+
+    def test_write_uncompressed(self) -> None:
+        to_path = self.dir / "image"
+
+        md5 = _write_resource(
+            io.BytesIO(self.image),
+            str(to_path),
+            unzip=False,
+            untar=False,
+            total=None,
+            desc="test",
+        )
+
+        self.assertEqual(self.image, to_path.read_bytes())
+        self.assertEqual(md5_file(to_path), md5)
+
+    def test_write_gzipped_tar(self) -> None:
+        # Tests a gzipped tar archive is unpacked as it is read.
+
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode="w:gz") as tar:
+            for name, data in (("file1", b"Some data"), ("dir/file2", b"")):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        archive.seek(0)
+        to_path = self.dir / "unpacked"
+
+        md5 = _write_resource(
+            archive,
+            str(to_path),
+            unzip=True,
+            untar=True,
+            total=None,
+            desc="test",
+        )
+
+        self.assertIsNone(md5)
+        self.assertEqual(b"Some data", (to_path / "file1").read_bytes())
+        self.assertEqual(b"", (to_path / "dir" / "file2").read_bytes())
+
+    def test_corrupt_stream_removes_output(self) -> None:
+        compressed = gzip.compress(self.image)
+        to_path = self.dir / "image"
+
+        with self.assertRaises(Exception):
+            _write_resource(
+                io.BytesIO(compressed[: len(compressed) // 2]),
+                str(to_path),
+                unzip=True,
+                untar=False,
+                total=None,
+                desc="test",
+            )
+        self.assertFalse(to_path.exists())
+
+
+class GetResourceTestSuite(unittest.TestCase):
+    """Test cases for gem5.resources.downloader.get_resource()"""
+
+    def setUp(self) -> None:
+        self.dir = Path(tempfile.mkdtemp())
+        self.source = self.dir / "source"
+        self.source.write_bytes(b"resource contents")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def _get_resource(self, md5sum: str) -> Path:
+        resource_json = {
+            "id": "test-resource",
+            "url": self.source.as_uri(),
+            "md5sum": md5sum,
+            "is_zipped": False,
+        }
+        to_path = self.dir / "resource"
+        with patch(
+            "gem5.resources.downloader.get_resource_json_obj",
+            return_value=resource_json,
+        ), patch(
+            "gem5.resources.downloader.get_resource_store", return_value=None
+        ):
+            get_resource("test-resource", str(to_path), quiet=True)
+        return to_path
+
+    def test_md5_match(self) -> None:
+        to_path = self._get_resource(md5_file(self.source))
+        self.assertEqual(b"resource contents", to_path.read_bytes())
+
+    def test_md5_mismatch_removes_resource(self) -> None:
+        with self.assertRaises(ResourceMD5MismatchError) as context:
+            self._get_resource("0" * 32)
+        self.assertEqual(md5_file(self.source), context.exception.md5)
+        self.assertEqual("0" * 32, context.exception.expected)
+        self.assertFalse((self.dir / "resource").exists())
@@ -24,12 +24,16 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import io
 import json
 import os
 import tempfile
 import unittest
 from typing import Dict
+from unittest.mock import patch
+from urllib.error import HTTPError
 
+from gem5.resources.client_api.client_query import ClientQuery
 from gem5.resources.client_api.jsonclient import JSONClient
 
 
@@ -179,3 +183,169 @@ class JSONClientTestSuite(unittest.TestCase):
             f"Resources location '{path}' is not a valid path or URL."
             in str(context.exception)
         )
+
+    def test_get_resources_latest_compatible_version(self) -> None:
+        # Tests JSONClient.get_resources() returns the latest version of each
+        # resource compatible with the gem5 version queried.
+
+        client = JSONClient(path=self.file_path)
+        resources = client.get_resources(
+            [
+                ClientQuery("this-is-a-test-resource", gem5_version="23.0"),
+                ClientQuery("test-version", gem5_version="23.0"),
+            ]
+        )
+        self.assertEqual(
+            "1.0.0", resources["this-is-a-test-resource"]["resource_version"]
+        )
+        self.assertEqual(
+            "1.0.0", resources["test-version"]["resource_version"]
+        )
+
+        resources = client.get_resources(
+            [
+                ClientQuery("test-version", "0.2.0", gem5_version="23.0"),
+                ClientQuery("this-is-a-test-resource", gem5_version="23.1"),
+                ClientQuery("not-a-resource", gem5_version="23.1"),
+            ]
+        )
+        self.assertEqual(
+            "2.0.0", resources["this-is-a-test-resource"]["resource_version"]
+        )
+        self.assertEqual(
+            "0.2.0", resources["test-version"]["resource_version"]
+        )
+        self.assertNotIn("not-a-resource", resources)
+
+    def test_url_catalog_is_cached(self) -> None:
+        # Tests a catalog fetched from a URL is cached on disk, used as is
+        # within its TTL, and revalidated with its ETag after it.
+
+        with open(self.file_path) as f:
+            file_contents = f.read()
+
+        class MockResponse:
+            headers = {"ETag": '"v1"', "Last-Modified": None}
+
+            def read(self):
+                return file_contents.encode("utf-8")
+
+        requests = []
+
+        def mocked_urlopen(req, *args, **kwargs):
+            requests.append(req)
+            if req.get_header("If-none-match") == '"v1"':
+                raise HTTPError(
+                    req.full_url, 304, "Not Modified", {}, io.BytesIO()
+                )
+            return MockResponse()
+
+        url = "https://resources.example.com/resources.json"
+        with tempfile.TemporaryDirectory() as cache_dir, patch.dict(
+            os.environ,
+            {
+                "GEM5_RESOURCE_CATALOG_DIR": cache_dir,
+                "GEM5_RESOURCE_CATALOG_TTL": "3600",
+            },
+        ), patch(
+            "gem5.resources.client_api.catalog._catalogs", new={}
+        ) as catalogs, patch(
+            "urllib.request.urlopen", side_effect=mocked_urlopen
+        ):
+            self.verify_json(JSONClient(path=url).get_resources_json())
+            self.assertEqual(1, len(requests))
+            self.assertEqual(1, len(os.listdir(cache_dir)))
+
+            # A new process reads the cached catalog.
+            catalogs.clear()
+            self.verify_json(JSONClient(path=url).get_resources_json())
+            self.assertEqual(1, len(requests))
+
+            # Once the TTL has expired, the catalog is revalidated.
+            catalogs.clear()
+            os.environ["GEM5_RESOURCE_CATALOG_TTL"] = "0"
+            self.verify_json(JSONClient(path=url).get_resources_json())
+            self.assertEqual(2, len(requests))
+
+    def test_url_catalog_server_error_uses_cache(self) -> None:
+        # Tests a server error, like an unreachable server, falls back to the
+        # catalog cached on disk once its TTL has expired.
+
+        with open(self.file_path) as f:
+            file_contents = f.read()
+
+        class MockResponse:
+            headers = {"ETag": '"v1"', "Last-Modified": None}
+
+            def read(self):
+                return file_contents.encode("utf-8")
+
+        responses = [MockResponse()]
+
+        def mocked_urlopen(req, *args, **kwargs):
+            if responses:
+                return responses.pop()
+            raise HTTPError(
+                req.full_url, 503, "Service Unavailable", {}, io.BytesIO()
+            )
+
+        url = "https://resources.example.com/resources.json"
+        with tempfile.TemporaryDirectory() as cache_dir, patch.dict(
+            os.environ,
+            {
+                "GEM5_RESOURCE_CATALOG_DIR": cache_dir,
+                "GEM5_RESOURCE_CATALOG_TTL": "0",
+            },
+        ), patch("gem5.resources.client_api.catalog._catalogs", new={}), patch(
+            "urllib.request.urlopen", side_effect=mocked_urlopen
+        ):
+            self.verify_json(JSONClient(path=url).get_resources_json())
+            self.verify_json(JSONClient(path=url).get_resources_json())
+
+    def test_file_catalog_is_replaced(self) -> None:
+        # Tests a catalog read from a file is read again once the file is
+        # modified, and replaces the catalog read from the earlier version.
+
+        with open(self.file_path) as f:
+            file_contents = json.load(f)
+
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".json", delete=False
+        ) as f:
+            json.dump(file_contents, f)
+        self.addCleanup(os.remove, f.name)
+
+        with patch(
+            "gem5.resources.client_api.catalog._catalogs", new={}
+        ) as catalogs:
+            self.verify_json(JSONClient(path=f.name).get_resources_json())
+            with open(f.name, "w") as file:
+                json.dump(file_contents[:1], file)
+            resources = JSONClient(path=f.name).get_resources_json()
+            self.assertEqual(1, len(resources))
+            self.assertEqual(1, len(catalogs))
+
+    def test_malformed_version_only_affects_its_resource(self) -> None:
+        # Tests versions which cannot be compared with each other only break
+        # lookups of the resource they belong to.
+
+        with open(self.file_path) as f:
+            file_contents = json.load(f)
+        broken = dict(file_contents[2], id="broken", resource_version="1.0")
+        file_contents += [broken, dict(broken, resource_version="a.b")]
+
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".json", delete=False
+        ) as f:
+            json.dump(file_contents, f)
+        self.addCleanup(os.remove, f.name)
+
+        client = JSONClient(path=f.name)
+        resources = client.get_resources(
+            [ClientQuery("test-version", gem5_version="23.0")]
+        )
+        self.assertEqual(
+            "1.0.0", resources["test-version"]["resource_version"]
+        )
+        with self.assertRaises(TypeError):
+            client.get_resources([ClientQuery("broken")])
@@ -24,6 +24,7 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import hashlib
 import os
 import shutil
 import tempfile
@@ -31,6 +32,7 @@ import unittest
 from pathlib import Path
 
 from gem5.resources.md5_utils import (
+    cached_md5,
     md5_dir,
     md5_file,
 )
@@ -116,3 +118,83 @@ class MD5DirTestSuite(unittest.TestCase):
         shutil.rmtree(dir2)
 
         self.assertEqual(first_md5, second_md5)
+
+    def test_md5DirIndependentOfWorkers(self) -> None:
+        # This test ensures that reading files concurrently does not change
+        # the md5 value, by comparing against a directory hashed serially.
+
+        def serial_md5(directory: Path, hash) -> None:
+            for path in sorted(
+                directory.iterdir(), key=lambda p: str(p).lower()
+            ):
+                hash.update(path.name.encode())
+                if path.is_file():
+                    hash.update(path.read_bytes())
+                elif path.is_dir():
+                    serial_md5(path, hash)
+
+        dir = Path(tempfile.mkdtemp())
+        for i in range(50):
+            subdir = dir / f"Dir{i % 7}" / f"sub{i % 3}"
+            subdir.mkdir(parents=True, exist_ok=True)
+            (subdir / f"file{i}").write_bytes(os.urandom(i * 997))
+        (dir / "empty").mkdir()
+        (dir / "large").write_bytes(os.urandom(9 * 1024 * 1024))
+
+        expected = hashlib.md5()
+        serial_md5(dir, expected)
+        try:
+            for workers in (1, 4, None):
+                self.assertEqual(
+                    expected.hexdigest(), md5_dir(dir, max_workers=workers)
+                )
+        finally:
+            shutil.rmtree(dir)
+
+
+class CachedMD5TestSuite(unittest.TestCase):
+    """Test cases for gem5.resources.md5_utils.cached_md5()"""
+
+    def setUp(self) -> None:
+        self.dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def test_cachedMd5MatchesMd5(self) -> None:
+        file = self.dir / "file"
+        file.write_text("This is a test string, to be put in a temp file")
+
+        self.assertEqual(md5_file(file), cached_md5(file))
+        self.assertTrue((self.dir / "file.md5cache").exists())
+        self.assertEqual(md5_file(file), cached_md5(file))
+
+    def test_cacheIsUsed(self) -> None:
+        file = self.dir / "file"
+        file.write_text("Some test data here")
+        cached_md5(file)
+
+        # Tamper with the cached value: it is returned as the file is
+        # unchanged.
+        cache = self.dir / "file.md5cache"
+        cache.write_text(cache.read_text().replace(md5_file(file), "0" * 32))
+        self.assertEqual("0" * 32, cached_md5(file))
+
+    def test_modifiedFileIsRehashed(self) -> None:
+        file = self.dir / "file"
+        file.write_text("Some test data here")
+        cached_md5(file)
+
+        file.write_text("Some different test data")
+        self.assertEqual(md5_file(file), cached_md5(file))
+
+    def test_modifiedDirIsRehashed(self) -> None:
+        dir = self.dir / "resource"
+        os.mkdir(dir)
+        os.mkdir(dir / "subdir")
+        (dir / "subdir" / "file").write_text("Yet more data")
+        self.assertEqual(md5_dir(dir), cached_md5(dir))
+
+        # Only the nested file changes, not the directory's own metadata.
+        (dir / "subdir" / "file").write_text("Yet more data, but longer")
+        self.assertEqual(md5_dir(dir), cached_md5(dir))
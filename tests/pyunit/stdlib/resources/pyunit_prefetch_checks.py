@@ -0,0 +1,241 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import contextlib
+import gzip
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import unittest
+from functools import partial
+from http.server import (
+    SimpleHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from pathlib import Path
+from unittest.mock import patch
+
+from _m5 import core
+
+from gem5.resources.client import _create_clients
+from gem5.resources.md5_utils import (
+    md5_dir,
+    md5_file,
+)
+from gem5.resources.prefetch import (
+    find_resources_in_config,
+    prefetch_resources,
+)
+
+
+class _RecordingHandler(SimpleHTTPRequestHandler):
+    """Serves files, recording the paths requested rather than logging."""
+
+    requests = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        _RecordingHandler.requests.append(self.path)
+        super().do_GET()
+
+
+class PrefetchResourcesTestSuite(unittest.TestCase):
+    """Test cases for gem5.resources.prefetch, using a local HTTP server as a
+    stand-in for the resources server."""
+
+    def setUp(self) -> None:
+        self.served = Path(tempfile.mkdtemp())
+        self.resource_dir = Path(tempfile.mkdtemp())
+
+        (self.served / "binary").write_bytes(b"A binary" * 1000)
+        (self.served / "zipped").write_bytes(b"A zipped file" * 1000)
+        with gzip.open(self.served / "zipped.gz", "wb") as f:
+            f.write((self.served / "zipped").read_bytes())
+        (self.served / "dir").mkdir()
+        (self.served / "dir" / "file").write_text("A file in a tar archive")
+        with tarfile.open(self.served / "dir.tar", "w") as f:
+            f.add(self.served / "dir", arcname=".")
+
+        _RecordingHandler.requests = []
+        self.server = ThreadingHTTPServer(
+            ("127.0.0.1", 0),
+            partial(_RecordingHandler, directory=str(self.served)),
+        )
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        gem5_versions = [".".join(core.gem5Version.split(".")[:2])]
+        resources = [
+            {
+                "category": "binary",
+                "id": "prefetch-binary",
+                "architecture": "X86",
+                "is_zipped": False,
+                "md5sum": md5_file(self.served / "binary"),
+                "url": f"{url}/binary",
+                "resource_version": "1.0.0",
+                "gem5_versions": gem5_versions,
+            },
+            {
+                "category": "file",
+                "id": "prefetch-zipped",
+                "is_zipped": True,
+                "md5sum": md5_file(self.served / "zipped"),
+                "url": f"{url}/zipped.gz",
+                "resource_version": "1.0.0",
+                "gem5_versions": gem5_versions,
+            },
+            {
+                "category": "file",
+                "id": "prefetch-tar",
+                "is_zipped": False,
+                "is_tar_archive": True,
+                "md5sum": md5_dir(self.served / "dir"),
+                "url": f"{url}/dir.tar",
+                "resource_version": "1.0.0",
+                "gem5_versions": gem5_versions,
+            },
+            {
+                "category": "workload",
+                "id": "prefetch-workload",
+                "function": "set_se_binary_workload",
+                "resources": {
+                    "binary": {
+                        "id": "prefetch-binary",
+                        "resource_version": "1.0.0",
+                    }
+                },
+                "additional_params": {},
+                "resource_version": "1.0.0",
+                "gem5_versions": gem5_versions,
+            },
+        ]
+        self.resources_json = self.served / "resources.json"
+        self.resources_json.write_text(json.dumps(resources))
+
+        config = {
+            "sources": {
+                "local": {"url": str(self.resources_json), "isMongo": False}
+            }
+        }
+        patches = [
+            patch("gem5.resources.client.clientwrapper", new=None),
+            patch(
+                "gem5.resources.client._create_clients",
+                side_effect=lambda x: _create_clients(config),
+            ),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.served)
+        shutil.rmtree(self.resource_dir)
+
+    def test_prefetch_resources(self) -> None:
+        # Tests the resources, including those used by a workload, are
+        # downloaded, decompressed and unpacked into the resource directory.
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            local_paths = prefetch_resources(
+                ["prefetch-workload", "prefetch-zipped", "prefetch-tar"],
+                resource_directory=str(self.resource_dir),
+                quiet=True,
+            )
+
+        self.assertEqual(
+            {
+                "prefetch-binary": str(self.resource_dir / "prefetch-binary"),
+                "prefetch-zipped": str(self.resource_dir / "prefetch-zipped"),
+                "prefetch-tar": str(self.resource_dir / "prefetch-tar"),
+            },
+            local_paths,
+        )
+        self.assertEqual(
+            (self.served / "binary").read_bytes(),
+            (self.resource_dir / "prefetch-binary").read_bytes(),
+        )
+        self.assertEqual(
+            (self.served / "zipped").read_bytes(),
+            (self.resource_dir / "prefetch-zipped").read_bytes(),
+        )
+        self.assertEqual(
+            "A file in a tar archive",
+            (self.resource_dir / "prefetch-tar" / "file").read_text(),
+        )
+        self.assertEqual(
+            ["/binary", "/dir.tar", "/zipped.gz"],
+            sorted(_RecordingHandler.requests),
+        )
+
+        # Resources already present are not downloaded again.
+        with contextlib.redirect_stdout(io.StringIO()):
+            prefetch_resources(
+                ["prefetch-workload", "prefetch-zipped", "prefetch-tar"],
+                resource_directory=str(self.resource_dir),
+                quiet=True,
+            )
+        self.assertEqual(3, len(_RecordingHandler.requests))
+
+    def test_prefetch_resources_missing_resource(self) -> None:
+        with self.assertRaises(Exception) as context:
+            prefetch_resources(
+                ["prefetch-binary", "not-a-resource"],
+                resource_directory=str(self.resource_dir),
+                quiet=True,
+            )
+        self.assertIn("not-a-resource", str(context.exception))
+
+    def test_find_resources_in_config(self) -> None:
+        config = self.served / "config.py"
+        config.write_text(
+            "from gem5.resources.resource import obtain_resource\n"
+            "binary = obtain_resource('prefetch-binary')\n"
+            "disk = obtain_resource(\n"
+            "    resource_id='prefetch-tar', resource_version='1.0.0'\n"
+            ")\n"
+            "kernel = Resource('prefetch-zipped')\n"
+            "again = obtain_resource('prefetch-binary')\n"
+            "computed = obtain_resource(binary.get_id() + '-other')\n"
+        )
+
+        self.assertEqual(
+            [
+                ("prefetch-binary", None),
+                ("prefetch-tar", "1.0.0"),
+                ("prefetch-zipped", None),
+            ],
+            find_resources_in_config(config),
+        )
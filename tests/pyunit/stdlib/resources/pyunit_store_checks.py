@@ -0,0 +1,121 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+
+from gem5.resources.md5_utils import (
+    md5_dir,
+    md5_file,
+)
+from gem5.resources.store import ResourceStore
+
+
+class ResourceStoreTestSuite(unittest.TestCase):
+    """Test cases for gem5.resources.store.ResourceStore"""
+
+    def setUp(self) -> None:
+        self.dir = Path(tempfile.mkdtemp())
+        self.root = self.dir / "store"
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def _make_file(self, name: str, data: bytes) -> Path:
+        path = self.dir / name
+        path.write_bytes(data)
+        return path
+
+    def test_add_and_deploy_hardlink(self) -> None:
+        store = ResourceStore(self.root, link_mode="hardlink")
+        path = self._make_file("kernel", b"A kernel" * 1000)
+        md5 = md5_file(path)
+
+        self.assertFalse(store.contains(md5))
+        self.assertFalse(store.deploy(md5, self.dir / "other-kernel"))
+
+        store.add(path, md5)
+        self.assertTrue(store.contains(md5))
+        self.assertTrue(store.deploy(md5, self.dir / "other-kernel"))
+
+        self.assertEqual(b"A kernel" * 1000, path.read_bytes())
+        self.assertTrue(os.path.samefile(path, self.dir / "other-kernel"))
+        # The resource cannot be modified through the paths it is deployed
+        # to.
+        self.assertFalse(path.stat().st_mode & stat.S_IWUSR)
+
+    def test_deploy_directory_symlink(self) -> None:
+        store = ResourceStore(self.root, link_mode="symlink")
+        path = self.dir / "checkpoint"
+        path.mkdir()
+        (path / "m5.cpt").write_text("A checkpoint")
+        md5 = md5_dir(path)
+
+        store.add(path, md5)
+        self.assertTrue(store.deploy(md5, self.dir / "other-checkpoint"))
+
+        self.assertTrue(path.is_symlink())
+        self.assertEqual(md5, md5_dir(self.dir / "other-checkpoint"))
+
+    def test_deploy_copy(self) -> None:
+        store = ResourceStore(self.root, link_mode="copy")
+        path = self._make_file("disk", b"A disk image")
+        md5 = md5_file(path)
+
+        store.add(path, md5)
+
+        self.assertEqual(b"A disk image", path.read_bytes())
+        self.assertTrue(path.stat().st_mode & stat.S_IWUSR)
+
+    def test_gc_removes_unreferenced_least_recently_used(self) -> None:
+        store = ResourceStore(self.root, link_mode="symlink")
+        md5s = []
+        for name in ("first", "second", "third"):
+            path = self._make_file(name, name.encode() * 4096)
+            md5s.append(md5_file(path))
+            store.add(path, md5s[-1])
+
+        # "first" is the least recently used, but is still deployed.
+        # "second" is no longer deployed.
+        os.remove(self.dir / "second")
+        store.deploy(md5s[2], self.dir / "third-again")
+
+        removed = store.gc(size_cap=0)
+
+        self.assertEqual([md5s[1]], removed)
+        self.assertTrue(store.contains(md5s[0]))
+        self.assertFalse(store.contains(md5s[1]))
+        self.assertTrue(store.contains(md5s[2]))
+
+        # Once nothing refers to them, the remaining resources are removed.
+        os.remove(self.dir / "first")
+        os.remove(self.dir / "third")
+        os.remove(self.dir / "third-again")
+        self.assertEqual([md5s[0], md5s[2]], store.gc(size_cap=0))
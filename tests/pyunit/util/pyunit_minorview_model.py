@@ -0,0 +1,125 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+_UTIL_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "util"
+)
+sys.path.insert(0, _UTIL_DIR)
+
+# The model only needs the GUI modules (PyGTK, which is not available for
+# Python 3) for the colours and the drawing of its blobs, so stand-ins are
+# used for those which are missing.
+_GUI_STUBS = {
+    name: mock.MagicMock()
+    for name in ("pygtk", "gtk", "gobject", "cairo")
+    if importlib.util.find_spec(name) is None
+}
+with mock.patch.dict(sys.modules, _GUI_STUBS):
+    from minorview.model import (
+        BlobModel,
+        Id,
+    )
+
+
+def _trace_lines():
+    """A trace in which the microops of each instruction are decoded at
+    successive times, so that they are split between chunks"""
+    lines = []
+    time = 0
+    for fetchSeqNum in range(1, 21):
+        for execSeqNum in range(1, 5):
+            time += 1000
+            id = f"0/1.1/{fetchSeqNum}/{fetchSeqNum}.{execSeqNum}"
+            lines.append(
+                f"{time:>10}: system.cpu.decode: MinorTrace: insts=({id})\n"
+            )
+            lines.append(
+                f"{time:>10}: system.cpu.decode: MinorInst: id={id} "
+                f'addr=0x{fetchSeqNum * 4:x} inst="uop{execSeqNum}"\n'
+            )
+        if fetchSeqNum % 5 == 0:
+            # A non-microop definition replaces the first microop as the
+            #   macroop
+            lines.append(
+                f"{time:>10}: system.cpu.decode: MinorInst: "
+                f"id=0/1.1/{fetchSeqNum}/{fetchSeqNum}.0 "
+                f'addr=0x{fetchSeqNum * 4:x} inst="macroop"\n'
+            )
+    return lines
+
+
+class MinorviewModelTestSuite(unittest.TestCase):
+    """Test cases for the windowed event loading of minorview's BlobModel"""
+
+    def setUp(self) -> None:
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".trace", delete=False
+        ) as f:
+            f.writelines(_trace_lines())
+            self.path = f.name
+        super().setUp()
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+        super().tearDown()
+
+    def _load(self, **kwargs):
+        model = BlobModel(unitNamePrefix="system.cpu", **kwargs)
+        model.load_picture(os.path.join(_UTIL_DIR, "minorview", "minor.pic"))
+        model.load_events(self.path)
+        return model
+
+    def test_find_inst_across_chunks(self) -> None:
+        whole = self._load(windowTimes=10**6)
+        windowed = self._load(windowTimes=3, maxWindows=2)
+        self.assertGreater(len(windowed.chunks), 1)
+        for fetchSeqNum in range(1, 22):
+            for execSeqNum in range(0, 6):
+                id = Id().from_string(
+                    f"0/1.1/{fetchSeqNum}/{fetchSeqNum}.{execSeqNum}"
+                )
+                expected = whole.find_inst(id)
+                found = windowed.find_inst(id)
+                if expected is None:
+                    self.assertIsNone(found)
+                else:
+                    self.assertEqual(expected.table_line(), found.table_line())
+
+    def test_find_exact_microop(self) -> None:
+        model = self._load(windowTimes=3, maxWindows=2)
+        inst = model.find_inst(Id().from_string("0/1.1/7/7.3"))
+        self.assertEqual("uop3", inst.disassembly)
+        inst = model.find_inst(Id().from_string("0/1.1/7/7.5"))
+        self.assertEqual("uop1", inst.disassembly)
+        inst = model.find_inst(Id().from_string("0/1.1/10/10.5"))
+        self.assertEqual("macroop", inst.disassembly)
@@ -0,0 +1,132 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import contextlib
+import importlib.util
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+_UTIL_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "util"
+)
+# o3-pipeview prints with m5.util.terminal
+sys.path.append(os.path.join(_UTIL_DIR, "..", "src", "python"))
+
+_STAGES = ("decode", "rename", "dispatch", "issue", "complete")
+
+
+def _load_o3_pipeview():
+    # The module keeps the state of a run in globals, so each run loads a
+    # fresh copy.
+    spec = importlib.util.spec_from_file_location(
+        "o3_pipeview", os.path.join(_UTIL_DIR, "o3-pipeview.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _trace_lines():
+    """A trace of 300 instructions, some of them squashed, with other debug
+    output in between"""
+    lines = []
+    for sn in range(1, 301):
+        fetch = sn * 1000
+        lines.append(
+            f"O3PipeView:fetch:{fetch}:0x{0x1000 + 4 * sn:08x}:0:{sn}:"
+            f"  add r{sn % 8}, r1, r2\n"
+        )
+        for offset, stage in enumerate(_STAGES, 1):
+            lines.append(f"O3PipeView:{stage}:{fetch + offset * 500}\n")
+        retire = 0 if sn % 17 == 0 else fetch + 4000
+        lines.append(f"O3PipeView:retire:{retire}:store:0\n")
+        if sn % 10 == 0:
+            lines.append(f"{fetch}: system.cpu: some other debug output\n")
+    return lines
+
+
+class O3PipeviewIndexTestSuite(unittest.TestCase):
+    """Test cases for the trace index of o3-pipeview"""
+
+    def setUp(self) -> None:
+        self.dir = tempfile.mkdtemp()
+        self.trace = os.path.join(self.dir, "trace.out")
+        with open(self.trace, "w") as f:
+            f.writelines(_trace_lines())
+        super().setUp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+        super().tearDown()
+
+    def _run(self, *args):
+        outfile = os.path.join(self.dir, "pipeview.out")
+        argv = ["o3-pipeview.py", "-o", outfile, *args, self.trace]
+        with mock.patch.object(sys, "argv", argv), contextlib.redirect_stdout(
+            io.StringIO()
+        ):
+            _load_o3_pipeview().main()
+        with open(outfile) as f:
+            return f.read()
+
+    def test_index_matches_no_index(self) -> None:
+        for window in (
+            ["-t", "50000:80000"],
+            ["-t", "123456:-1"],
+            ["-t", "1:2000"],
+            ["-i", "42:60"],
+            ["-i", "250:-1"],
+            ["-i", "299:300"],
+            ["-t", "100000:200000", "--only_committed"],
+        ):
+            for interval in ("1", "7", "10000"):
+                with self.subTest(window=window, interval=interval):
+                    expected = self._run("--no-index", *window)
+                    self.assertIn("add r", expected)
+                    self.assertEqual(
+                        expected,
+                        self._run("--index-interval", interval, *window),
+                    )
+        self.assertTrue(os.path.exists(self.trace + ".index"))
+
+    def test_window_past_the_end(self) -> None:
+        self.assertEqual(
+            self._run("--no-index", "-t", "10000000:-1"),
+            self._run("--index-interval", "7", "-t", "10000000:-1"),
+        )
+
+    def test_invalid_index_interval(self) -> None:
+        for interval in ("0", "-5"):
+            with self.subTest(interval=interval), contextlib.redirect_stderr(
+                io.StringIO()
+            ) as stderr, self.assertRaises(SystemExit):
+                self._run("--index-interval", interval, "-t", "5000:6000")
+            self.assertIn("index interval must be positive", stderr.getvalue())
@@ -0,0 +1,360 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+_UTIL_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "util"
+)
+sys.path.insert(0, _UTIL_DIR)
+
+import protolib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from google.protobuf import (
+        descriptor_pb2,
+        descriptor_pool,
+        message_factory,
+    )
+except ImportError:
+    descriptor_pb2 = None
+
+# The fields of a Packet, in the order of protolib.packetDtype(), and
+# whether each is a 64-bit field.
+_FIELDS = (
+    ("tick", 1, True),
+    ("cmd", 2, False),
+    ("addr", 3, True),
+    ("size", 4, False),
+    ("flags", 5, False),
+    ("pkt_id", 6, True),
+    ("pc", 7, True),
+)
+_OPTIONAL = ("flags", "pkt_id", "pc")
+
+
+def _varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _random_value(rng, length):
+    """A random value whose varint encoding is length bytes long"""
+    low = 1 << (7 * (length - 1)) if length > 1 else 0
+    high = min((1 << (7 * length)) - 1, (1 << 64) - 1)
+    return rng.randint(low, high)
+
+
+def _random_packet(rng):
+    packet = {}
+    for name, _, wide in _FIELDS:
+        if name in _OPTIONAL and rng.random() < 0.5:
+            continue
+        packet[name] = _random_value(rng, rng.randint(1, 10 if wide else 5))
+        if not wide:
+            packet[name] &= 0xFFFFFFFF
+    return packet
+
+
+def _encode_packet(packet):
+    body = b"".join(
+        _varint(number << 3) + _varint(packet[name])
+        for name, number, _ in _FIELDS
+        if name in packet
+    )
+    return _varint(len(body)) + body
+
+
+def _expected_tuple(packet):
+    return tuple(packet.get(name, 0) for name, _, _ in _FIELDS) + tuple(
+        name in packet for name in _OPTIONAL
+    )
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class DecodeVarintsTestSuite(unittest.TestCase):
+    """Test cases for protolib._decodeVarints"""
+
+    def _decode(self, encoded):
+        end = len(encoded)
+        data = np.zeros(end + 8, dtype=np.uint8)
+        data[:end] = np.frombuffer(encoded, dtype=np.uint8)
+        return protolib._decodeVarints(data, end)
+
+    def test_every_length(self) -> None:
+        rng = random.Random(5)
+        for length in range(1, 11):
+            values = [_random_value(rng, length) for _ in range(50)]
+            values += [1 << (7 * (length - 1)) if length > 1 else 0]
+            values += [min((1 << (7 * length)) - 1, (1 << 64) - 1)]
+            with self.subTest(length=length):
+                decoded, last_bytes = self._decode(
+                    b"".join(_varint(v) for v in values)
+                )
+                self.assertEqual(values, decoded.tolist())
+                self.assertEqual(
+                    [length * (i + 1) - 1 for i in range(len(values))],
+                    last_bytes.tolist(),
+                )
+
+    def test_random_lengths(self) -> None:
+        rng = random.Random(21)
+        for _ in range(20):
+            values = [
+                _random_value(rng, rng.randint(1, 10)) for _ in range(500)
+            ]
+            encoded = [_varint(v) for v in values]
+            decoded, last_bytes = self._decode(b"".join(encoded))
+            self.assertEqual(values, decoded.tolist())
+            self.assertEqual(
+                list(np.cumsum([len(e) for e in encoded]) - 1),
+                last_bytes.tolist(),
+            )
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class DecodePacketBatchesTestSuite(unittest.TestCase):
+    """Test cases for protolib.decodePacketBatches"""
+
+    def _decode(self, encoded, block_size):
+        batches = protolib.decodePacketBatches(
+            io.BytesIO(encoded), block_size=block_size
+        )
+        return [p for batch in batches for p in batch.tolist()]
+
+    def test_round_trip(self) -> None:
+        rng = random.Random(8)
+        packets = [_random_packet(rng) for _ in range(300)]
+        encoded = b"".join(_encode_packet(p) for p in packets)
+        expected = [_expected_tuple(p) for p in packets]
+        for block_size in (1, 3, 17, 64, 1000, len(encoded), 1 << 20):
+            with self.subTest(block_size=block_size):
+                self.assertEqual(expected, self._decode(encoded, block_size))
+
+    def test_long_message_lengths(self) -> None:
+        # An unknown field makes the message long enough for its length
+        # prefix to take two bytes; the field is ignored.
+        packet = {"tick": 7, "cmd": 1, "addr": 64, "size": 8}
+        body = _encode_packet(packet)[1:] + _varint(15 << 3) + _varint(1)
+        body += b"".join(
+            _varint(15 << 3) + _varint(1 << 40) for _ in range(30)
+        )
+        encoded = _varint(len(body)) + body
+        self.assertGreater(len(body), 127)
+        for block_size in (1, 5, 4096):
+            self.assertEqual(
+                [_expected_tuple(packet)] * 2,
+                self._decode(encoded * 2, block_size),
+            )
+
+    def test_end_marker(self) -> None:
+        packet = {"tick": 1, "cmd": 2, "addr": 3, "size": 4}
+        encoded = _encode_packet(packet) + b"\0" + _encode_packet(packet)
+        self.assertEqual([_expected_tuple(packet)], self._decode(encoded, 4))
+
+    def test_truncated_field(self) -> None:
+        # A message whose last tag has no value.
+        body = _varint(1 << 3) + _varint(100) + _varint(2 << 3)
+        with self.assertRaisesRegex(OSError, "Truncated packet"):
+            self._decode(_varint(len(body)) + body, 4096)
+
+    def test_not_a_varint(self) -> None:
+        # A length-delimited field (wire type 2) where a varint is expected.
+        body = _varint(1 << 3) + _varint(100) + _varint(3 << 3 | 2) + b"\1"
+        with self.assertRaisesRegex(OSError, "not a varint"):
+            self._decode(_varint(len(body)) + body, 4096)
+
+
+def _message_class(name, fields):
+    """Build a proto2 message class with the given (name, number, type,
+    label) fields, without needing protoc."""
+    FieldDescriptorProto = descriptor_pb2.FieldDescriptorProto
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name=f"pyunit_{name}.proto", package="pyunit", syntax="proto2"
+    )
+    message_proto = file_proto.message_type.add(name=name)
+    for field_name, number, type, label in fields:
+        message_proto.field.add(
+            name=field_name,
+            number=number,
+            type=getattr(FieldDescriptorProto, "TYPE_" + type),
+            label=getattr(FieldDescriptorProto, "LABEL_" + label),
+        )
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_proto)
+    return message_factory.GetMessageClass(
+        pool.FindMessageTypeByName(f"pyunit.{name}")
+    )
+
+
+@unittest.skipIf(
+    np is None or descriptor_pb2 is None, "NumPy or protobuf is not installed"
+)
+class EncodeMessageColumnsTestSuite(unittest.TestCase):
+    """Test cases comparing protolib.encodeMessageColumns and
+    encodePacketBatches with protolib.encodeMessage"""
+
+    def _encode_messages(self, messages):
+        out = io.BytesIO()
+        for message in messages:
+            protolib.encodeMessage(out, message)
+        return out.getvalue()
+
+    def test_packets(self) -> None:
+        Packet = _message_class(
+            "Packet",
+            [
+                (name, number, "UINT64" if wide else "UINT32", "OPTIONAL")
+                for name, number, wide in _FIELDS
+            ],
+        )
+        rng = random.Random(23)
+        packets = [_random_packet(rng) for _ in range(500)]
+        batch = np.array(
+            [_expected_tuple(p) for p in packets], dtype=protolib.packetDtype()
+        )
+
+        out = io.BytesIO()
+        # An empty batch is skipped.
+        num_packets = protolib.encodePacketBatches(
+            out, [batch[:100], batch[:0], batch[100:]]
+        )
+        self.assertEqual(len(packets), num_packets)
+        self.assertEqual(
+            self._encode_messages(Packet(**p) for p in packets),
+            out.getvalue(),
+        )
+
+    def test_signed_repeated_and_optional_fields(self) -> None:
+        Message = _message_class(
+            "Message",
+            [
+                ("count", 1, "INT32", "REQUIRED"),
+                ("deps", 2, "UINT64", "REPEATED"),
+                ("weight", 3, "UINT32", "OPTIONAL"),
+                ("delta", 4, "INT64", "OPTIONAL"),
+                ("valid", 5, "BOOL", "REQUIRED"),
+                ("other", 20, "UINT64", "REPEATED"),
+            ],
+        )
+        rng = random.Random(3)
+        messages = []
+        columns = {name: [] for name in ("count", "deps", "deps_count")}
+        columns.update({name: [] for name in ("weight", "has_weight")})
+        columns.update({name: [] for name in ("delta", "has_delta")})
+        columns.update({"valid": [], "other": [], "other_count": []})
+        for i in range(300):
+            fields = {
+                # Negative int32 values are sign extended to ten bytes.
+                "count": (
+                    rng.choice([0, -1, -(1 << 31), (1 << 31) - 1])
+                    if i % 3
+                    else rng.randint(-1000, 1000)
+                ),
+                # Some messages have no elements of the repeated fields.
+                "deps": [
+                    _random_value(rng, rng.randint(1, 10))
+                    for _ in range(rng.choice([0, 0, 1, 3]))
+                ],
+                "valid": bool(i % 2),
+                "other": [rng.randint(0, 300) for _ in range(i % 2)],
+            }
+            if rng.random() < 0.5:
+                fields["weight"] = rng.randint(0, (1 << 32) - 1)
+            if rng.random() < 0.5:
+                fields["delta"] = rng.randint(-(1 << 63), (1 << 63) - 1)
+            messages.append(Message(**fields))
+
+            columns["count"].append(fields["count"])
+            columns["valid"].append(fields["valid"])
+            for name in ("deps", "other"):
+                columns[name] += fields[name]
+                columns[name + "_count"].append(len(fields[name]))
+            for name in ("weight", "delta"):
+                columns[name].append(fields.get(name, 0))
+                columns["has_" + name].append(name in fields)
+
+        dtypes = {"count": np.int32, "delta": np.int64, "weight": np.uint32}
+        dtypes.update(valid=bool, has_weight=bool, has_delta=bool)
+        arrays = {
+            name: np.array(values, dtype=dtypes.get(name, np.uint64))
+            for name, values in columns.items()
+        }
+
+        fields = {
+            1: "count",
+            2: "deps",
+            3: "weight",
+            4: "delta",
+            5: "valid",
+            20: "other",
+        }
+        self.assertEqual(
+            self._encode_messages(messages),
+            protolib.encodeMessageColumns(arrays, fields),
+        )
+
+    def test_no_messages(self) -> None:
+        self.assertEqual(
+            b"",
+            protolib.encodeMessageColumns(
+                {"tick": np.zeros(0, dtype=np.uint64)}, {1: "tick"}
+            ),
+        )
+
+
+class ParallelGzipFileTestSuite(unittest.TestCase):
+    """Test cases for the multi-member gzip files written by
+    protolib.openFileWr"""
+
+    def test_members_read_back(self) -> None:
+        data = bytes(random.Random(1).getrandbits(8) for _ in range(5000))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "trace.gz")
+            with mock.patch.object(protolib, "_GZIP_BLOCK_SIZE", 512):
+                with protolib.openFileWr(path, threads=3) as out:
+                    for i in range(0, len(data), 300):
+                        out.write(data[i : i + 300])
+            with open(path, "rb") as f:
+                # One gzip member per block.
+                self.assertEqual(10, f.read().count(b"\x1f\x8b\x08"))
+            with protolib.openFileRd(path) as f:
+                self.assertEqual(data, f.read())
@@ -0,0 +1,256 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+_UTIL_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "util"
+)
+sys.path.insert(0, _UTIL_DIR)
+
+import protolib
+import tracecolumns
+
+try:
+    import google.protobuf
+    import numpy as np
+except ImportError:
+    np = None
+
+# The generated protobuf modules are made with protoc.
+_CAN_CONVERT = (
+    np is not None
+    and shutil.which("protoc") is not None
+    and shutil.which("make") is not None
+)
+
+_REQUESTORS = {1: "system.cpu0.dcache", 2: "system.cpu1.icache", 3: "dma"}
+
+
+@unittest.skipIf(not _CAN_CONVERT, "NumPy, protobuf or protoc is missing")
+class ColumnarTraceTestSuite(unittest.TestCase):
+    """Test cases for converting traces with tracecolumns and querying them,
+    against a brute-force filter of all the messages"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.dir = tempfile.mkdtemp()
+        rng = random.Random(22)
+
+        packet_pb2 = tracecolumns._protoModule("packet")
+        cls.packets = []
+        for i in range(1000):
+            packet = {
+                # Roughly increasing ticks, so chunks overlap a little.
+                "tick": i * 100 + rng.randint(0, 300),
+                "cmd": rng.randint(1, 5),
+                "addr": rng.randrange(0, 1 << 20, 64),
+                "size": 64,
+            }
+            if rng.random() < 0.9:
+                packet["pkt_id"] = rng.choice(list(_REQUESTORS))
+            cls.packets.append(packet)
+        header = packet_pb2.PacketHeader(obj_id="test", tick_freq=10**12)
+        for key, value in _REQUESTORS.items():
+            header.id_strings.add(key=key, value=value)
+        cls.packet_trace = cls._convert(
+            "packet", header, [packet_pb2.Packet(**p) for p in cls.packets]
+        )
+
+        inst_pb2 = tracecolumns._protoModule("inst")
+        cls.insts = []
+        messages = []
+        for i in range(500):
+            inst = {"pc": 0x1000 + 4 * rng.randrange(256), "tick": i * 10}
+            if rng.random() < 0.8:
+                inst["cpuid"] = rng.randint(0, 3)
+            accesses = [
+                {"addr": rng.randrange(1 << 16), "size": 8}
+                for _ in range(rng.choice([0, 0, 1, 2, 3]))
+            ]
+            cls.insts.append((inst, accesses))
+            message = inst_pb2.Inst(**inst)
+            for access in accesses:
+                message.mem_access.add(**access)
+            messages.append(message)
+        header = inst_pb2.InstHeader(
+            obj_id="test", ver=0, tick_freq=10**12, has_mem=True
+        )
+        cls.inst_trace = cls._convert("inst", header, messages)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(cls.dir)
+
+    @classmethod
+    def _convert(cls, kind, header, messages):
+        in_file = os.path.join(cls.dir, f"{kind}.trc.gz")
+        with protolib.openFileWr(in_file, threads=2) as out:
+            out.write(b"gem5")
+            protolib.encodeMessage(out, header)
+            for message in messages:
+                protolib.encodeMessage(out, message)
+        out_dir = os.path.join(cls.dir, kind)
+        rows = tracecolumns.convertTrace(in_file, out_dir, kind, chunk_size=64)
+        assert rows == len(messages)
+        return tracecolumns.ColumnarTrace(out_dir)
+
+    def _loaded_chunks(self, trace, **kwargs):
+        loaded = set()
+        load = tracecolumns.ColumnarTrace._load
+
+        def recording_load(self, chunk, column):
+            loaded.add(chunk["name"])
+            return load(self, chunk, column)
+
+        with mock.patch.object(
+            tracecolumns.ColumnarTrace, "_load", recording_load
+        ):
+            result = trace.query(**kwargs)
+        return result, loaded
+
+    def _expected_packets(self, ticks=None, addrs=None, requestors=None):
+        def within(value, window):
+            start, end = window
+            return (start is None or value >= start) and (
+                end is None or value < end
+            )
+
+        selected = []
+        for packet in self.packets:
+            if ticks is not None and not within(packet["tick"], ticks):
+                continue
+            if addrs is not None and not within(packet["addr"], addrs):
+                continue
+            if requestors is not None and packet.get("pkt_id") not in (
+                requestors
+            ):
+                continue
+            selected.append(packet)
+        return selected
+
+    def _check_packets(self, expected, result):
+        for column in ("tick", "cmd", "addr", "size", "pkt_id"):
+            self.assertEqual(
+                [p.get(column, 0) for p in expected], result[column].tolist()
+            )
+        self.assertEqual(
+            ["pkt_id" in p for p in expected], result["has_pkt_id"].tolist()
+        )
+
+    def test_all_packets(self) -> None:
+        self.assertEqual(len(self.packets), len(self.packet_trace))
+        self._check_packets(self.packets, self.packet_trace.query())
+
+    def test_tick_and_address_windows(self) -> None:
+        for ticks, addrs in (
+            ((20000, 30000), None),
+            ((None, 5000), None),
+            ((95000, None), None),
+            (None, (1 << 18, 1 << 19)),
+            ((10000, 60000), (0, 1 << 19)),
+            ((50000, 50001), None),
+            ((10**9, None), None),
+        ):
+            with self.subTest(ticks=ticks, addrs=addrs):
+                result = self.packet_trace.query(ticks=ticks, addrs=addrs)
+                self._check_packets(
+                    self._expected_packets(ticks, addrs), result
+                )
+
+    def test_chunk_skipping(self) -> None:
+        ticks = (40000, 45000)
+        result, loaded = self._loaded_chunks(self.packet_trace, ticks=ticks)
+        self._check_packets(self._expected_packets(ticks), result)
+        # Only the chunks whose tick range overlaps the window are read.
+        expected = {
+            chunk["name"]
+            for chunk in self.packet_trace._chunks
+            if chunk["tick"][1] >= ticks[0] and chunk["tick"][0] < ticks[1]
+        }
+        self.assertEqual(expected, loaded)
+        self.assertLess(len(loaded), len(self.packet_trace._chunks) // 4)
+
+    def test_requestors_by_name(self) -> None:
+        result = self.packet_trace.query(
+            requestors=["dma", "system.cpu0.dcache"]
+        )
+        self._check_packets(self._expected_packets(requestors={1, 3}), result)
+        result = self.packet_trace.query(requestors=[2], ticks=(0, 50000))
+        self._check_packets(
+            self._expected_packets(ticks=(0, 50000), requestors={2}), result
+        )
+        with self.assertRaises(ValueError):
+            self.packet_trace.query(requestors=["not.a.requestor"])
+
+    def test_ragged_columns(self) -> None:
+        ticks = (1234, 3456)
+        result = self.inst_trace.query(
+            columns=["pc", "mem_access_count", "mem_access_addr"],
+            ticks=ticks,
+            requestors=[1, 2],
+        )
+        selected = [
+            (inst, accesses)
+            for inst, accesses in self.insts
+            if ticks[0] <= inst["tick"] < ticks[1]
+            and inst.get("cpuid") in (1, 2)
+        ]
+        self.assertEqual(
+            [inst["pc"] for inst, _ in selected], result["pc"].tolist()
+        )
+        self.assertEqual(
+            [len(accesses) for _, accesses in selected],
+            result["mem_access_count"].tolist(),
+        )
+        self.assertEqual(
+            [a["addr"] for _, accesses in selected for a in accesses],
+            result["mem_access_addr"].tolist(),
+        )
+
+    def test_invalid_trace_is_closed(self) -> None:
+        in_file = os.path.join(self.dir, "not-a-trace")
+        with open(in_file, "wb") as f:
+            f.write(b"not a gem5 trace")
+        opened = []
+        open_file = protolib.openFileRd
+
+        def recording_open(path):
+            opened.append(open_file(path))
+            return opened[-1]
+
+        with mock.patch.object(protolib, "openFileRd", recording_open):
+            with self.assertRaises(ValueError):
+                tracecolumns.convertTrace(
+                    in_file, os.path.join(self.dir, "invalid")
+                )
+        self.assertTrue(opened[0].closed)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# This script converts a gem5 protobuf trace (a packet, instruction or
+# instruction dependency trace) to a chunked columnar format, which can be
+# queried repeatedly without decoding the protobuf messages again. See
+# tracecolumns.py for the format and the query API, e.g.:
+#
+#   import tracecolumns
+#   trace = tracecolumns.ColumnarTrace("trace.columns")
+#   packets = trace.query(["tick", "addr"], ticks=(0, 10**9))
+#
+# The conversion needs the Python protobuf module and NumPy.
+
+import argparse
+
+import tracecolumns
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert a gem5 protobuf trace to a columnar format."
+    )
+    parser.add_argument("trace", help="The protobuf trace (may be gzipped).")
+    parser.add_argument(
+        "out_dir", help="The directory to write the converted trace to."
+    )
+    parser.add_argument(
+        "-t",
+        "--type",
+        choices=["packet", "inst", "inst-dep"],
+        default="packet",
+        help="The type of trace (default: packet).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1024 * 1024,
+        help="The number of messages per chunk (default: 1048576).",
+    )
+    args = parser.parse_args()
+
+    rows = tracecolumns.convertTrace(
+        args.trace, args.out_dir, args.type, args.chunk_size
+    )
+    print(f"Converted {rows} messages to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
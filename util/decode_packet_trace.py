@@ -38,6 +38,7 @@
 # This script is used to dump protobuf packet traces to ASCII
 # format.
 
+import importlib.util
 import os
 import subprocess
 import sys
@@ -50,6 +51,32 @@ subprocess.check_call(["make", "--quiet", "-C", util_dir, "packet_pb2.py"])
 import packet_pb2
 
 
+def packets(proto_in):
+    """
+    Decode the packets which follow in the file, yielding, for each, a
+    tuple in the order of the fields of protolib.packetDtype(). If NumPy is
+    available, the packets are decoded in bulk.
+    """
+    if importlib.util.find_spec("numpy") is None:
+        for packet in protolib.decodeMessages(proto_in, packet_pb2.Packet()):
+            yield (
+                packet.tick,
+                packet.cmd,
+                packet.addr,
+                packet.size,
+                packet.flags,
+                packet.pkt_id,
+                packet.pc,
+                packet.HasField("flags"),
+                packet.HasField("pkt_id"),
+                packet.HasField("pc"),
+            )
+        return
+
+    for batch in protolib.decodePacketBatches(proto_in):
+        yield from batch.tolist()
+
+
 def main():
     if len(sys.argv) != 3:
         print("Usage: ", sys.argv[0], " <protobuf input> <ASCII output>")
@@ -86,23 +113,31 @@ def main():
     print("Parsing packets")
 
     num_packets = 0
-    packet = packet_pb2.Packet()
 
     # Decode the packet messages until we hit the end of the file
-    while protolib.decodeMessage(proto_in, packet):
+    for (
+        tick,
+        cmd,
+        addr,
+        size,
+        flags,
+        pkt_id,
+        pc,
+        has_flags,
+        has_pkt_id,
+        has_pc,
+    ) in packets(proto_in):
         num_packets += 1
         # ReadReq is 1 and WriteReq is 4 in src/mem/packet.hh Command enum
-        cmd = "r" if packet.cmd == 1 else ("w" if packet.cmd == 4 else "u")
-        if packet.HasField("pkt_id"):
-            ascii_out.write(f"{packet.pkt_id},")
-        if packet.HasField("flags"):
-            ascii_out.write(
-                f"{cmd},{packet.addr},{packet.size},{packet.flags},{packet.tick}"
-            )
+        cmd = "r" if cmd == 1 else ("w" if cmd == 4 else "u")
+        if has_pkt_id:
+            ascii_out.write(f"{pkt_id},")
+        if has_flags:
+            ascii_out.write(f"{cmd},{addr},{size},{flags},{tick}")
         else:
-            ascii_out.write(f"{cmd},{packet.addr},{packet.size},{packet.tick}")
-        if packet.HasField("pc"):
-            ascii_out.write(f",{packet.pc}\n")
+            ascii_out.write(f"{cmd},{addr},{size},{tick}")
+        if has_pc:
+            ascii_out.write(f",{pc}\n")
         else:
             ascii_out.write("\n")
 
@@ -85,6 +85,10 @@
 # 7,35666,1,COMP,3000::,4
 # 8,35670,1,STORE,1748748,4,74,0:,6,3:,7
 # 9,35670,1,COMP,500::,7
+#
+# If the output file name ends with .gz, the trace is gzipped, as the
+# traces written by gem5. If NumPy is available, the records are encoded
+# in bulk, in batches, by protolib.encodeMessageColumns.
 
 import sys
 
@@ -117,6 +121,79 @@ except:
 
 DepRecord = inst_dep_record_pb2.InstDepRecord
 
+# The number of records encoded at once in bulk.
+BATCH_SIZE = 1024 * 1024
+
+
+class RecordColumns:
+    """
+    The fields of a batch of records, gathered into columns to be encoded
+    in bulk by protolib.encodeMessageColumns.
+    """
+
+    def __init__(self):
+        self.fields = {
+            field.number: field.name for field in DepRecord.DESCRIPTOR.fields
+        }
+        self.clear()
+
+    def clear(self):
+        self.columns = {
+            name: []
+            for name in [
+                "seq_num",
+                "pc",
+                "weight",
+                "type",
+                "p_addr",
+                "has_p_addr",
+                "size",
+                "has_size",
+                "flags",
+                "has_flags",
+                "comp_delay",
+                "rob_dep",
+                "rob_dep_count",
+                "reg_dep",
+                "reg_dep_count",
+            ]
+        }
+
+    def __len__(self):
+        return len(self.columns["seq_num"])
+
+    def append(
+        self, seq_num, pc, weight, record_type, mem, comp_delay, rob, reg
+    ):
+        columns = self.columns
+        columns["seq_num"].append(seq_num)
+        columns["pc"].append(pc)
+        columns["weight"].append(weight)
+        columns["type"].append(record_type)
+        has_mem = mem is not None
+        p_addr, size, flags = mem if has_mem else (0, 0, 0)
+        columns["p_addr"].append(p_addr)
+        columns["has_p_addr"].append(has_mem)
+        columns["size"].append(size)
+        columns["has_size"].append(has_mem)
+        columns["flags"].append(flags)
+        columns["has_flags"].append(has_mem)
+        columns["comp_delay"].append(comp_delay)
+        columns["rob_dep"].extend(rob)
+        columns["rob_dep_count"].append(len(rob))
+        columns["reg_dep"].extend(reg)
+        columns["reg_dep_count"].append(len(reg))
+
+    def write(self, proto_out):
+        import numpy as np
+
+        arrays = {
+            name: np.array(values, dtype=np.uint64)
+            for name, values in self.columns.items()
+        }
+        proto_out.write(protolib.encodeMessageColumns(arrays, self.fields))
+        self.clear()
+
 
 def main():
     if len(sys.argv) != 3:
@@ -124,7 +201,7 @@ def main():
         exit(-1)
 
     # Open the file in write mode
-    proto_out = open(sys.argv[2], "wb")
+    proto_out = protolib.openFileWr(sys.argv[2])
 
     # Open the file in read mode
     try:
@@ -135,7 +212,7 @@ def main():
 
     # Write the magic number in 4-byte Little Endian, similar to what
     # is done in src/proto/protoio.cc
-    proto_out.write("gem5")
+    proto_out.write(b"gem5")
 
     # Add the packet header
     header = inst_dep_record_pb2.InstDepRecordHeader()
@@ -151,62 +228,87 @@ def main():
         print("\t", namestr, valdesc.number)
         enumValues[namestr] = valdesc.number
 
+    try:
+        import numpy
+
+        batch = RecordColumns()
+    except ImportError:
+        batch = None
+
     num_records = 0
     # For each line in the ASCII trace, create a packet message and
     # write it to the encoded output
     for line in ascii_in:
         inst_info_str, rob_dep_str, reg_dep_str = (line.strip()).split(":")
         inst_info_list = inst_info_str.split(",")
-        dep_record = DepRecord()
 
-        dep_record.seq_num = int(inst_info_list[0])
-        dep_record.pc = int(inst_info_list[1])
-        dep_record.weight = int(inst_info_list[2])
+        seq_num = int(inst_info_list[0])
+        pc = int(inst_info_list[1])
+        weight = int(inst_info_list[2])
         # If the type is not one of the enum values, it should be a key error
         try:
-            dep_record.type = enumValues[inst_info_list[3]]
+            record_type = enumValues[inst_info_list[3]]
         except KeyError:
             print(
                 "Seq. num",
-                dep_record.seq_num,
+                seq_num,
                 "has unsupported type",
                 inst_info_list[3],
             )
             exit(-1)
 
-        if dep_record.type == DepRecord.INVALID:
-            print("Seq. num", dep_record.seq_num, "is of INVALID type")
+        if record_type == DepRecord.INVALID:
+            print("Seq. num", seq_num, "is of INVALID type")
             exit(-1)
 
         # If the instruction is a load or store record the physical addr,
         # size flags in addition to recording the computation delay
-        if dep_record.type in [DepRecord.LOAD, DepRecord.STORE]:
+        if record_type in [DepRecord.LOAD, DepRecord.STORE]:
             p_addr, size, flags, comp_delay = inst_info_list[4:8]
-            dep_record.p_addr = int(p_addr)
-            dep_record.size = int(size)
-            dep_record.flags = int(flags)
-            dep_record.comp_delay = int(comp_delay)
+            mem = (int(p_addr), int(size), int(flags))
         else:
             comp_delay = inst_info_list[4]
-            dep_record.comp_delay = int(comp_delay)
+            mem = None
+        comp_delay = int(comp_delay)
 
         # Parse the register and order dependencies both of which are
         # repeated fields. An empty list is valid.
-        rob_deps = rob_dep_str.strip().split(",")
-        for a_dep in rob_deps:
-            # if the string is empty, split(',') returns 1 item: ''
-            # if the string is ",4", split(',') returns 2 items: '', '4'
-            # long('') gives error, so check if the item is non-empty
-            if a_dep:
-                dep_record.rob_dep.append(int(a_dep))
-
-        reg_deps = reg_dep_str.split(",")
-        for a_dep in reg_deps:
-            if a_dep:
-                dep_record.reg_dep.append(int(a_dep))
+        # if the string is empty, split(',') returns 1 item: ''
+        # if the string is ",4", split(',') returns 2 items: '', '4'
+        # long('') gives error, so check if the item is non-empty
+        rob_deps = [int(d) for d in rob_dep_str.strip().split(",") if d]
+        reg_deps = [int(d) for d in reg_dep_str.split(",") if d]
+        num_records += 1
 
+        if batch is not None:
+            batch.append(
+                seq_num,
+                pc,
+                weight,
+                record_type,
+                mem,
+                comp_delay,
+                rob_deps,
+                reg_deps,
+            )
+            if len(batch) == BATCH_SIZE:
+                batch.write(proto_out)
+            continue
+
+        dep_record = DepRecord()
+        dep_record.seq_num = seq_num
+        dep_record.pc = pc
+        dep_record.weight = weight
+        dep_record.type = record_type
+        if mem is not None:
+            dep_record.p_addr, dep_record.size, dep_record.flags = mem
+        dep_record.comp_delay = comp_delay
+        dep_record.rob_dep.extend(rob_deps)
+        dep_record.reg_dep.extend(reg_deps)
         protolib.encodeMessage(proto_out, dep_record)
-        num_records += 1
+
+    if batch is not None and len(batch):
+        batch.write(proto_out)
 
     print("Converted", num_records, "records.")
     # We're done
@@ -49,9 +49,24 @@
 # then writes 64 bytes to address 232123 at tick 500000.
 #
 # This script can of course also be used as a template to convert
-# other trace formats into the gem5 protobuf format
+# other trace formats into the gem5 protobuf format. If the output file
+# name ends with .gz, the trace is gzipped, as the traces written by gem5.
+#
+# If NumPy is available, the trace is read in large blocks and encoded in
+# bulk by protolib.encodePacketBatches, which can also be used directly to
+# generate traces from NumPy arrays, e.g.:
+#
+#   proto_out = protolib.openFileWr("trace.gz")
+#   proto_out.write(b"gem5")
+#   protolib.encodeMessage(proto_out, header)
+#   protolib.encodePacketBatches(proto_out, batches)
+#   proto_out.close()
+#
+# where batches is an iterable (e.g., a generator) of dictionaries of tick,
+# cmd, addr and size arrays.
 
 import sys
+import warnings
 
 import protolib
 
@@ -87,26 +102,68 @@ except:
         exit(-1)
 
 
+def readPacketBatches(ascii_in, block_size=16 * 1024 * 1024):
+    """
+    Read the ASCII trace in blocks of about block_size bytes, yielding the
+    packets of each as a dictionary of tick, cmd, addr and size arrays.
+    """
+    import numpy as np
+
+    # Parse a block as a single list of comma separated integers, turning
+    # the commands into their values: ReadReq is 1 and WriteReq is 4 in
+    # src/mem/packet.hh Command enum.
+    table = bytes.maketrans(b"rw\n", b"14,")
+    rest = b""
+    while True:
+        data = ascii_in.read(block_size)
+        if not data:
+            data, rest = rest, b""
+        else:
+            data, newline, tail = (rest + data).rpartition(b"\n")
+            if not newline:
+                rest = tail
+                continue
+            rest = tail
+        data = data.strip()
+        if not data:
+            return
+        lines = data.count(b"\n") + 1
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                values = np.fromstring(
+                    data.translate(table), dtype=np.uint64, sep=","
+                )
+        except (DeprecationWarning, ValueError):
+            values = []
+        if len(values) != 4 * lines:
+            print("Malformed line in block:", data[:80], "...")
+            exit(-1)
+        values = values.reshape(lines, 4)
+        yield {
+            "cmd": values[:, 0],
+            "addr": values[:, 1],
+            "size": values[:, 2],
+            "tick": values[:, 3],
+        }
+
+
 def main():
     if len(sys.argv) != 3:
         print("Usage: ", sys.argv[0], " <ASCII input> <protobuf output>")
         exit(-1)
 
     try:
-        ascii_in = open(sys.argv[1])
+        ascii_in = open(sys.argv[1], "rb")
     except OSError:
         print("Failed to open ", sys.argv[1], " for reading")
         exit(-1)
 
-    try:
-        proto_out = open(sys.argv[2], "wb")
-    except OSError:
-        print("Failed to open ", sys.argv[2], " for writing")
-        exit(-1)
+    proto_out = protolib.openFileWr(sys.argv[2])
 
     # Write the magic number in 4-byte Little Endian, similar to what
     # is done in src/proto/protoio.cc
-    proto_out.write("gem5")
+    proto_out.write(b"gem5")
 
     # Add the packet header
     header = packet_pb2.PacketHeader()
@@ -115,17 +172,26 @@ def main():
     header.tick_freq = 1000000000000
     protolib.encodeMessage(proto_out, header)
 
-    # For each line in the ASCII trace, create a packet message and
-    # write it to the encoded output
-    for line in ascii_in:
-        cmd, addr, size, tick = line.split(",")
-        packet = packet_pb2.Packet()
-        packet.tick = int(tick)
-        # ReadReq is 1 and WriteReq is 4 in src/mem/packet.hh Command enum
-        packet.cmd = 1 if cmd == "r" else 4
-        packet.addr = int(addr)
-        packet.size = int(size)
-        protolib.encodeMessage(proto_out, packet)
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+
+    if numpy is not None:
+        protolib.encodePacketBatches(proto_out, readPacketBatches(ascii_in))
+    else:
+        # For each line in the ASCII trace, create a packet message and
+        # write it to the encoded output
+        for line in ascii_in:
+            cmd, addr, size, tick = line.decode().split(",")
+            packet = packet_pb2.Packet()
+            packet.tick = int(tick)
+            # ReadReq is 1 and WriteReq is 4 in src/mem/packet.hh Command
+            # enum
+            packet.cmd = 1 if cmd == "r" else 4
+            packet.addr = int(addr)
+            packet.size = int(size)
+            protolib.encodeMessage(proto_out, packet)
 
     # We're done
     ascii_in.close()
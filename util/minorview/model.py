@@ -33,6 +33,9 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import array
+import bisect
+import collections
 import os
 import re
 from time import time as wall_time
@@ -50,6 +53,9 @@ id_parts = "TSPLFE"
 all_ids = set(id_parts)
 no_ids = set()
 
+# An event file line: time, unit name, line type (if any) and the rest
+match_line_re = re.compile(r"^\s*(\d+):\s*([\w\.]+):\s*(Minor\w+:)?\s*(.*)$")
+
 
 class BlobDataSelect:
     """Represents which data is displayed for Ided object"""
@@ -627,39 +633,31 @@ class BlobEvent:
         return sorted(ret)
 
 
-class BlobModel:
-    """Model bringing together blob definitions and parsed events"""
+class EventWindow:
+    """Events, instructions and lines parsed from one chunk of an event
+    file.  A window holds, for each unit, the last event of the unit from
+    before the chunk followed by the unit's events in the chunk"""
 
-    def __init__(self, unitNamePrefix=""):
-        self.blobs = []
-        self.unitNameToBlobs = {}
+    def __init__(self, units):
         self.unitEvents = {}
-        self.clear_events()
-        self.picSize = Point(20, 10)
-        self.lastTime = 0
-        self.unitNamePrefix = unitNamePrefix
-
-    def clear_events(self):
-        """Drop all events and times"""
-        self.lastTime = 0
-        self.times = []
+        for unit in units:
+            self.unitEvents[unit] = []
         self.insts = {}
         self.lines = {}
         self.numEvents = 0
 
-        for unit, events in self.unitEvents.items():
-            self.unitEvents[unit] = []
-
-    def add_blob(self, blob):
-        """Add a parsed blob to the model"""
-        self.blobs.append(blob)
-        if blob.unit not in self.unitNameToBlobs:
-            self.unitNameToBlobs[blob.unit] = []
-
-        self.unitNameToBlobs[blob.unit].append(blob)
+    def add_unit_event(self, event):
+        """Add a single event to the window.  This must be an event at a
+        time >= the current maximum time"""
+        if event.unit in self.unitEvents:
+            events = self.unitEvents[event.unit]
+            if len(events) > 0 and events[len(events) - 1].time > event.time:
+                print("Bad event ordering")
+            events.append(event)
+        self.numEvents += 1
 
     def add_inst(self, inst):
-        """Add a MinorInst instruction definition to the model"""
+        """Add a MinorInst instruction definition to the window"""
         # Is this a non micro-op instruction.  Microops (usually) get their
         #   fetchSeqNum == 0 varient stored first
         macroop_key = (inst.id.fetchSeqNum, 0)
@@ -683,41 +681,136 @@ class BlobModel:
             return None
 
     def add_line(self, line):
-        """Add a MinorLine line to the model"""
+        """Add a MinorLine line to the window"""
         self.lines[line.id.lineSeqNum] = line
 
-    def add_unit_event(self, event):
-        """Add a single event to the model.  This must be an event at a
-        time >= the current maximum time"""
-        if event.unit in self.unitEvents:
-            events = self.unitEvents[event.unit]
-            if len(events) > 0 and events[len(events) - 1].time > event.time:
-                print("Bad event ordering")
-            events.append(event)
-        self.numEvents += 1
-        self.lastTime = max(self.lastTime, event.time)
-
-    def extract_times(self):
-        """Extract a list of all the times from the seen events.  Call after
-        reading events to give a safe index list to use for time indices"""
-        times = {}
-        for unitEvents in self.unitEvents.values():
-            for event in unitEvents:
-                times[event.time] = 1
-        self.times = list(times.keys())
-        self.times.sort()
-
     def find_line(self, id):
         """Find a line by id"""
-        key = id.lineSeqNum
-        return self.lines.get(key, None)
+        return self.lines.get(id.lineSeqNum, None)
+
+
+class EventChunk:
+    """Index entry for a chunk of an event file: its byte range, its first
+    time and what is needed to parse it without parsing the chunks
+    before it"""
+
+    def __init__(self, offset, time):
+        # Byte range of the chunk in the event file
+        self.offset = offset
+        self.endOffset = offset
+        # Time of the first event in the chunk
+        self.time = time
+        # For each unit with events before the chunk, the offset of the
+        #   unit's last MinorTrace line (or None) and of the first line
+        #   at the time of its last event
+        self.carry = {}
+        # Ranges of fetchSeqNums of the MinorInsts and lineSeqNums of the
+        #   MinorLines in the chunk
+        self.instRange = None
+        self.lineRange = None
+
+
+def extend_range(range, value):
+    """Extend a (min, max) range, or None, to include value"""
+    if range is None:
+        return (value, value)
+    else:
+        return (min(range[0], value), max(range[1], value))
+
+
+class BlobModel:
+    """Model bringing together blob definitions and parsed events.  Events
+    are not all loaded at once:  load_events builds an index of the event
+    file and the events are parsed a window (a chunk of the file) at a
+    time when they are needed, the most recently used windows being
+    kept"""
+
+    def __init__(self, unitNamePrefix="", windowTimes=500, maxWindows=16):
+        self.blobs = []
+        self.unitNameToBlobs = {}
+        self.unitEvents = {}
+        self.clear_events()
+        self.picSize = Point(20, 10)
+        self.lastTime = 0
+        self.unitNamePrefix = unitNamePrefix
+        # Number of event times in each chunk of the event file
+        self.windowTimes = windowTimes
+        # Number of parsed windows to keep
+        self.maxWindows = maxWindows
+
+    def clear_events(self):
+        """Drop all events and times"""
+        self.lastTime = 0
+        self.times = array.array("q")
+        self.numEvents = 0
+        self.eventFile = None
+        self.chunks = []
+        self.chunkTimes = []
+        self.windows = collections.OrderedDict()
+
+    def add_blob(self, blob):
+        """Add a parsed blob to the model"""
+        self.blobs.append(blob)
+        if blob.unit not in self.unitNameToBlobs:
+            self.unitNameToBlobs[blob.unit] = []
+
+        self.unitNameToBlobs[blob.unit].append(blob)
+
+    def find_inst(self, id):
+        """Find an instruction either as a microop or macroop.  The
+        microops of an instruction can be split between chunks so, as when
+        the whole file is parsed, an exact match in any chunk is preferred
+        over the macroop"""
+        macroop_key = (id.fetchSeqNum, 0)
+        full_key = (id.fetchSeqNum, id.execSeqNum)
+
+        windows = [
+            self.get_window(index)
+            for index, chunk in enumerate(self.chunks)
+            if chunk.instRange is not None
+            and chunk.instRange[0] <= id.fetchSeqNum <= chunk.instRange[1]
+        ]
+
+        # Later definitions replace earlier ones.  When execSeqNum is 0,
+        #   full_key can also hold the first microop of the window
+        for window in reversed(windows):
+            inst = window.insts.get(full_key, None)
+            if inst is not None and inst.id.execSeqNum == id.execSeqNum:
+                return inst
+
+        # The macroop is the last non-microop instruction or, failing
+        #   that, the first microop
+        macroops = [
+            window.insts[macroop_key]
+            for window in windows
+            if macroop_key in window.insts
+        ]
+        for inst in reversed(macroops):
+            if inst.id.execSeqNum == 0:
+                return inst
+        if len(macroops) > 0:
+            return macroops[0]
+        return None
+
+    def find_line(self, id):
+        """Find a line by id.  Later definitions replace earlier ones"""
+        for index in reversed(range(len(self.chunks))):
+            lineRange = self.chunks[index].lineRange
+            if (
+                lineRange is not None
+                and lineRange[0] <= id.lineSeqNum <= lineRange[1]
+            ):
+                line = self.get_window(index).find_line(id)
+                if line is not None:
+                    return line
+        return None
 
     def find_event_bisection(
         self, unit, time, events, lower_index, upper_index
     ):
         """Find an event by binary search on time indices"""
         while lower_index <= upper_index:
-            pivot = (upper_index + lower_index) / 2
+            pivot = (upper_index + lower_index) // 2
             pivotEvent = events[pivot]
             event_equal = pivotEvent.time == time or (
                 pivotEvent.time < time
@@ -741,9 +834,12 @@ class BlobModel:
         return None
 
     def find_unit_event_by_time(self, unit, time):
-        """Find the last event for the given unit at time <= time"""
-        if unit in self.unitEvents:
-            events = self.unitEvents[unit]
+        """Find the last event for the given unit at time <= time.  Only
+        the window of the chunk holding time is searched as it starts
+        with the unit's last event from before the chunk"""
+        if unit in self.unitEvents and len(self.chunks) != 0:
+            index = max(0, bisect.bisect_right(self.chunkTimes, time) - 1)
+            events = self.get_window(index).unitEvents[unit]
             ret = self.find_event_bisection(
                 unit, time, events, 0, len(events) - 1
             )
@@ -755,14 +851,10 @@ class BlobModel:
     def find_time_index(self, time):
         """Find a time index close to the given time (where
         times[return] <= time and times[return+1] > time"""
-        ret = 0
-        lastIndex = len(self.times) - 1
-        while ret < lastIndex and self.times[ret + 1] <= time:
-            ret += 1
-        return ret
+        return max(0, bisect.bisect_right(self.times, time) - 1)
 
-    def add_minor_inst(self, rest):
-        """Parse and add a MinorInst line to the model"""
+    def parse_minor_inst(self, rest):
+        """Parse a MinorInst line, returning the instruction (or None)"""
         pairs = parse.parse_pairs(rest)
         other_pairs = dict(pairs)
 
@@ -778,17 +870,15 @@ class BlobModel:
             # Collapse unnecessary spaces in disassembly
             disassembly = re.sub("  *", " ", re.sub("^ *", "", pairs["inst"]))
 
-            inst = Inst(id, disassembly, addr, other_pairs)
-            self.add_inst(inst)
+            return Inst(id, disassembly, addr, other_pairs)
         elif "fault" in other_pairs:
             del other_pairs["fault"]
 
-            inst = InstFault(id, pairs["fault"], addr, other_pairs)
-
-            self.add_inst(inst)
+            return InstFault(id, pairs["fault"], addr, other_pairs)
+        return None
 
-    def add_minor_line(self, rest):
-        """Parse and add a MinorLine line to the model"""
+    def parse_minor_line(self, rest):
+        """Parse a MinorLine line, returning the line (or None)"""
         pairs = parse.parse_pairs(rest)
         other_pairs = dict(pairs)
 
@@ -804,46 +894,152 @@ class BlobModel:
             paddr = int(pairs["paddr"], 0)
             size = int(pairs["size"], 0)
 
-            self.add_line(Line(id, vaddr, paddr, size, other_pairs))
+            return Line(id, vaddr, paddr, size, other_pairs)
         elif "fault" in other_pairs:
             del other_pairs["fault"]
 
-            self.add_line(LineFault(id, pairs["fault"], vaddr, other_pairs))
+            return LineFault(id, pairs["fault"], vaddr, other_pairs)
+        return None
 
-    def load_events(self, file, startTime=0, endTime=None):
-        """Load an event file and add everything to this model"""
+    def match_line(self, l):
+        """Match an event file line, returning its time, unit (without the
+        unit name prefix), line type and the rest of the line, or None"""
+        match = match_line_re.match(l)
+        if match is None:
+            return None
+        event_time, unit, line_type, rest = match.groups()
+        unit = re.sub("^" + self.unitNamePrefix + r"\.?(.*)$", "\\1", unit)
+        return int(event_time), unit, line_type, rest
+
+    def make_event(self, unit, time, rest):
+        """Make an event from the rest of a MinorTrace line"""
+        event = BlobEvent(unit, time, {})
+        pairs = parse.parse_pairs(rest)
+        event.pairs = pairs
+
+        # Try to decode the colour data for this event
+        blobs = self.unitNameToBlobs.get(unit, [])
+        for blob in blobs:
+            if blob.visualDecoder is not None:
+                event.visuals[blob.picChar] = blob.visualDecoder(pairs)
+        return event
+
+    def get_window(self, index):
+        """Get the window of the given chunk, parsing it if it is not one
+        of the most recently used windows"""
+        if index in self.windows:
+            self.windows.move_to_end(index)
+        else:
+            self.windows[index] = self.load_window(self.chunks[index])
+            while len(self.windows) > self.maxWindows:
+                self.windows.popitem(last=False)
+        return self.windows[index]
+
+    def load_window(self, chunk):
+        """Parse the events, instructions and lines of a chunk of the
+        event file"""
+        window = EventWindow(self.unitEvents.keys())
+        last_time_lines = {}
+
+        with open(self.eventFile, "rb") as f:
+            # Start each unit with its last event before the chunk
+            for unit, (traceOffset, timeOffset) in chunk.carry.items():
+                event = BlobEvent(unit, 0, {})
+                if traceOffset is not None:
+                    f.seek(traceOffset)
+                    time, _, _, rest = self.match_line(f.readline().decode())
+                    event = self.make_event(unit, time, rest)
+                    last_time_lines[unit] = rest
+
+                # The event (or a copy of the event) is at the time of the
+                #   unit's last event with that time's comments
+                f.seek(timeOffset)
+                l = f.readline().decode()
+                event.time = self.match_line(l)[0]
+                while l:
+                    match = self.match_line(l)
+                    if match is not None:
+                        event_time, comment_unit, line_type, rest = match
+                        if event_time != event.time:
+                            break
+                        if line_type is None and comment_unit == unit:
+                            event.comments.append(rest)
+                    l = f.readline().decode()
+                window.add_unit_event(event)
+
+            f.seek(chunk.offset)
+            lines = f.read(chunk.endOffset - chunk.offset).decode()
 
         def update_comments(comments, time):
             # Add a list of comments to an existing event, if there is one at
             #   the given time, or create a new, correctly-timed, event from
             #   the last event and attach the comments to that
             for commentUnit, commentRest in comments:
-                event = self.find_unit_event_by_time(commentUnit, time)
+                events = window.unitEvents.get(commentUnit, [])
+                event = self.find_event_bisection(
+                    commentUnit, time, events, 0, len(events) - 1
+                )
                 # Find an event to which this comment can be attached
                 if event is None:
                     # No older event, make a new empty one
                     event = BlobEvent(commentUnit, time, {})
-                    self.add_unit_event(event)
+                    window.add_unit_event(event)
                 elif event.time != time:
                     # Copy the old event and make a new one with the right
                     #   time and comment
                     newEvent = BlobEvent(commentUnit, time, event.pairs)
                     newEvent.visuals = dict(event.visuals)
                     event = newEvent
-                    self.add_unit_event(event)
+                    window.add_unit_event(event)
                 event.comments.append(commentRest)
 
-        self.clear_events()
-
         # A negative time will *always* be different from an event time
         time = -1
-        time_events = {}
-        last_time_lines = {}
-        minor_trace_line_count = 0
         comments = []
 
-        default_colour = [[colours.unknownColour]]
-        next_progress_print_event_count = 1000
+        # Parse each line of the chunk, accumulating comments to be
+        #   attached to MinorTrace events when the time changes
+        for l in lines.splitlines():
+            match = self.match_line(l)
+            if match is None:
+                continue
+            event_time, unit, line_type, rest = match
+
+            # When the time changes, resolve comments
+            if event_time != time:
+                update_comments(comments, time)
+                comments = []
+                time = event_time
+
+            if line_type is None:
+                # Treat this line as just a 'comment'
+                comments.append((unit, rest))
+            elif line_type == "MinorTrace:":
+                # Only insert this event if it's not the same as
+                #   the last event we saw for this unit
+                if last_time_lines.get(unit, None) != rest:
+                    window.add_unit_event(
+                        self.make_event(unit, event_time, rest)
+                    )
+                    last_time_lines[unit] = rest
+            elif line_type == "MinorInst:":
+                inst = self.parse_minor_inst(rest)
+                if inst is not None:
+                    window.add_inst(inst)
+            elif line_type == "MinorLine:":
+                line = self.parse_minor_line(rest)
+                if line is not None:
+                    window.add_line(line)
+
+        update_comments(comments, time)
+        return window
+
+    def load_events(self, file, startTime=0, endTime=None):
+        """Index an event file for this model.  The file is read once to
+        find the event times and to split it into chunks, the events of
+        which are parsed when they are first needed"""
+
+        self.clear_events()
 
         if not os.access(file, os.R_OK):
             print("Can't open file", file)
@@ -851,49 +1047,91 @@ class BlobModel:
         else:
             print("Opening file", file)
 
-        f = open(file)
+        self.eventFile = file
+        f = open(file, "rb")
 
         start_wall_time = wall_time()
 
         # Skip leading events
+        offset = 0
         still_skipping = True
         l = f.readline()
         while l and still_skipping:
-            match = re.match(r"^\s*(\d+):", l)
+            match = re.match(rb"^\s*(\d+):", l)
             if match is not None:
                 event_time = match.groups()
                 if int(event_time[0]) >= startTime:
                     still_skipping = False
                 else:
+                    offset += len(l)
                     l = f.readline()
             else:
+                offset += len(l)
                 l = f.readline()
 
-        match_line_re = re.compile(
-            r"^\s*(\d+):\s*([\w\.]+):\s*(Minor\w+:)?\s*(.*)$"
-        )
+        # A negative time will *always* be different from an event time
+        time = -1
+        time_offset = offset
+        last_time_lines = {}
+        minor_trace_line_count = 0
+        comments = []
+        next_progress_print_event_count = 1000
 
-        # Parse each line of the events file, accumulating comments to be
-        #   attached to MinorTrace events when the time changes
+        # For each unit, the offsets of its last MinorTrace line and of
+        #   the first line at the time of its last event
+        last_trace_offsets = {}
+        last_time_offsets = {}
+
+        chunk = None
+        chunk_start_times = 0
+
+        def add_time(unit, time, time_offset):
+            # Note that the unit has an event at the given time
+            self.numEvents += 1
+            self.lastTime = max(self.lastTime, time)
+            if unit in self.unitEvents:
+                last_time_offsets[unit] = time_offset
+                if len(self.times) == 0 or self.times[-1] < time:
+                    self.times.append(time)
+
+        def update_comments(comments, time, time_offset):
+            # Comments at a time give their units an event at that time
+            for commentUnit, commentRest in comments:
+                add_time(commentUnit, time, time_offset)
+
+        # Read each line of the events file, noting the times of the
+        #   events and starting a new chunk once a chunk has enough times
         reached_end_time = False
         while not reached_end_time and l:
-            match = match_line_re.match(l)
+            match = self.match_line(l.decode())
             if match is not None:
-                event_time, unit, line_type, rest = match.groups()
-                event_time = int(event_time)
-
-                unit = re.sub(
-                    "^" + self.unitNamePrefix + r"\.?(.*)$", "\\1", unit
-                )
+                event_time, unit, line_type, rest = match
 
                 # When the time changes, resolve comments
                 if event_time != time:
                     if self.numEvents > next_progress_print_event_count:
-                        print("Parsed to time: %d" % event_time)
+                        print("Indexed to time: %d" % event_time)
                         next_progress_print_event_count = self.numEvents + 1000
-                    update_comments(comments, time)
+                    update_comments(comments, time, time_offset)
                     comments = []
                     time = event_time
+                    time_offset = offset
+
+                    if (
+                        chunk is None
+                        or len(self.times) - chunk_start_times
+                        >= self.windowTimes
+                    ):
+                        if chunk is not None:
+                            chunk.endOffset = offset
+                        chunk = EventChunk(offset, event_time)
+                        for carryUnit, timeOffset in last_time_offsets.items():
+                            chunk.carry[carryUnit] = (
+                                last_trace_offsets.get(carryUnit, None),
+                                timeOffset,
+                            )
+                        self.chunks.append(chunk)
+                        chunk_start_times = len(self.times)
 
                 if line_type is None:
                     # Treat this line as just a 'comment'
@@ -901,35 +1139,33 @@ class BlobModel:
                 elif line_type == "MinorTrace:":
                     minor_trace_line_count += 1
 
-                    # Only insert this event if it's not the same as
+                    # Only count this event if it's not the same as
                     #   the last event we saw for this unit
                     if last_time_lines.get(unit, None) != rest:
-                        event = BlobEvent(unit, event_time, {})
-                        pairs = parse.parse_pairs(rest)
-                        event.pairs = pairs
-
-                        # Try to decode the colour data for this event
-                        blobs = self.unitNameToBlobs.get(unit, [])
-                        for blob in blobs:
-                            if blob.visualDecoder is not None:
-                                event.visuals[
-                                    blob.picChar
-                                ] = blob.visualDecoder(pairs)
-
-                        self.add_unit_event(event)
+                        last_trace_offsets[unit] = offset
+                        add_time(unit, event_time, time_offset)
                         last_time_lines[unit] = rest
                 elif line_type == "MinorInst:":
-                    self.add_minor_inst(rest)
+                    id = Id().from_string(parse.parse_pairs(rest)["id"])
+                    chunk.instRange = extend_range(
+                        chunk.instRange, id.fetchSeqNum
+                    )
                 elif line_type == "MinorLine:":
-                    self.add_minor_line(rest)
+                    id = Id().from_string(parse.parse_pairs(rest)["id"])
+                    chunk.lineRange = extend_range(
+                        chunk.lineRange, id.lineSeqNum
+                    )
 
             if endTime is not None and time > endTime:
                 reached_end_time = True
 
+            offset += len(l)
             l = f.readline()
 
-        update_comments(comments, time)
-        self.extract_times()
+        update_comments(comments, time, time_offset)
+        if chunk is not None:
+            chunk.endOffset = offset
+        self.chunkTimes = [chunk.time for chunk in self.chunks]
         f.close()
 
         end_wall_time = wall_time()
@@ -939,8 +1175,10 @@ class BlobModel:
             minor_trace_line_count,
             "unique events:",
             self.numEvents,
+            "chunks:",
+            len(self.chunks),
         )
-        print("Time to parse:", end_wall_time - start_wall_time)
+        print("Time to index:", end_wall_time - start_wall_time)
 
     def add_blob_picture(self, offset, pic, nameDict):
         """Add a parsed ASCII-art pipeline markup to the model"""
@@ -38,18 +38,22 @@
 # Pipeline activity viewer for the O3 CPU model.
 
 import argparse
-import copy
+import heapq
+import itertools
+import json
 import os
 import sys
 
 # Temporary storage for instructions. The queue is filled in out-of-order
-# until it reaches 'max_threshold' number of instructions. It is then
-# sorted out and instructions are printed out until their number drops to
-# 'min_threshold'.
+# until it reaches 'max_threshold' number of instructions. Instructions are
+# then printed out in order until their number drops to 'min_threshold'.
+# The queue is a heap ordered by sequence number, so its size, rather than
+# the length of the trace, bounds the work and memory needed to reorder.
 # It is assumed that the instructions are not out of order for more then
 # 'min_threshold' places - otherwise they will appear out of order.
 insts = {
     "queue": [],  # Instructions to print.
+    "count": itertools.count(),  # Keeps the order of equal seq. numbers.
     "max_threshold": 2000,  # Instructions are sorted out and printed when
     # their number reaches this threshold.
     "min_threshold": 1000,  # Printing stops when this number is reached.
@@ -65,6 +69,85 @@ insts = {
     "only_committed": 0,  # Set if only committed instructions are printed.
 }
 
+# The version of the format of the trace index files.
+INDEX_VERSION = 1
+
+
+def build_index(tracefile, interval):
+    """
+    Scan the trace and split it into blocks of interval instructions. For
+    each block, starting at a fetch, record its byte offset in the trace
+    and the largest tick and instruction seq. number in it.
+    """
+    blocks = [[0, 0, 0]]
+    fetches = 0
+    offset = 0
+    with open(tracefile, "rb") as trace:
+        for line in trace:
+            if line.startswith(b"O3PipeView:"):
+                fields = line.split(b":", 6)
+                if fields[1] == b"fetch":
+                    if fetches and fetches % interval == 0:
+                        blocks.append([offset, 0, 0])
+                    fetches += 1
+                    blocks[-1][2] = max(blocks[-1][2], int(fields[5]))
+                blocks[-1][1] = max(blocks[-1][1], int(fields[2]))
+            offset += len(line)
+    return blocks
+
+
+def load_index(tracefile, interval, index_file=None):
+    """
+    Load the index of the trace from its sidecar file (by default, the
+    trace file name followed by .index), building and saving it if it is
+    missing or out of date.
+    """
+    if index_file is None:
+        index_file = tracefile + ".index"
+    stat = os.stat(tracefile)
+    key = {
+        "version": INDEX_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "interval": interval,
+    }
+    try:
+        with open(index_file) as f:
+            index = json.load(f)
+        if all(index.get(name) == value for name, value in key.items()):
+            return index["blocks"]
+    except (OSError, ValueError):
+        pass
+
+    print("Indexing trace... ", end=" ", flush=True)
+    index = dict(key, blocks=build_index(tracefile, interval))
+    try:
+        with open(index_file + ".tmp", "w") as f:
+            json.dump(index, f)
+        os.replace(index_file + ".tmp", index_file)
+    except OSError as e:
+        print(f"could not save the index ({e})...", end=" ")
+    return index["blocks"]
+
+
+def seek_trace(trace, blocks, start_tick, start_sn):
+    """
+    Move to the first block of the trace which may hold the start of the
+    range, i.e., the first block with a tick (or seq. number) which is at
+    least start_tick (or start_sn). Return False if there is none.
+    """
+    if start_tick != 0:
+        column, start = 1, start_tick
+    elif start_sn != 0:
+        column, start = 2, start_sn
+    else:
+        return True
+    for block in blocks:
+        if block[column] >= start:
+            trace.seek(block[0])
+            return True
+    return False
+
 
 def process_trace(
     trace,
@@ -79,6 +162,7 @@ def process_trace(
     stop_tick,
     start_sn,
     stop_sn,
+    index=None,
 ):
     global insts
 
@@ -91,6 +175,12 @@ def process_trace(
     line = None
     fields = None
 
+    # Skip the blocks of the trace before the start of the range
+    if index is not None and not seek_trace(
+        trace, index, start_tick, start_sn
+    ):
+        return
+
     # Skip lines up to the starting tick
     if start_tick != 0:
         while True:
@@ -213,8 +303,9 @@ def queue_inst(
     outfile, inst, cycle_time, width, color, timestamps, store_completions
 ):
     global insts
-    l_copy = copy.deepcopy(inst)
-    insts["queue"].append(l_copy)
+    heapq.heappush(
+        insts["queue"], (inst["sn"], next(insts["count"]), dict(inst))
+    )
     if len(insts["queue"]) > insts["max_threshold"]:
         print_insts(
             outfile,
@@ -238,10 +329,9 @@ def print_insts(
     lower_threshold,
 ):
     global insts
-    # sort the list of insts by sequence numbers
-    insts["queue"].sort(key=lambda inst: inst["sn"])
+    # take the insts in the order of their sequence numbers
     while len(insts["queue"]) > lower_threshold:
-        print_item = insts["queue"].pop(0)
+        print_item = heapq.heappop(insts["queue"])[2]
         # As the instructions are processed out of order the main loop starts
         # earlier then specified by start_sn/tick and finishes later then what
         # is defined in stop_sn/tick.
@@ -498,6 +588,18 @@ def main():
         default=False,
         help="additionally display store completion ticks",
     )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        default=False,
+        help="scan the trace from the start rather than use an index",
+    )
+    parser.add_argument(
+        "--index-interval",
+        type=int,
+        default=10000,
+        help="instructions per block of the trace index",
+    )
     parser.add_argument("tracefile")
 
     args = parser.parse_args()
@@ -509,6 +611,13 @@ def main():
     if not inst_range:
         parser.error("invalid range")
         sys.exit(1)
+    if args.index_interval <= 0:
+        parser.error("the index interval must be positive")
+    # A trace index, saved next to the trace, is used to go straight to
+    # the start of the range
+    index = None
+    if not args.no_index and (tick_range[0] != 0 or inst_range[0] != 0):
+        index = load_index(args.tracefile, args.index_interval)
     # Process trace
     print("Processing trace... ", end=" ")
     with open(args.tracefile) as trace:
@@ -523,6 +632,7 @@ def main():
                 args.only_committed,
                 args.store_completions,
                 *(tick_range + inst_range),
+                index=index,
             )
     print("done!")
 
@@ -38,11 +38,28 @@ build/ALL/gem5.opt util/obtain-resource.py <resource_id> [-p <path>] [-q]
 # This will download the resource with id `arm-hello64-static` to the
 # "arm-hello" in the CWD.
 ```
+
+Several resources can be obtained at once, concurrently, into the gem5 local
+cache of resources. This is useful to warm the cache before running many
+simulations (e.g., with MultiSim).
+
+```sh
+build/ALL/gem5.opt util/obtain-resource.py <resource_id>... \
+    [--config <config_script>]... [-j <jobs>] [-q]
+# Example:
+# `build/ALL/gem5.opt util/obtain-resource.py --config my-sweep.py -j 8`
+# This will download the resources obtained by `my-sweep.py`, eight at a
+# time.
+```
 """
 
 if __name__ == "__m5_main__":
     import argparse
 
+    from gem5.resources.prefetch import (
+        find_resources_in_config,
+        prefetch_resources,
+    )
     from gem5.resources.resource import obtain_resource
 
     parser = argparse.ArgumentParser()
@@ -50,7 +67,27 @@ if __name__ == "__m5_main__":
     parser.add_argument(
         "id",
         type=str,
-        help="The resource id to download.",
+        nargs="*",
+        help="The resource id(s) to download.",
+    )
+
+    parser.add_argument(
+        "--config",
+        type=str,
+        action="append",
+        default=[],
+        help="A config script whose resources are to be downloaded. Only "
+        "resources obtained with a literal resource id are found. May be "
+        "given more than once.",
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=4,
+        help="The number of resources to download at once, when downloading "
+        "more than one resource.",
     )
 
     parser.add_argument(
@@ -73,8 +110,28 @@ if __name__ == "__m5_main__":
 
     args = parser.parse_args()
 
+    if len(args.id) != 1 or args.config:
+        if args.path:
+            parser.error("-p/--path can only be used with a single resource.")
+
+        resources = list(args.id)
+        for config in args.config:
+            resources.extend(find_resources_in_config(config))
+        if not resources:
+            parser.error("No resources to download.")
+
+        local_paths = prefetch_resources(
+            resources, max_workers=args.jobs, quiet=args.quiet
+        )
+
+        if not args.quiet:
+            for id, local_path in local_paths.items():
+                print(f"Resource '{id}' at: '{local_path}'")
+
+        exit(0)
+
     resource = obtain_resource(
-        resource_id=args.id,
+        resource_id=args.id[0],
         quiet=args.quiet,
         to_path=args.path,
     )
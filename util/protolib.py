@@ -69,7 +69,17 @@
 # types of proto objects can use the same function to decode a single message
 
 import gzip
+import os
 import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+# The number of bytes read from a file at once by the bulk decoders.
+_BLOCK_SIZE = 16 * 1024 * 1024
+
+# The number of bytes compressed at once, as a separate gzip member, when
+# writing a gzipped file with openFileWr.
+_GZIP_BLOCK_SIZE = 4 * 1024 * 1024
 
 
 def openFileRd(in_file):
@@ -144,6 +154,216 @@ def decodeMessage(in_file, message):
         return False
 
 
+def _frameMessages(buf, pos):
+    """
+    Find the length-prefixed messages in a buffer, starting at pos. Return
+    the start and end offsets of each complete message, and the offset
+    following the last one (i.e., where the next, incomplete, message
+    starts). The end offset is None if a zero length, which marks the end
+    of the messages, was found.
+    """
+    starts = []
+    ends = []
+    end = len(buf)
+    while pos < end:
+        # Almost all messages are shorter than 128 bytes, in which case the
+        # length is a single byte.
+        size = buf[pos]
+        start = pos + 1
+        if size & 0x80:
+            size = 0
+            shift = 0
+            start = pos
+            while start < end and buf[start] & 0x80:
+                size |= (buf[start] & 0x7F) << shift
+                shift += 7
+                start += 1
+            if start == end:
+                break
+            size |= buf[start] << shift
+            start += 1
+        if size == 0:
+            return starts, ends, None
+        if start + size > end:
+            break
+        starts.append(start)
+        ends.append(start + size)
+        pos = start + size
+    return starts, ends, pos
+
+
+def decodeMessageBlocks(in_file, block_size=_BLOCK_SIZE):
+    """
+    Read the length-prefixed messages which follow in the file in blocks of
+    block_size bytes, rather than a byte at a time. For each block, yield
+    the block and the start and end offsets of the messages in it.
+    """
+    buf = b""
+    pos = 0
+    while True:
+        data = in_file.read(block_size)
+        if not data:
+            return
+        buf = buf[pos:] + data
+        starts, ends, pos = _frameMessages(buf, 0)
+        if starts:
+            yield buf, starts, ends
+        if pos is None:
+            return
+
+
+def decodeMessages(in_file, message, block_size=_BLOCK_SIZE):
+    """
+    Decode the messages which follow in the file into message, yielding it
+    after each one is decoded. This is equivalent to calling decodeMessage
+    until it returns False, but the file is read in large blocks.
+    """
+    for buf, starts, ends in decodeMessageBlocks(in_file, block_size):
+        view = memoryview(buf)
+        for start, end in zip(starts, ends):
+            message.ParseFromString(view[start:end])
+            yield message
+
+
+# The fields of the Packet message in src/proto/packet.proto, by field
+# number, and the NumPy type they are decoded to.
+_PACKET_FIELDS = {
+    1: ("tick", "<u8"),
+    2: ("cmd", "<u4"),
+    3: ("addr", "<u8"),
+    4: ("size", "<u4"),
+    5: ("flags", "<u4"),
+    6: ("pkt_id", "<u8"),
+    7: ("pc", "<u8"),
+}
+
+# The optional fields of the Packet message, which are 0 if absent. Whether
+# each is present is recorded in a "has_<field>" field.
+_PACKET_OPTIONAL_FIELDS = ("flags", "pkt_id", "pc")
+
+
+def packetDtype():
+    """
+    Return the NumPy structured type of the packets yielded by
+    decodePacketBatches.
+    """
+    import numpy as np
+
+    return np.dtype(
+        list(_PACKET_FIELDS.values())
+        + [("has_" + name, "?") for name in _PACKET_OPTIONAL_FIELDS]
+    )
+
+
+def _decodeVarints(data, end):
+    """
+    Decode all the varints in data[:end] at once, returning their values
+    and the offsets of their last bytes. data must extend at least 8 bytes
+    past end.
+    """
+    import numpy as np
+
+    u64 = np.uint64
+
+    # Each varint ends at a byte without the continuation bit.
+    last_bytes = np.flatnonzero(data[:end] < 0x80)
+    first_bytes = np.empty_like(last_bytes)
+    first_bytes[0] = 0
+    first_bytes[1:] = last_bytes[:-1] + 1
+    lengths = last_bytes - first_bytes + 1
+
+    # Read the (up to) first 8 bytes of each varint as a little endian
+    # 64-bit word, mask out the bytes of the following varints and the
+    # continuation bits, then squeeze the 7-bit groups together.
+    words = np.lib.stride_tricks.as_strided(
+        np.frombuffer(data, dtype="<u8", count=1), shape=(end,), strides=(1,)
+    )
+    values = words[first_bytes]
+    masks = np.array(
+        [(1 << (8 * n)) - 1 & 0x7F7F7F7F7F7F7F7F for n in range(9)],
+        dtype=u64,
+    )
+    mask = masks[np.minimum(lengths, 8)]
+    values &= mask
+    for bits, keep in (
+        (1, 0x007F007F007F007F),
+        (2, 0x00003FFF00003FFF),
+        (4, 0x000000000FFFFFFF),
+    ):
+        high = values & u64(~keep & 0xFFFFFFFFFFFFFFFF)
+        values &= u64(keep)
+        high >>= u64(bits)
+        values |= high
+
+    # The 9th and 10th bytes of the longest varints.
+    long = np.flatnonzero(lengths > 8)
+    ninth = data[first_bytes[long] + 8].astype(u64) & u64(0x7F)
+    values[long] |= ninth << u64(56)
+    long = long[lengths[long] > 9]
+    tenth = data[first_bytes[long] + 9].astype(u64) & u64(0x1)
+    values[long] |= tenth << u64(63)
+    return values, last_bytes
+
+
+def decodePacketBatches(in_file, block_size=_BLOCK_SIZE):
+    """
+    Decode the Packet messages which follow in the file (i.e., after the
+    PacketHeader) in bulk, yielding them in batches, as NumPy structured
+    arrays of packetDtype(). This needs NumPy, but not the generated
+    packet_pb2 module.
+
+    Each block of the file is decoded without parsing the messages one by
+    one: the length prefixes and all the fields of a Packet are varints, so
+    a block is a sequence of varints, which are decoded at once with array
+    operations.
+    """
+    import numpy as np
+
+    dtype = packetDtype()
+    for buf, starts, ends in decodeMessageBlocks(in_file, block_size):
+        end = ends[-1]
+        data = np.zeros(end + 8, dtype=np.uint8)
+        data[:end] = np.frombuffer(buf, dtype=np.uint8, count=end)
+        values, last_bytes = _decodeVarints(data, end)
+
+        # Separate the length prefixes from the fields, which are pairs of
+        # a tag and a value.
+        ends_prefix = np.zeros(end, dtype=bool)
+        ends_prefix[np.array(starts, dtype=np.int64) - 1] = True
+        is_prefix = ends_prefix[last_bytes]
+        message_of_varint = np.cumsum(is_prefix) - 1
+        fields = np.flatnonzero(~is_prefix)
+        if len(fields) % 2 or np.any(
+            message_of_varint[fields[0::2]] != message_of_varint[fields[1::2]]
+        ):
+            raise OSError("Truncated packet.")
+        message_of_field = message_of_varint[fields[0::2]]
+        tags = values[fields[0::2]]
+        field_values = values[fields[1::2]]
+        if np.any(tags & np.uint64(0x7)):
+            raise OSError("Packet field is not a varint.")
+        field_numbers = tags >> np.uint64(3)
+        # Unknown fields are gathered in column 0, which is ignored.
+        field_numbers[field_numbers >= len(_PACKET_FIELDS) + 1] = 0
+
+        # Scatter the fields into a table of messages by field number.
+        columns = len(_PACKET_FIELDS) + 1
+        cells = message_of_field * columns + field_numbers.astype(np.int64)
+        table = np.zeros(len(starts) * columns, dtype=np.uint64)
+        table[cells] = field_values
+        table = table.reshape(len(starts), columns)
+        present = np.zeros(len(starts) * columns, dtype=bool)
+        present[cells] = True
+        present = present.reshape(len(starts), columns)
+
+        packets = np.empty(len(starts), dtype=dtype)
+        for number, (name, _) in _PACKET_FIELDS.items():
+            packets[name] = table[:, number]
+            if name in _PACKET_OPTIONAL_FIELDS:
+                packets["has_" + name] = present[:, number]
+        yield packets
+
+
 def _EncodeVarint32(out_file, value):
     """
     The encoding of the Varint32 is copied from
@@ -166,3 +386,228 @@ def encodeMessage(out_file, message):
     out = message.SerializeToString()
     _EncodeVarint32(out_file, len(out))
     out_file.write(out)
+
+
+class _ParallelGzipFile:
+    """
+    A gzipped file which is written block by block, each block being
+    compressed on a pool of threads as a separate gzip member. A file
+    made of several gzip members is a valid gzip file, which gzip
+    decompresses as the concatenation of the members. gem5 reads traces
+    with protobuf's GzipInputStream (see ProtoInputStream in
+    src/proto/protoio.cc), which likewise starts inflating a new stream
+    whenever one ends, so it reads them the same way.
+    """
+
+    def __init__(self, out_file, threads, compresslevel):
+        self._file = open(out_file, "wb")
+        self._executor = ThreadPoolExecutor(max_workers=threads)
+        self._threads = threads
+        self._level = compresslevel
+        self._buffer = bytearray()
+        self._pending = []
+
+    def _compress(self, block):
+        compressor = zlib.compressobj(self._level, zlib.DEFLATED, 31)
+        return compressor.compress(block) + compressor.flush()
+
+    def _submit(self, block):
+        self._pending.append(self._executor.submit(self._compress, block))
+        # Bound the number of blocks in flight.
+        while len(self._pending) > 2 * self._threads:
+            self._file.write(self._pending.pop(0).result())
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= _GZIP_BLOCK_SIZE:
+            self._submit(bytes(self._buffer[:_GZIP_BLOCK_SIZE]))
+            del self._buffer[:_GZIP_BLOCK_SIZE]
+        return len(data)
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer = bytearray()
+        for future in self._pending:
+            self._file.write(future.result())
+        self._pending = []
+        self._executor.shutdown()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def openFileWr(out_file, threads=None, compresslevel=6):
+    """
+    This opens the file passed as argument for writing. If its name ends
+    with .gz, as for the traces written by gem5, it is gzipped, the
+    compression being done on threads threads (by default, one per CPU).
+    It returns the file handle.
+    """
+    try:
+        if out_file.endswith(".gz"):
+            if threads is None:
+                threads = os.cpu_count() or 1
+            return _ParallelGzipFile(out_file, threads, compresslevel)
+        return open(out_file, "wb")
+    except OSError:
+        print("Failed to open ", out_file, " for writing")
+        exit(-1)
+
+
+def _varintMatrix(values):
+    """
+    Encode all the varints in values, an array of unsigned 64-bit
+    integers, at once. Return the bytes of each varint as a row of a
+    matrix, padded to the length of the longest, and their lengths.
+    """
+    import numpy as np
+
+    u64 = np.uint64
+    top = int(values.max()) if len(values) else 0
+    width = max(1, (top.bit_length() + 6) // 7)
+    lengths = np.ones(len(values), dtype=np.int64)
+    for group in range(1, width):
+        lengths += values >= u64(1 << (7 * group))
+    # Each byte holds a 7-bit group, with the continuation bit set unless
+    # it is the last.
+    matrix = np.empty((len(values), width), dtype=np.uint8)
+    for group in range(width):
+        matrix[:, group] = values >> u64(7 * group)
+    matrix &= np.uint8(0x7F)
+    last = np.arange(width) >= lengths[:, None] - 1
+    matrix |= (~last).view(np.uint8) << np.uint8(7)
+    return matrix, lengths
+
+
+def _exclusiveCumsum(values):
+    import numpy as np
+
+    sums = np.zeros(len(values), dtype=np.int64)
+    np.cumsum(values[:-1], out=sums[1:])
+    return sums
+
+
+def _placeRuns(out, matrix, lengths, positions):
+    """
+    Copy the first lengths[i] bytes of each row i of matrix to
+    out[positions[i]:].
+    """
+    import numpy as np
+
+    data = matrix[np.arange(matrix.shape[1]) < lengths[:, None]]
+    index = np.repeat(positions - _exclusiveCumsum(lengths), lengths)
+    index += np.arange(len(data))
+    out[index] = data
+
+
+def encodeMessageColumns(columns, fields):
+    """
+    Encode messages given by columns, a dictionary of NumPy arrays (or a
+    NumPy structured array) with one element per message, in bulk,
+    returning the length-prefixed messages as bytes. fields maps the
+    field numbers of the messages to their names. Only messages whose
+    fields are all varints (i.e., integers, booleans and enums) can be
+    encoded.
+
+    The columns are named after the fields. Optional fields are only
+    encoded in the messages for which a has_<field> column, if any, is
+    true. Repeated fields are given as the concatenation of the elements
+    of all the messages, and the number of elements of each message in a
+    <field>_count column. Fields without a column are not encoded.
+    """
+    import numpy as np
+
+    names = getattr(getattr(columns, "dtype", None), "names", None)
+    if names is None:
+        names = columns.keys()
+    names = set(names)
+    fields = sorted(
+        (number, name)
+        for number, name in fields.items()
+        if name in names or name + "_count" in names
+    )
+    number, name = fields[0]
+    if name + "_count" in names:
+        name += "_count"
+    count = len(columns[name])
+    if not count:
+        return b""
+
+    # Encode each field, as a tag and a value, in all the messages which
+    # have it. Each element of a repeated field is encoded likewise.
+    encoded = []
+    sizes = np.zeros(count, dtype=np.int64)
+    for number, name in fields:
+        column = np.asarray(columns[name])
+        if name + "_count" in names:
+            counts = np.asarray(columns[name + "_count"], dtype=np.int64)
+            messages = np.repeat(np.arange(count), counts)
+        elif "has_" + name in names:
+            present = np.asarray(columns["has_" + name], dtype=bool)
+            messages = np.flatnonzero(present)
+            column = column[present]
+        else:
+            messages = None
+        tag, _ = _varintMatrix(np.array([number << 3], dtype=np.uint64))
+        values, lengths = _varintMatrix(
+            column.astype(np.int64).view(np.uint64)
+        )
+        matrix = np.empty(
+            (len(values), tag.shape[1] + values.shape[1]), dtype=np.uint8
+        )
+        matrix[:, : tag.shape[1]] = tag
+        matrix[:, tag.shape[1] :] = values
+        lengths += tag.shape[1]
+        if messages is None:
+            field_sizes = lengths
+        else:
+            field_sizes = np.bincount(
+                messages, weights=lengths, minlength=count
+            ).astype(np.int64)
+        encoded.append((matrix, lengths, messages, field_sizes))
+        sizes += field_sizes
+
+    # Lay out the messages, each a length followed by its fields in the
+    # order of the field numbers.
+    prefixes, prefix_lengths = _varintMatrix(sizes.view(np.uint64))
+    starts = _exclusiveCumsum(prefix_lengths + sizes)
+    out = np.empty(
+        int(starts[-1] + prefix_lengths[-1] + sizes[-1]), dtype=np.uint8
+    )
+    _placeRuns(out, prefixes, prefix_lengths, starts)
+    offsets = starts + prefix_lengths
+    for matrix, lengths, messages, field_sizes in encoded:
+        if messages is None:
+            positions = offsets
+        else:
+            positions = offsets[messages] + _exclusiveCumsum(lengths)
+            positions -= _exclusiveCumsum(field_sizes)[messages]
+        _placeRuns(out, matrix, lengths, positions)
+        offsets = offsets + field_sizes
+    return out.tobytes()
+
+
+def encodePacketBatches(out_file, batches):
+    """
+    Encode Packet messages in bulk, writing them to the file (i.e., after
+    the PacketHeader). batches is an iterable, e.g., a generator, of
+    batches of packets, each a NumPy structured array of packetDtype() or
+    a dictionary of arrays, as described for encodeMessageColumns. The
+    tick, cmd, addr and size are required. Return the number of packets
+    written. This needs NumPy, but not the generated packet_pb2 module.
+    """
+    fields = {number: name for number, (name, _) in _PACKET_FIELDS.items()}
+    num_packets = 0
+    for batch in batches:
+        if not len(batch["tick"]):
+            continue
+        out_file.write(encodeMessageColumns(batch, fields))
+        num_packets += len(batch["tick"])
+    return num_packets
@@ -0,0 +1,573 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# This file is a library to convert gem5 protobuf traces (packet,
+# instruction and instruction dependency traces) to a chunked columnar
+# format, and to query the converted traces. Analyses which go over the
+# same trace repeatedly can then load just the columns they need, without
+# decoding the protobuf messages again, and skip whole chunks which fall
+# outside a tick window, address range or set of requestors.
+#
+# A converted trace is a directory holding one NumPy (.npy) file per column
+# and chunk, named chunk-<n>.<column>.npy, and an index, trace.json, with
+# the trace header, the columns and, for each chunk, its number of rows and
+# the range of ticks, range of addresses and set of requestors in it.
+#
+# Every scalar field of a message is a column named after the field.
+# Whether an optional field is present is recorded in a has_<field>
+# column. Repeated fields and bytes fields are stored as ragged columns:
+# the elements of all the messages of a chunk are concatenated, and the
+# number of elements of each message is recorded in a <field>_count
+# column. The fields of repeated messages (e.g., the mem_access of an
+# instruction) are ragged columns named <field>_<subfield>.
+
+import importlib
+import json
+import os
+import subprocess
+
+import protolib
+
+# The version of the format of the converted traces.
+_VERSION = 1
+
+# The name of the index of a converted trace.
+_INDEX = "trace.json"
+
+# The default number of messages per chunk.
+_CHUNK_SIZE = 1024 * 1024
+
+# The kinds of trace which can be converted. For each, the generated
+# protobuf module and messages, and the columns which hold the tick,
+# address and requestor of each message, if the messages have one.
+_KINDS = {
+    "packet": {
+        "module": "packet_pb2",
+        "header": "PacketHeader",
+        "message": "Packet",
+        "tick": "tick",
+        "addr": "addr",
+        "requestor": "pkt_id",
+    },
+    "inst": {
+        "module": "inst_pb2",
+        "header": "InstHeader",
+        "message": "Inst",
+        "tick": "tick",
+        "addr": "pc",
+        "requestor": "cpuid",
+    },
+    "inst-dep": {
+        "module": "inst_dep_record_pb2",
+        "header": "InstDepRecordHeader",
+        "message": "InstDepRecord",
+        "tick": None,
+        "addr": "p_addr",
+        "requestor": None,
+    },
+}
+
+# The NumPy types of the protobuf field types which can be stored in a
+# column, by FieldDescriptor type.
+_FIELD_DTYPES = {
+    1: "<f8",  # TYPE_DOUBLE
+    2: "<f4",  # TYPE_FLOAT
+    3: "<i8",  # TYPE_INT64
+    4: "<u8",  # TYPE_UINT64
+    5: "<i4",  # TYPE_INT32
+    6: "<u8",  # TYPE_FIXED64
+    7: "<u4",  # TYPE_FIXED32
+    8: "?",  # TYPE_BOOL
+    12: "<u1",  # TYPE_BYTES, a ragged column of the bytes
+    13: "<u4",  # TYPE_UINT32
+    14: "<i4",  # TYPE_ENUM
+    15: "<i4",  # TYPE_SFIXED32
+    16: "<i8",  # TYPE_SFIXED64
+    17: "<i4",  # TYPE_SINT32
+    18: "<i8",  # TYPE_SINT64
+}
+
+
+def _isRepeated(field):
+    # FieldDescriptor.label is replaced by is_repeated and is_required in
+    # recent versions of protobuf.
+    try:
+        return field.is_repeated
+    except AttributeError:
+        return field.label == field.LABEL_REPEATED
+
+
+def _isOptional(field):
+    try:
+        return not field.is_required and not field.is_repeated
+    except AttributeError:
+        return field.label == field.LABEL_OPTIONAL
+
+
+def _fieldDtype(field):
+    try:
+        return _FIELD_DTYPES[field.type]
+    except KeyError:
+        raise ValueError(f"Field {field.full_name} cannot be a column.")
+
+
+class _ColumnBuilder:
+    """
+    Gather the fields of the messages of a type into columns.
+    """
+
+    def __init__(self, descriptor):
+        # The NumPy type of each column.
+        self.dtypes = {}
+        # The columns of each ragged field, by its count column.
+        self.ragged = {}
+        # The scalar fields, and whether each is optional.
+        self._fields = []
+        # The repeated and bytes fields, with the columns of the fields of
+        # their elements if they are messages.
+        self._ragged_fields = []
+        for field in descriptor.fields:
+            name = field.name
+            if field.type == field.TYPE_MESSAGE:
+                if not _isRepeated(field):
+                    raise ValueError(f"Field {field.full_name} is a message.")
+                subfields = []
+                for subfield in field.message_type.fields:
+                    if _isRepeated(subfield):
+                        raise ValueError(
+                            f"Field {subfield.full_name} is repeated."
+                        )
+                    column = f"{name}_{subfield.name}"
+                    self.dtypes[column] = _fieldDtype(subfield)
+                    subfields.append((column, subfield.name))
+                self._ragged_fields.append((name, subfields))
+                self.ragged[name + "_count"] = [c for c, _ in subfields]
+            elif _isRepeated(field) or field.type == field.TYPE_BYTES:
+                self.dtypes[name] = _fieldDtype(field)
+                self._ragged_fields.append((name, None))
+                self.ragged[name + "_count"] = [name]
+            else:
+                self.dtypes[name] = _fieldDtype(field)
+                self._fields.append((name, _isOptional(field)))
+        for name, optional in self._fields:
+            if optional:
+                self.dtypes["has_" + name] = "?"
+        for name in self.ragged:
+            self.dtypes[name] = "<u4"
+        self._values = {column: [] for column in self.dtypes}
+        self.rows = 0
+
+    def append(self, message):
+        values = self._values
+        for name, optional in self._fields:
+            values[name].append(getattr(message, name))
+            if optional:
+                values["has_" + name].append(message.HasField(name))
+        for name, subfields in self._ragged_fields:
+            elements = getattr(message, name)
+            values[name + "_count"].append(len(elements))
+            if subfields is None:
+                values[name].extend(elements)
+            else:
+                for element in elements:
+                    for column, subfield in subfields:
+                        values[column].append(getattr(element, subfield))
+        self.rows += 1
+
+    def columns(self):
+        """
+        Return the columns of the messages appended since the last call,
+        as NumPy arrays.
+        """
+        import numpy as np
+
+        columns = {
+            column: np.array(values, dtype=self.dtypes[column])
+            for column, values in self._values.items()
+        }
+        self._values = {column: [] for column in self.dtypes}
+        self.rows = 0
+        return columns
+
+
+def _protoModule(kind):
+    """
+    Import the generated protobuf module of a kind of trace, generating it
+    if it is not up to date.
+    """
+    module = _KINDS[kind]["module"]
+    util_dir = os.path.dirname(os.path.realpath(__file__))
+    subprocess.check_call(["make", "--quiet", "-C", util_dir, module + ".py"])
+    return importlib.import_module(module)
+
+
+def _headerDict(header):
+    """
+    Return the fields of a trace header as a dictionary which can be
+    stored as JSON. The id_strings of a packet header are turned into a
+    dictionary of strings by id.
+    """
+    fields = {}
+    for field, value in header.ListFields():
+        if field.name == "id_strings":
+            fields["id_strings"] = {str(e.key): e.value for e in value}
+        elif not _isRepeated(field):
+            fields[field.name] = value
+    return fields
+
+
+def _packetChunks(proto_in, chunk_size):
+    """
+    Decode the packets which follow in the file with the bulk decoder of
+    protolib and yield them in chunks of chunk_size packets, as
+    dictionaries of columns.
+    """
+    import numpy as np
+
+    batches = []
+    rows = 0
+    for batch in protolib.decodePacketBatches(proto_in):
+        batches.append(batch)
+        rows += len(batch)
+        if rows < chunk_size:
+            continue
+        packets = np.concatenate(batches)
+        full = len(packets) - len(packets) % chunk_size
+        for start in range(0, full, chunk_size):
+            chunk = packets[start : start + chunk_size]
+            yield {name: chunk[name] for name in packets.dtype.names}
+        batches = [packets[full:]]
+        rows = len(packets) - full
+    if rows:
+        packets = np.concatenate(batches)
+        yield {name: packets[name] for name in packets.dtype.names}
+
+
+def _messageChunks(proto_in, message, chunk_size):
+    """
+    Decode the messages which follow in the file and yield them in chunks
+    of chunk_size messages, as dictionaries of columns.
+    """
+    builder = _ColumnBuilder(message.DESCRIPTOR)
+    for message in protolib.decodeMessages(proto_in, message):
+        builder.append(message)
+        if builder.rows == chunk_size:
+            yield builder.columns()
+    if builder.rows:
+        yield builder.columns()
+
+
+def _valid(columns, name):
+    """
+    Return the values of a column in the messages in which it is present.
+    """
+    values = columns[name]
+    present = columns.get("has_" + name)
+    return values if present is None else values[present]
+
+
+def _range(columns, name):
+    if name is None:
+        return None
+    values = _valid(columns, name)
+    if not len(values):
+        return None
+    return [int(values.min()), int(values.max())]
+
+
+def convertTrace(in_file, out_dir, kind="packet", chunk_size=_CHUNK_SIZE):
+    """
+    Convert the protobuf trace in in_file, which may be gzipped, to the
+    columnar format in out_dir, which is created if needed. kind is one of
+    "packet", "inst" or "inst-dep". Return the number of messages
+    converted.
+    """
+    import numpy as np
+
+    if kind not in _KINDS:
+        raise ValueError(f"Unknown kind of trace '{kind}'.")
+    spec = _KINDS[kind]
+    module = _protoModule(kind)
+    message = getattr(module, spec["message"])()
+    builder = _ColumnBuilder(message.DESCRIPTOR)
+
+    # The file is closed however the conversion ends.
+    with protolib.openFileRd(in_file) as proto_in:
+        if proto_in.read(4) != b"gem5":
+            raise ValueError(f"{in_file} is not a gem5 protobuf trace.")
+        header = getattr(module, spec["header"])()
+        if not protolib.decodeMessage(proto_in, header):
+            raise ValueError(f"{in_file} has no header.")
+
+        if kind == "packet":
+            chunks = _packetChunks(proto_in, chunk_size)
+        else:
+            chunks = _messageChunks(proto_in, message, chunk_size)
+
+        os.makedirs(out_dir, exist_ok=True)
+        index = {
+            "version": _VERSION,
+            "kind": kind,
+            "header": _headerDict(header),
+            "columns": builder.dtypes,
+            "ragged": builder.ragged,
+            "tick": spec["tick"],
+            "addr": spec["addr"],
+            "requestor": spec["requestor"],
+            "chunks": [],
+        }
+        rows = 0
+        for columns in chunks:
+            name = f"chunk-{len(index['chunks']):05d}"
+            for column, values in columns.items():
+                np.save(os.path.join(out_dir, f"{name}.{column}.npy"), values)
+            requestors = None
+            if spec["requestor"] is not None:
+                requestors = np.unique(_valid(columns, spec["requestor"]))
+                requestors = [int(r) for r in requestors]
+            length = len(next(iter(columns.values())))
+            index["chunks"].append(
+                {
+                    "name": name,
+                    "rows": length,
+                    "tick": _range(columns, spec["tick"]),
+                    "addr": _range(columns, spec["addr"]),
+                    "requestors": requestors,
+                }
+            )
+            rows += length
+
+    # Write the index last, and atomically, so that a trace which is being,
+    # or failed to be, converted is not mistaken for a complete one.
+    index_path = os.path.join(out_dir, _INDEX)
+    with open(index_path + ".tmp", "w") as index_file:
+        json.dump(index, index_file, indent=1)
+    os.replace(index_path + ".tmp", index_path)
+    return rows
+
+
+def _overlaps(bounds, window):
+    """
+    Return whether the closed range bounds, which is None if the chunk has
+    no values, overlaps the half-open window [start, end).
+    """
+    if bounds is None:
+        return False
+    start, end = window
+    return (start is None or bounds[1] >= start) and (
+        end is None or bounds[0] < end
+    )
+
+
+def _within(bounds, window):
+    """
+    Return whether the closed range bounds is entirely within the
+    half-open window [start, end).
+    """
+    start, end = window
+    return (start is None or bounds[0] >= start) and (
+        end is None or bounds[1] < end
+    )
+
+
+class ColumnarTrace:
+    """
+    A trace converted by convertTrace. The header of the trace is in
+    header, the NumPy types of the columns in columns, and, for packet
+    traces, the names of the requestors by id in requestors.
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, _INDEX)) as index_file:
+            index = json.load(index_file)
+        if index["version"] != _VERSION:
+            raise ValueError(
+                f"{path} has version {index['version']} of the format, "
+                f"rather than {_VERSION}."
+            )
+        self.path = path
+        self.kind = index["kind"]
+        self.header = index["header"]
+        self.columns = index["columns"]
+        self.requestors = {
+            int(key): value
+            for key, value in self.header.get("id_strings", {}).items()
+        }
+        self._ragged = index["ragged"]
+        self._tick = index["tick"]
+        self._addr = index["addr"]
+        self._requestor = index["requestor"]
+        self._chunks = index["chunks"]
+
+    def __len__(self):
+        return sum(chunk["rows"] for chunk in self._chunks)
+
+    def _load(self, chunk, column):
+        import numpy as np
+
+        path = os.path.join(self.path, f"{chunk['name']}.{column}.npy")
+        return np.load(path, mmap_mode="r")
+
+    def _present(self, chunk, column, keep):
+        """
+        Restrict keep to the messages of a chunk in which column is
+        present.
+        """
+        present = "has_" + column
+        if present in self.columns:
+            keep &= self._load(chunk, present)
+        return keep
+
+    def _requestorIds(self, requestors):
+        ids = set()
+        names = {name: key for key, name in self.requestors.items()}
+        for requestor in requestors:
+            if isinstance(requestor, str):
+                if requestor not in names:
+                    raise ValueError(f"Unknown requestor '{requestor}'.")
+                requestor = names[requestor]
+            ids.add(requestor)
+        return ids
+
+    def chunks(self, columns=None, ticks=None, addrs=None, requestors=None):
+        """
+        Yield the messages of the trace, chunk by chunk, as dictionaries of
+        the given columns (by default, all of them). Ragged columns are
+        given with their count column.
+
+        Only the messages with a tick in the window ticks, a (start, end)
+        pair, and an address in addrs, a (start, end) pair, are yielded,
+        where either end may be None for no bound, and the end is
+        excluded. Only the messages of the requestors in requestors, an
+        iterable of ids or names, are yielded. The messages which do not
+        have a tick, address or requestor are excluded by the respective
+        filter. The chunks without any message in the windows or from the
+        requestors are skipped without being read.
+        """
+        import numpy as np
+
+        if columns is None:
+            columns = list(self.columns)
+        for column in columns:
+            if column not in self.columns:
+                raise ValueError(f"Unknown column '{column}'.")
+        filters = []
+        for name, column, window in (
+            ("tick", self._tick, ticks),
+            ("address", self._addr, addrs),
+        ):
+            if window is None:
+                continue
+            if column is None:
+                raise ValueError(
+                    f"The messages of {self.kind} traces have no {name}."
+                )
+            filters.append((column, tuple(window)))
+        if requestors is not None:
+            if self._requestor is None:
+                raise ValueError(
+                    f"The messages of {self.kind} traces have no requestor."
+                )
+            requestors = self._requestorIds(requestors)
+
+        # The count column of each ragged column.
+        counts = {
+            column: count
+            for count, ragged in self._ragged.items()
+            for column in ragged
+        }
+        ranges = {self._tick: "tick", self._addr: "addr"}
+
+        for chunk in self._chunks:
+            if not all(
+                _overlaps(chunk[ranges[column]], window)
+                for column, window in filters
+            ):
+                continue
+            if requestors is not None and not requestors.intersection(
+                chunk["requestors"]
+            ):
+                continue
+
+            # Only filter the messages of a chunk which is not entirely in
+            # the windows and from the requestors.
+            keeps = []
+            for column, (start, end) in filters:
+                if _within(chunk[ranges[column]], (start, end)) and (
+                    "has_" + column not in self.columns
+                ):
+                    continue
+                values = self._load(chunk, column)
+                keep = np.ones(len(values), dtype=bool)
+                if start is not None:
+                    keep &= values >= start
+                if end is not None:
+                    keep &= values < end
+                keeps.append(self._present(chunk, column, keep))
+            if requestors is not None and (
+                not requestors.issuperset(chunk["requestors"])
+                or "has_" + self._requestor in self.columns
+            ):
+                values = self._load(chunk, self._requestor)
+                keep = np.isin(values, list(requestors))
+                keeps.append(self._present(chunk, self._requestor, keep))
+            mask = np.logical_and.reduce(keeps) if keeps else None
+
+            if mask is not None and not mask.any():
+                continue
+            selected = {}
+            for column in columns:
+                values = self._load(chunk, column)
+                if mask is not None:
+                    if column in counts:
+                        count = self._load(chunk, counts[column])
+                        values = values[np.repeat(mask, count)]
+                    else:
+                        values = values[mask]
+                selected[column] = values
+            yield selected
+
+    def query(self, columns=None, ticks=None, addrs=None, requestors=None):
+        """
+        Return the messages of the trace selected as by chunks(), as a
+        dictionary of columns.
+        """
+        import numpy as np
+
+        if columns is None:
+            columns = list(self.columns)
+        selected = {column: [] for column in columns}
+        for chunk in self.chunks(columns, ticks, addrs, requestors):
+            for column, values in chunk.items():
+                selected[column].append(values)
+        return {
+            column: (
+                np.concatenate(values)
+                if values
+                else np.empty(0, dtype=self.columns[column])
+            )
+            for column, values in selected.items()
+        }